@@ -0,0 +1,583 @@
+"""Interface gráfica (Tkinter). Abra com `python main.py`; importar este módulo já importa o Tk."""
+import time
+import tkinter as tk
+from tkinter import ttk
+import random
+from datetime import datetime
+from deadlock import DetectorDeadlock
+from execucao import PoolTransacoes, TransacaoAgendada
+from metricas import Metricas
+from rastro import Rastro
+from reinicio import Reinicio
+from politicas import POLITICAS, criar_politica
+from recursos import RecursoCompartilhavel
+from renderizacao import CanalRenderizacao
+from retrato import MonitorEstado
+from transacao import MinhaThread
+from visao import VisaoTransacoes
+from vitimas import CustoAborto
+
+class Aplicacao:
+    def __init__(self, root, recursos=("X", "Y")):
+        self.root = root
+        self.root.title("Simulador de Threads com Recursos")
+        self.root.geometry("600x600")  # Reduzindo a altura da janela
+        
+        # Variável para controlar o estado do deadlock
+        self.deadlock_ativo = False
+        self.threads_deadlock = []
+        
+        # Configura o estilo para a barra de progresso
+        style = ttk.Style()
+        style.theme_use('default')
+        style.configure("Horizontal.TProgressbar", 
+                       troughcolor='white',
+                       background='green',
+                       thickness=20)
+        
+        style.configure("Yellow.Horizontal.TProgressbar", 
+                       troughcolor='white',
+                       background='yellow',
+                       thickness=20)
+        
+        style.configure("Red.Horizontal.TProgressbar", 
+                       troughcolor='white',
+                       background='red',
+                       thickness=20)
+        
+        # Frame principal
+        self.frame = ttk.Frame(root, padding="10")
+        self.frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Frame de configuração
+        self.frame_config = ttk.LabelFrame(self.frame, text="Configuração", padding="5")
+        self.frame_config.pack(fill=tk.X, pady=5)
+        
+        # Configuração de tempo das threads
+        self.frame_tempo_threads = ttk.LabelFrame(self.frame_config, text="Tempo das Threads", padding="5")
+        self.frame_tempo_threads.pack(fill=tk.X, pady=5)
+        
+        # Frame para os campos de tempo das threads
+        self.frame_tempo = ttk.Frame(self.frame_tempo_threads)
+        self.frame_tempo.pack(fill=tk.X, pady=5)
+        
+        # Tempo mínimo das threads
+        ttk.Label(self.frame_tempo, text="Tempo mínimo (s):").pack(side=tk.LEFT, padx=5)
+        self.tempo_min = ttk.Entry(self.frame_tempo, width=5)
+        self.tempo_min.insert(0, "15")
+        self.tempo_min.pack(side=tk.LEFT, padx=5)
+        
+        # Tempo máximo das threads
+        ttk.Label(self.frame_tempo, text="Tempo máximo (s):").pack(side=tk.LEFT, padx=5)
+        self.tempo_max = ttk.Entry(self.frame_tempo, width=5)
+        self.tempo_max.insert(0, "30")
+        self.tempo_max.pack(side=tk.LEFT, padx=5)
+
+        # Configuração de tempo dos recursos
+        self.frame_tempo_recursos = ttk.LabelFrame(self.frame_config, text="Tempo de Acesso aos Recursos", padding="5")
+        self.frame_tempo_recursos.pack(fill=tk.X, pady=5)
+        
+        # Frame para os campos de tempo dos recursos
+        self.frame_tempo_rec = ttk.Frame(self.frame_tempo_recursos)
+        self.frame_tempo_rec.pack(fill=tk.X, pady=5)
+        
+        # Tempo mínimo de acesso aos recursos
+        ttk.Label(self.frame_tempo_rec, text="Tempo mínimo (s):").pack(side=tk.LEFT, padx=5)
+        self.tempo_min_rec = ttk.Entry(self.frame_tempo_rec, width=5)
+        self.tempo_min_rec.insert(0, "15")
+        self.tempo_min_rec.pack(side=tk.LEFT, padx=5)
+        
+        # Tempo máximo de acesso aos recursos
+        ttk.Label(self.frame_tempo_rec, text="Tempo máximo (s):").pack(side=tk.LEFT, padx=5)
+        self.tempo_max_rec = ttk.Entry(self.frame_tempo_rec, width=5)
+        self.tempo_max_rec.insert(0, "30")
+        self.tempo_max_rec.pack(side=tk.LEFT, padx=5)
+        
+        # Política de controle de concorrência usada nos conflitos
+        self.frame_politica = ttk.Frame(self.frame_config)
+        self.frame_politica.pack(fill=tk.X, pady=5)
+        ttk.Label(self.frame_politica, text="Política:").pack(side=tk.LEFT, padx=5)
+        self.politica = ttk.Combobox(self.frame_politica, values=list(POLITICAS), state="readonly", width=12)
+        self.politica.set("esperar")
+        self.politica.pack(side=tk.LEFT, padx=5)
+        ttk.Label(self.frame_politica, text="Tempo limite (s):").pack(side=tk.LEFT, padx=5)
+        self.tempo_limite = ttk.Entry(self.frame_politica, width=5)
+        self.tempo_limite.insert(0, "5")
+        self.tempo_limite.pack(side=tk.LEFT, padx=5)
+
+        # Semente dos sorteios (vazia = nova a cada geração) e gravação do rastro
+        self.frame_semente = ttk.Frame(self.frame_config)
+        self.frame_semente.pack(fill=tk.X, pady=5)
+        ttk.Label(self.frame_semente, text="Threads:").pack(side=tk.LEFT, padx=5)
+        self.quantidade_threads = ttk.Entry(self.frame_semente, width=7)  # Vazio = 2 ou 3
+        self.quantidade_threads.pack(side=tk.LEFT, padx=5)
+        ttk.Label(self.frame_semente, text="Semente:").pack(side=tk.LEFT, padx=5)
+        self.semente = ttk.Entry(self.frame_semente, width=12)
+        self.semente.pack(side=tk.LEFT, padx=5)
+        # Uma thread do sistema por transação ou um pool fixo de threads de trabalho
+        ttk.Label(self.frame_semente, text="Execução:").pack(side=tk.LEFT, padx=5)
+        self.modo_execucao = ttk.Combobox(self.frame_semente, values=["threads", "pool"], state="readonly", width=8)
+        self.modo_execucao.set("threads")
+        self.modo_execucao.pack(side=tk.LEFT, padx=5)
+        self.gravar_rastro = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            self.frame_semente,
+            text="Gravar Rastro",
+            variable=self.gravar_rastro
+        ).pack(side=tk.LEFT, padx=5)
+        
+        # Botão para gerar threads aleatórias
+        self.btn_gerar = ttk.Button(
+            self.frame_config,
+            text="Gerar Threads Aleatórias",
+            command=self.gerar_threads_aleatorias
+        )
+        self.btn_gerar.pack(pady=5)
+        
+        # Frame para threads: um canvas só, que desenha apenas as linhas visíveis
+        self.frame_threads = ttk.Frame(self.frame)
+        self.frame_threads.pack(fill=tk.BOTH, expand=True, pady=5)
+        self.visao = VisaoTransacoes(self.frame_threads)
+        
+        # Botões
+        self.frame_botoes = ttk.Frame(self.frame)
+        self.frame_botoes.pack(pady=10)
+        
+        self.btn_iniciar = ttk.Button(
+            self.frame_botoes,
+            text="Iniciar Threads",
+            command=self.iniciar_threads,
+            state='disabled'
+        )
+        self.btn_iniciar.pack(side=tk.LEFT, padx=5)
+        
+        self.btn_status = ttk.Button(
+            self.frame_botoes,
+            text="Verificar Status",
+            command=self.verificar_status,
+            state='disabled'
+        )
+        self.btn_status.pack(side=tk.LEFT, padx=5)
+
+        self.btn_deadlock = ttk.Button(
+            self.frame_botoes,
+            text="Forçar Deadlock",
+            command=self.toggle_deadlock,
+            state='disabled'
+        )
+        self.btn_deadlock.pack(side=tk.LEFT, padx=5)
+
+        self.btn_metricas = ttk.Button(
+            self.frame_botoes,
+            text="Exportar Métricas",
+            command=self.exportar_metricas
+        )
+        self.btn_metricas.pack(side=tk.LEFT, padx=5)
+
+        self.btn_modo = ttk.Button(
+            self.frame_botoes,
+            text="Modo Mapa",
+            command=self.alternar_modo_visao
+        )
+        self.btn_modo.pack(side=tk.LEFT, padx=5)
+
+        # Liga/desliga a detecção automática de deadlock
+        self.deteccao_automatica = tk.BooleanVar(value=True)
+        self.check_deteccao = ttk.Checkbutton(
+            self.frame_botoes,
+            text="Detecção Automática",
+            variable=self.deteccao_automatica,
+            command=self.alternar_deteccao
+        )
+        self.check_deteccao.pack(side=tk.LEFT, padx=5)
+        
+        # Label para resultado do status
+        self.label_resultado = ttk.Label(self.frame, text="")
+        self.label_resultado.pack(pady=10)
+        
+        # Sorteios da aplicação (quantidade e tempo das threads); refeito a cada geração
+        self.rng = random.Random()
+        self.rastro = None
+
+        # Lista para armazenar as threads e seus componentes
+        self.threads = []
+        
+        # Cria recursos (o catálogo vem de quem cria a aplicação)
+        self.recursos = {}
+        for item_id in recursos:
+            self.recursos[item_id] = RecursoCompartilhavel(item_id)
+        # Lê o estado dos recursos para o "Verificar Status" sem parar as threads
+        self.monitor = MonitorEstado(self.recursos)
+
+        # Detector de deadlock em segundo plano, avisado pelos recursos a cada espera.
+        # A vítima de cada ciclo (e do "Matar Deadlock") é a que faz perder menos trabalho
+        self.escolha_vitima = CustoAborto()
+        self.detector = DetectorDeadlock(ao_detectar=self.deadlock_detectado, escolher_vitima=self.escolha_vitima)
+        for recurso in self.recursos.values():
+            recurso.detector = self.detector
+        self.detector.iniciar()
+
+        # Transações abortadas recomeçam sozinhas, com o mesmo timestamp, depois de um backoff curto
+        self.reinicio = Reinicio(base=0.5, maximo=10.0)
+
+        # Métricas de espera, retenção e aborto (recomeçam a cada geração de threads)
+        self.novas_metricas()
+
+        # As threads publicam no canal; só o loop de renderização toca no Tk
+        self.canal = CanalRenderizacao()
+        # Threads de trabalho do modo pool (só sobem na primeira transação iniciada)
+        self.pool = PoolTransacoes()
+        self.intervalo_quadro = 1000 // 60  # ms (60 quadros por segundo)
+        self.root.after(self.intervalo_quadro, self.renderizar)
+
+    def renderizar(self):
+        """Aplica as mudanças publicadas pelas threads, uma vez por quadro"""
+        self.canal.aplicar()
+        self.visao.desenhar()
+        self.root.after(self.intervalo_quadro, self.renderizar)
+    
+    def novas_metricas(self):
+        self.metricas = Metricas()
+        self.detector.registro_metricas = self.metricas
+        for recurso in self.recursos.values():
+            recurso.registro_metricas = self.metricas
+
+    def exportar_metricas(self):
+        """Salva um retrato das métricas em JSON e no formato do Prometheus"""
+        self.metricas.salvar("metricas.json")
+        self.metricas.salvar("metricas.prom")
+        self.label_resultado.config(text="Métricas salvas em metricas.json e metricas.prom")
+
+    def alternar_modo_visao(self):
+        modo = self.visao.alternar_modo()
+        self.btn_modo.config(text="Modo Lista" if modo == "mapa" else "Modo Mapa")
+
+    def reset_recursos(self):
+        """Reinicia todos os recursos para o estado inicial"""
+        for recurso in self.recursos.values():
+            # Limpa a fila de espera e os atributos do recurso
+            recurso.resetar()
+    
+    def gerar_tempo_aleatorio(self):
+        try:
+            tempo_min = float(self.tempo_min.get())
+            tempo_max = float(self.tempo_max.get())
+            if tempo_min > tempo_max:
+                tempo_min, tempo_max = tempo_max, tempo_min
+            return self.rng.uniform(tempo_min, tempo_max)
+        except ValueError:
+            # Se houver erro na conversão, usa valores padrão
+            return self.rng.uniform(10, 30)
+    
+    def gerar_threads_aleatorias(self):
+        # Limpa threads existentes
+        self.limpar_threads()
+        
+        # Reinicia os recursos
+        self.reset_recursos()
+        self.novas_metricas()
+
+        # Mesma semente, mesmas threads e mesmas escolhas dentro delas
+        try:
+            semente = int(self.semente.get())
+        except ValueError:
+            semente = random.randrange(2 ** 32)
+        self.rng = random.Random(semente)
+
+        # Aplica a política escolhida a todos os recursos
+        try:
+            tempo_limite = float(self.tempo_limite.get())
+        except ValueError:
+            tempo_limite = 5
+        politica = criar_politica(self.politica.get(), tempo_limite)
+        for recurso in self.recursos.values():
+            recurso.politica = politica
+
+        if self.gravar_rastro.get():
+            self.rastro = Rastro(f"rastro-{semente}.jsonl", recursos=list(self.recursos), semente=semente,
+                                 politica=politica.nome, tempo_limite=politica.tempo_limite,
+                                 preferencia=next(iter(self.recursos.values())).preferencia)
+        for recurso in self.recursos.values():
+            recurso.rastro = self.rastro
+        
+        # Reseta o estado do deadlock
+        self.deadlock_ativo = False
+        self.threads_deadlock = []
+        self.btn_deadlock.config(text="Forçar Deadlock")
+        
+        # Quantidade pedida ou, sem ela, um número aleatório de threads (entre 2 e 3)
+        try:
+            num_threads = max(1, int(self.quantidade_threads.get()))
+        except ValueError:
+            num_threads = self.rng.randint(2, 3)
+        
+        # Cria novas threads
+        for i in range(num_threads):
+            # Gera tempo aleatório
+            tempo = self.gerar_tempo_aleatorio()
+            
+            # Cria a linha da thread na visão (faz as vezes do label e da barra de progresso)
+            linha = self.visao.adicionar(f"Thread {i+1}: Aguardando...")
+            
+            # Pega os tempos de acesso aos recursos
+            try:
+                tempo_min_acesso = float(self.tempo_min_rec.get())
+                tempo_max_acesso = float(self.tempo_max_rec.get())
+                if tempo_min_acesso > tempo_max_acesso:
+                    tempo_min_acesso, tempo_max_acesso = tempo_max_acesso, tempo_min_acesso
+            except ValueError:
+                tempo_min_acesso = 15
+                tempo_max_acesso = 30
+            
+            # Cria thread com tempo aleatório (no modo pool, uma transação executada pelo pool)
+            if self.modo_execucao.get() == "pool":
+                classe, opcoes = TransacaoAgendada, {'pool': self.pool}
+            else:
+                classe, opcoes = MinhaThread, {}
+            thread = classe(
+                str(i+1),
+                prioridade=tempo,
+                label_status=linha,
+                progress_bar=linha,
+                recursos=list(self.recursos.values()),
+                metricas=self.metricas,
+                semente=self.rng.randrange(2 ** 32),
+                reinicio=self.reinicio,
+                **opcoes
+            )
+            thread.rastro = self.rastro
+            
+            # Configura os tempos de acesso aos recursos
+            thread.tempo_min_acesso = tempo_min_acesso
+            thread.tempo_max_acesso = tempo_max_acesso
+            
+            self.threads.append(thread)
+        
+        # Atualiza a referência das threads nos recursos
+        for recurso in self.recursos.values():
+            recurso.threads = self.threads
+        
+        # Habilita botões
+        self.btn_iniciar.config(state='normal')
+        self.btn_status.config(state='normal')
+        self.btn_deadlock.config(state='normal')
+        
+        # Mostra informações sobre as threads geradas
+        info = f"Geradas {num_threads} threads (semente {semente}):\n"
+        for i, thread in enumerate(self.threads[:10]):
+            info += f"Thread {i+1}: tempo = {thread.tempo_total:.1f}s\n"
+        if num_threads > 10:
+            info += f"... e mais {num_threads - 10}\n"
+        self.label_resultado.config(text=info)
+    
+    def limpar_threads(self):
+        # Para todas as threads em execução (avisa todas antes de esperar por alguma)
+        for thread in self.threads:
+            if thread.is_alive():
+                thread.parar()
+        for thread in self.threads:
+            if thread.is_alive():
+                # Dá um pequeno tempo para a thread encerrar
+                thread.join(timeout=0.01)
+
+        # Fecha o rastro da geração anterior
+        if self.rastro:
+            self.rastro.fechar()
+            self.rastro = None
+        
+        # Remove as linhas das threads da visão
+        self.visao.limpar()
+        
+        # Limpa a lista
+        self.threads.clear()
+        
+        # Reseta o estado do deadlock
+        self.deadlock_ativo = False
+        self.threads_deadlock = []
+        
+        # Pequeno delay para garantir que tudo foi limpo
+        self.root.update()
+        time.sleep(0.01)
+    
+    def iniciar_threads(self):
+        # Reseta as barras de progresso
+        for linha in self.visao.linhas:
+            linha["value"] = 0
+        
+        # Inicia todas as threads
+        for thread in self.threads:
+            thread.start()
+        
+        self.btn_iniciar.config(state='disabled')
+    
+    def verificar_status(self):
+        # Donos e esperas vêm de um retrato só: as threads continuam rodando enquanto ele é tirado
+        retrato = self.monitor.retratar()
+        resultado = "Status das Threads:\n"
+        for i, thread in enumerate(self.threads):
+            resultado += f"Thread {i+1}: {'Ativa' if thread.esta_ativa else 'Inativa'} (Tempo: {thread.tempo_total:.1f}s)\n"
+            estado = retrato['transacoes'].get(thread.nome)
+            if estado and estado['acessando']:
+                resultado += f"  Recursos acessados: {estado['acessando']}\n"
+            if estado and estado['aguardando']:
+                resultado += f"  Recursos aguardados: {estado['aguardando']}\n"
+        
+        resultado += "\nStatus dos Recursos:\n"
+        for letra, recurso in retrato['recursos'].items():
+            resultado += f"Recurso {letra}: {recurso['lock']}"
+            if recurso['donos']:
+                resultado += f" (Thread {', '.join(nome for nome, _ in recurso['donos'])})"
+            resultado += "\n"
+        if not retrato['consistente']:
+            resultado += "(recursos lidos em instantes diferentes: muitas escritas durante a leitura)\n"
+
+        metricas = self.detector.metricas()
+        resultado += f"\nDeadlocks detectados: {metricas['deadlocks']} (detecção média: {metricas['tempo_medio_deteccao'] * 1000:.2f}ms)\n"
+        reinicio = self.reinicio.metricas()
+        resultado += f"Reinícios: {reinicio['reinicios']} (backoff médio: {reinicio['atraso_medio_reinicio']:.1f}s, {reinicio['contencao']:.0%} dos desfechos recentes foram abortos)\n"
+        
+        self.label_resultado.config(text=resultado)
+
+    def toggle_deadlock(self):
+        """Alterna entre forçar e matar deadlock"""
+        if not self.deadlock_ativo:
+            self.forcar_deadlock()
+        else:
+            self.matar_deadlock()
+
+    def forcar_deadlock(self):
+        """Força um deadlock entre duas threads aleatórias"""
+        if len(self.threads) < 2:
+            self.label_resultado.config(text="É necessário pelo menos 2 threads para forçar deadlock!")
+            return
+        if len(self.recursos) < 2:
+            self.label_resultado.config(text="É necessário pelo menos 2 recursos para forçar deadlock!")
+            return
+        # O deadlock é sempre nos dois primeiros recursos do catálogo
+        x, y = list(self.recursos.values())[:2]
+
+        # Libera todos os recursos atualmente em uso
+        for thread in self.threads:
+            thread.reset_recursos_acesso()
+
+        # Seleciona duas threads aleatórias
+        threads_selecionadas = self.rng.sample(self.threads, 2)
+        thread1, thread2 = threads_selecionadas
+
+        # Configura thread1 para acessar X e esperar Y
+        thread1.recursos_desejados.substituir([x])
+        thread1.recursos_acesso.clear()
+        thread1.estado = "aguardando_recursos"
+        thread1.inicio_espera = time.time()
+        thread1.atualizar_cor_barra()
+        thread1.tempo_total = float('inf')  # Faz a thread nunca terminar
+        if x.acessar(thread1, "escrever"):
+            thread1.recursos_acesso.append(x)
+            thread1.recursos_desejados.substituir([y])
+            if thread1.label_status:
+                thread1.label_status.config(text=f"Thread {thread1.nome}: Acessando {x.item_id}, aguardando {y.item_id}")
+
+        # Configura thread2 para acessar Y e esperar X
+        thread2.recursos_desejados.substituir([y])
+        thread2.recursos_acesso.clear()
+        thread2.estado = "aguardando_recursos"
+        thread2.inicio_espera = time.time()
+        thread2.atualizar_cor_barra()
+        thread2.tempo_total = float('inf')  # Faz a thread nunca terminar
+        if y.acessar(thread2, "escrever"):
+            thread2.recursos_acesso.append(y)
+            thread2.recursos_desejados.substituir([x])
+            if thread2.label_status:
+                thread2.label_status.config(text=f"Thread {thread2.nome}: Acessando {y.item_id}, aguardando {x.item_id}")
+
+        # Configura as outras threads para continuar normalmente
+        for thread in self.threads:
+            if thread not in threads_selecionadas:
+                thread.estado = "executando"
+                thread.atualizar_cor_barra()
+            # Estados mudaram por fora: acorda as threads para reavaliarem
+            thread.acordar()
+
+        # Atualiza o estado do deadlock
+        self.deadlock_ativo = True
+        self.threads_deadlock = threads_selecionadas
+        self.btn_deadlock.config(text="Matar Deadlock")
+        self.label_resultado.config(text=f"Deadlock forçado entre Thread {thread1.nome} e Thread {thread2.nome}")
+
+        # Avisa o detector (se estiver ligado, ele resolve o deadlock sozinho)
+        y.notificar_espera(thread1)
+        x.notificar_espera(thread2)
+
+    def alternar_deteccao(self):
+        """Liga ou desliga a detecção automática de deadlock"""
+        self.detector.ativo = self.deteccao_automatica.get()
+        if self.detector.ativo:
+            # Verifica quem já estava esperando enquanto a detecção estava desligada
+            for thread in self.threads:
+                for recurso in list(thread.recursos_desejados):
+                    recurso.notificar_espera(thread)
+
+    def deadlock_detectado(self, vitima, ciclo):
+        """Chamado pelo detector (fora da thread do Tk) ao encontrar um ciclo de espera"""
+        if self.deadlock_ativo and vitima in self.threads_deadlock:
+            # Deadlock forçado: resolve como o botão "Matar Deadlock", na thread do Tk
+            self.canal.agendar(self.matar_deadlock)
+            return
+        vitima.morrer()
+        tempo_deteccao = self.detector.historico[-1]['tempo_deteccao'] * 1000
+        custo = self.escolha_vitima.ultima['custo']
+        # Aqui é a thread do detector: o label só é escrito pela thread do Tk, no próximo quadro
+        self.canal.agendar(self.label_resultado.config, text=f"Deadlock detectado entre Threads {', '.join(t.nome for t in ciclo)}. Thread {vitima.nome} abortada (custo {custo:.1f}, detecção em {tempo_deteccao:.2f}ms).")
+
+    def matar_deadlock(self):
+        """Mata o deadlock abortando a thread que perde menos trabalho e liberando as outras do ciclo"""
+        if not self.deadlock_ativo or not self.threads_deadlock:
+            return
+
+        # Pesa trabalho feito, recursos em mãos, reinícios e idade (ver vitimas.py)
+        thread_abortada = self.escolha_vitima(self.threads_deadlock)
+        custo = self.escolha_vitima.ultima['custo']
+        threads_continuam = [t for t in self.threads_deadlock if t is not thread_abortada]
+
+        thread_abortada.morrer()
+
+        for thread_continua in threads_continuam:
+            if not thread_continua.is_alive():
+                # Já terminou: não há execução para retomar (e uma Thread não pode ser iniciada de novo)
+                continue
+            # Libera os recursos que a thread que continua estava acessando
+            for recurso in thread_continua.recursos_acesso:
+                recurso.liberar(thread_continua)
+            thread_continua.recursos_acesso.clear()
+            thread_continua.cancelar_prazos()
+
+            # Reinicia a thread que deve continuar
+            thread_continua.estado = "executando"
+            thread_continua.atualizar_cor_barra()
+            thread_continua.tempo_inicio = time.time()
+            thread_continua.tempo_pausa = 0
+            thread_continua.ultima_tentativa_acesso = time.time()
+            thread_continua.proximo_intervalo_acesso = thread_continua.rng.uniform(
+                thread_continua.intervalo_min_acesso,
+                thread_continua.intervalo_max_acesso
+            )
+            thread_continua.recursos_desejados.clear()
+            thread_continua.primeira_tentativa = True
+            thread_continua.esta_ativa = True
+            thread_continua.acordar()
+
+            # Preserva o tempo total original da thread
+            tempo_total_original = thread_continua.prioridade
+            thread_continua.tempo_total = tempo_total_original
+
+            # Atualiza o status da thread (ela continua no mesmo executor: o laço dela só estava esperando)
+            if thread_continua.label_status:
+                thread_continua.label_status.config(text=f"Thread {thread_continua.nome}: Continuando execução (Tempo restante: {tempo_total_original:.1f}s)")
+
+        # Reseta o estado do deadlock
+        self.deadlock_ativo = False
+        self.threads_deadlock = []
+        self.btn_deadlock.config(text="Forçar Deadlock")
+        continuam = (f"Thread {threads_continuam[0].nome} continua" if len(threads_continuam) == 1
+                     else f"Threads {', '.join(t.nome for t in threads_continuam)} continuam")
+        self.label_resultado.config(text=f"Deadlock resolvido. Thread {thread_abortada.nome} abortada (custo {custo:.1f}). {continuam} executando.")
@@ -0,0 +1,140 @@
+"""Benchmark do gerenciador de recursos sob perfis de contenção.
+
+Roda o Simulador (a mesma lógica do RecursoCompartilhavel, sem Tkinter) em
+cargas padronizadas e salva o resultado em JSON, para comparar uma execução
+com outra:
+
+    python benchmark.py --saida base.json
+    python benchmark.py --saida novo.json --comparar base.json
+
+Cada caso combina uma carga, uma quantidade de transações, uma quantidade
+de recursos e uma política. Com a mesma semente, a carga gerada é a mesma.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import time
+
+from politicas import POLITICAS, criar_politica
+from simulacao import Simulador
+
+# Parâmetros de cada carga (o que não estiver aqui fica no padrão do Simulador)
+CARGAS = {
+    'uniforme': {},
+    'zipf': {'distribuicao': 'zipf'},
+    'leitura': {'fracao_leitura': 0.9},
+    'escrita': {'fracao_leitura': 0.1},
+    'retencao-curta': {'tempo_min_acesso': 1, 'tempo_max_acesso': 3},
+    'retencao-longa': {'tempo_min_acesso': 30, 'tempo_max_acesso': 60},
+}
+
+# Métricas do resumo gravadas no JSON e usadas na comparação
+METRICAS = (
+    'vazao', 'espera_p50', 'espera_p99', 'espera_p999', 'taxa_aborto',
+    'cpu_por_transacao', 'concluidas', 'abortadas', 'bloqueadas', 'tempo_real',
+)
+
+# Para estas métricas, subir é piorar
+MENOR_E_MELHOR = {'espera_p50', 'espera_p99', 'espera_p999', 'taxa_aborto', 'cpu_por_transacao',
+                  'abortadas', 'bloqueadas', 'tempo_real'}
+
+
+def executar_caso(carga, transacoes, recursos, politica, semente, recursos_por_acesso=1):
+    """Roda um caso e retorna seus parâmetros junto com as métricas"""
+    parametros = dict(CARGAS[carga])
+    distribuicao = parametros.pop('distribuicao', 'uniforme')
+    simulador = Simulador([f"R{i}" for i in range(recursos)], semente=semente,
+                          politica=criar_politica(politica), distribuicao=distribuicao)
+    simulador.gerar_transacoes(transacoes, recursos_por_acesso=recursos_por_acesso, **parametros)
+    resumo = simulador.executar()
+    return {
+        'carga': carga,
+        'transacoes': transacoes,
+        'recursos': recursos,
+        'politica': politica,
+        'recursos_por_acesso': recursos_por_acesso,
+        **{metrica: resumo[metrica] for metrica in METRICAS},
+    }
+
+
+def chave_caso(caso):
+    return (caso['carga'], caso['transacoes'], caso['recursos'], caso['politica'], caso['recursos_por_acesso'])
+
+
+def versao_codigo():
+    """Commit atual, para saber de onde veio cada resultado (None fora de um repositório git)"""
+    try:
+        saida = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return saida.stdout.strip()
+
+
+def comparar(base, casos, tolerancia):
+    """Imprime a variação de cada métrica e retorna quantas pioraram além da tolerância"""
+    anteriores = {chave_caso(caso): caso for caso in base['casos']}
+    regressoes = 0
+    for caso in casos:
+        anterior = anteriores.get(chave_caso(caso))
+        if anterior is None:
+            continue
+        for metrica in METRICAS:
+            # Tempo real varia com a máquina: só a CPU por transação conta como regressão de custo
+            if metrica == 'tempo_real':
+                continue
+            antes, depois = anterior[metrica], caso[metrica]
+            if antes == depois:
+                continue
+            variacao = (depois - antes) / abs(antes) if antes else float('inf')
+            piorou = variacao > tolerancia if metrica in MENOR_E_MELHOR else variacao < -tolerancia
+            if piorou:
+                regressoes += 1
+            print(f"{'REGRESSÃO ' if piorou else ''}{'/'.join(map(str, chave_caso(caso)))} "
+                  f"{metrica}: {antes:.6g} -> {depois:.6g} ({variacao:+.1%})")
+    return regressoes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark do gerenciador de recursos")
+    parser.add_argument("--cargas", nargs="+", choices=list(CARGAS), default=list(CARGAS))
+    parser.add_argument("--transacoes", nargs="+", type=int, default=[100, 1000])
+    parser.add_argument("--recursos", nargs="+", type=int, default=[10, 100])
+    parser.add_argument("--politicas", nargs="+", choices=list(POLITICAS), default=["esperar"])
+    parser.add_argument("--recursos-por-acesso", type=int, default=1)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", default="benchmark.json", help="Arquivo JSON com os resultados")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior para comparar")
+    parser.add_argument("--tolerancia", type=float, default=0.2,
+                        help="Variação relativa aceita antes de acusar regressão (a CPU oscila entre execuções)")
+    args = parser.parse_args()
+
+    casos = []
+    for carga in args.cargas:
+        for transacoes in args.transacoes:
+            for recursos in args.recursos:
+                for politica in args.politicas:
+                    caso = executar_caso(carga, transacoes, recursos, politica, args.semente,
+                                         args.recursos_por_acesso)
+                    casos.append(caso)
+                    print(f"{carga:<15}{transacoes:>7}{recursos:>7} {politica:<11}"
+                          f"vazao={caso['vazao']:.4f} espera_p99={caso['espera_p99']:.1f} "
+                          f"aborto={caso['taxa_aborto']:.3f} cpu/tx={caso['cpu_por_transacao'] * 1e6:.0f}us")
+
+    resultado = {
+        'data': time.strftime("%Y-%m-%dT%H:%M:%S"),
+        'commit': versao_codigo(),
+        'python': platform.python_version(),
+        'semente': args.semente,
+        'casos': casos,
+    }
+    with open(args.saida, "w", encoding="utf-8") as arquivo:
+        json.dump(resultado, arquivo, indent=2)
+    print(f"Resultados salvos em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            base = json.load(arquivo)
+        regressoes = comparar(base, casos, args.tolerancia)
+        print(f"{regressoes} regressão(ões) acima de {args.tolerancia:.0%}")
+        raise SystemExit(1 if regressoes else 0)
@@ -0,0 +1,127 @@
+"""Cargas de trabalho lidas de arquivo, em fluxo.
+
+Uma carga é um arquivo JSON por linha (pode estar em .gz). Cada linha
+declara um recurso ou uma transação:
+
+    {"recurso": "X"}
+    {"transacao": "T1", "chegada": 0.0, "tempo": 20, "acessos": [
+        {"ler": ["X"], "escrever": ["Y"], "retencao": 15},
+        {"escrever": ["X"]}]}
+    {"transacao": "T2", "chegada": 1.5, "tempo": 12, "ler": ["Y"], "retencao": 5}
+
+- chegada: instante em que a transação entra no sistema (padrão 0). As
+  chegadas não podem voltar no tempo: é o que deixa ler o arquivo aos poucos.
+- tempo: segundos de execução, sem contar espera e acesso (obrigatório).
+- prioridade: o timestamp das políticas (padrão: o tempo, como na aplicação).
+- acessos: na ordem, cada um com os conjuntos de leitura e de escrita e a
+  retenção em segundos (sem retenção, sorteada entre os tempos de acesso).
+  Com um acesso só, os campos podem vir direto na transação.
+
+Recursos citados sem declaração são criados quando aparecem. Linhas em
+branco e começadas por # são ignoradas.
+
+A leitura é uma cadeia de geradores (linhas, registros, itens): nada do
+arquivo fica na memória além da linha da vez, então rastros de produção de
+vários GB entram com memória constante. Quem consome é
+Simulador.carregar, que puxa a próxima transação só quando a anterior chega.
+"""
+import json
+import sys
+
+RECURSO = "recurso"
+TRANSACAO = "transacao"
+
+
+def ler_linhas(caminho):
+    """Gera (número, texto) das linhas com conteúdo; "-" lê da entrada padrão"""
+    if caminho == "-":
+        arquivo = sys.stdin
+    elif str(caminho).endswith(".gz"):
+        import gzip
+        arquivo = gzip.open(caminho, "rt", encoding="utf-8")
+    else:
+        arquivo = open(caminho, encoding="utf-8")
+    try:
+        for numero, linha in enumerate(arquivo, 1):
+            linha = linha.strip()
+            if linha and not linha.startswith("#"):
+                yield numero, linha
+    finally:
+        if arquivo is not sys.stdin:
+            arquivo.close()
+
+
+def decodificar(linhas):
+    """Gera (número, objeto) a partir das linhas"""
+    for numero, linha in linhas:
+        try:
+            registro = json.loads(linha)
+        except json.JSONDecodeError as erro:
+            raise ValueError(f"linha {numero}: JSON inválido ({erro.msg})") from None
+        if not isinstance(registro, dict):
+            raise ValueError(f"linha {numero}: esperava um objeto")
+        yield numero, registro
+
+
+def interpretar(registros):
+    """Gera (RECURSO, item_id) e (TRANSACAO, dict da transação), conferindo o formato"""
+    ultima_chegada = 0.0
+    transacoes = 0
+    for numero, registro in registros:
+        if RECURSO in registro:
+            yield RECURSO, str(registro[RECURSO])
+        elif TRANSACAO in registro:
+            transacoes += 1
+            transacao = _transacao(numero, registro, transacoes)
+            if transacao['chegada'] < ultima_chegada:
+                raise ValueError(f"linha {numero}: chegada {transacao['chegada']} antes da anterior ({ultima_chegada})")
+            ultima_chegada = transacao['chegada']
+            yield TRANSACAO, transacao
+        else:
+            raise ValueError(f"linha {numero}: esperava \"{RECURSO}\" ou \"{TRANSACAO}\"")
+
+
+def _transacao(numero, registro, ordem):
+    try:
+        tempo = float(registro['tempo'])
+        chegada = float(registro.get('chegada', 0.0))
+        prioridade = float(registro.get('prioridade', tempo))
+    except KeyError:
+        raise ValueError(f"linha {numero}: transação sem \"tempo\"") from None
+    except (TypeError, ValueError):
+        raise ValueError(f"linha {numero}: tempo, chegada e prioridade são números") from None
+    acessos = registro.get('acessos')
+    if acessos is None:
+        acessos = [registro] if 'ler' in registro or 'escrever' in registro else []
+    if not isinstance(acessos, list):
+        raise ValueError(f"linha {numero}: \"acessos\" é uma lista")
+    roteiro = []
+    for acesso in acessos:
+        if not isinstance(acesso, dict):
+            raise ValueError(f"linha {numero}: cada acesso é um objeto")
+        try:
+            # Um recurso lido e escrito no mesmo acesso é escrito
+            pedidos = {str(item_id): "ler" for item_id in acesso.get('ler', ())}
+            pedidos.update((str(item_id), "escrever") for item_id in acesso.get('escrever', ()))
+        except TypeError:
+            raise ValueError(f"linha {numero}: ler e escrever são listas de recursos") from None
+        if not pedidos:
+            raise ValueError(f"linha {numero}: acesso sem recursos")
+        retencao = acesso.get('retencao')
+        try:
+            retencao = None if retencao is None else float(retencao)
+        except (TypeError, ValueError):
+            raise ValueError(f"linha {numero}: retenção é um número") from None
+        roteiro.append((tuple(pedidos.items()), retencao))
+    return {
+        'nome': str(registro[TRANSACAO]) if registro[TRANSACAO] is not None else str(ordem),
+        'chegada': chegada,
+        'tempo': tempo,
+        'prioridade': prioridade,
+        'roteiro': roteiro,
+    }
+
+
+def ler_carga(caminho):
+    """Itens da carga do arquivo, lidos conforme são consumidos"""
+    return interpretar(decodificar(ler_linhas(caminho)))
@@ -0,0 +1,137 @@
+"""Detecção automática e incremental de deadlocks.
+
+O grafo de espera (quem espera -> quem está acessando) não é guardado à parte:
+as arestas saem direto dos recursos_desejados de cada thread e, em cada
+recurso, de quem a segura ali (ver RecursoCompartilhavel.bloqueadores),
+então estão sempre atualizadas. Cada vez
+que uma aresta nova aparece (uma thread entra na fila, ou um recurso com fila
+é concedido) o recurso avisa o detector, que procura um ciclo só a partir da
+thread envolvida: todo ciclo novo passa por ela, então não é preciso varrer o
+grafo inteiro.
+"""
+import threading
+import time
+from collections import deque
+
+from vitimas import CustoAborto
+
+
+class DetectorDeadlock:
+    def __init__(self, ao_detectar=None, escolher_vitima=None):
+        self.ao_detectar = ao_detectar or (lambda vitima, ciclo: vitima.morrer())
+        # Por padrão, a vítima que faz perder menos trabalho (ver vitimas.py)
+        self.escolher_vitima = escolher_vitima or CustoAborto()
+        self.ativo = True
+        self.pendentes = deque()  # (thread, instante do aviso)
+        # Métricas
+        self.verificacoes = 0
+        self.deadlocks = 0
+        self.tempo_total_deteccao = 0.0
+        self.tempo_max_deteccao = 0.0
+        self.historico = deque(maxlen=1000)  # Últimos deadlocks resolvidos
+        self.registro_metricas = None  # Registro de métricas avisado a cada deadlock, opcional
+        # Execução em segundo plano (opcional)
+        self.sinal = threading.Event()
+        self.thread = None
+
+    @staticmethod
+    def sucessores(thread):
+        """Threads pelas quais `thread` está esperando, em cada recurso que ela deseja (ver bloqueadores)"""
+        for recurso in list(thread.recursos_desejados):
+            yield from recurso.bloqueadores(thread)
+
+    @staticmethod
+    def esperada(thread):
+        """Alguém pode estar esperando por `thread`: ela segura um recurso ou tem alguém atrás dela numa fila"""
+        if thread.recursos_acesso:
+            return True
+        return any(recurso.esperam_atras(thread) for recurso in list(thread.recursos_desejados))
+
+    def verificar(self, thread):
+        """Avisa que `thread` ganhou arestas novas no grafo de espera"""
+        if self.ativo:
+            self.pendentes.append((thread, time.perf_counter()))
+            self.sinal.set()
+
+    def procurar_ciclo(self, origem):
+        """Procura um ciclo que passe por `origem` e retorna suas threads em ordem, ou None"""
+        pais = {origem: None}
+        pilha = [origem]
+        while pilha:
+            atual = pilha.pop()
+            for proxima in self.sucessores(atual):
+                if proxima is origem:
+                    ciclo = [atual]
+                    while pais[ciclo[-1]] is not None:
+                        ciclo.append(pais[ciclo[-1]])
+                    ciclo.reverse()
+                    return ciclo
+                if proxima not in pais:
+                    pais[proxima] = atual
+                    pilha.append(proxima)
+        return None
+
+    def ciclo_valido(self, ciclo):
+        """Confere se todas as arestas do ciclo ainda existem"""
+        for i, thread in enumerate(ciclo):
+            if ciclo[(i + 1) % len(ciclo)] not in self.sucessores(thread):
+                return False
+        return True
+
+    def processar(self):
+        """Trata os avisos pendentes, abortando uma vítima por ciclo encontrado"""
+        while self.pendentes:
+            thread, instante = self.pendentes.popleft()
+            # Avisos seguidos da mesma thread (um pedido atômico entrando em várias filas):
+            # a busca olha o grafo de agora, então uma cobre todos
+            while self.pendentes and self.pendentes[0][0] is thread:
+                self.pendentes.popleft()
+            self.verificacoes += 1
+            # Quem não segura nada nem tem ninguém atrás dela na fila não é esperado por ninguém,
+            # então não fecha ciclo (quem chegar atrás dela é verificado quando chegar)
+            if not self.esperada(thread):
+                continue
+            ciclo = self.procurar_ciclo(thread)
+            if not ciclo or not self.ciclo_valido(ciclo):
+                continue
+            vitima = self.escolher_vitima(ciclo)
+            tempo_deteccao = time.perf_counter() - instante
+            self.deadlocks += 1
+            self.tempo_total_deteccao += tempo_deteccao
+            self.tempo_max_deteccao = max(self.tempo_max_deteccao, tempo_deteccao)
+            self.historico.append({
+                'ciclo': [t.nome for t in ciclo],
+                'vitima': vitima.nome,
+                'tempo_deteccao': tempo_deteccao
+            })
+            if self.registro_metricas:
+                self.registro_metricas.deadlock(vitima, ciclo)
+            self.ao_detectar(vitima, ciclo)
+            # A thread pode estar em mais de um ciclo: verifica de novo se ela sobreviveu.
+            # Se o ciclo continua de pé, a vítima será abortada depois (ex.: na thread do Tk)
+            # e a liberação dos recursos dela avisará o detector outra vez
+            if vitima is not thread and not self.ciclo_valido(ciclo):
+                self.pendentes.append((thread, instante))
+
+    def iniciar(self):
+        """Roda o detector numa thread própria, acordada a cada aviso"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._executar, daemon=True)
+            self.thread.start()
+
+    def _executar(self):
+        while True:
+            self.sinal.wait()
+            self.sinal.clear()
+            self.processar()
+
+    def metricas(self):
+        metricas = {
+            'verificacoes': self.verificacoes,
+            'deadlocks': self.deadlocks,
+            'tempo_medio_deteccao': self.tempo_total_deteccao / self.deadlocks if self.deadlocks else 0.0,
+            'tempo_max_deteccao': self.tempo_max_deteccao,
+        }
+        if isinstance(self.escolher_vitima, CustoAborto):
+            metricas.update(self.escolher_vitima.metricas())
+        return metricas
@@ -0,0 +1,255 @@
+"""Estimativa rápida de conflitos, abortos e espera, sem simular.
+
+Antes de rodar a simulação completa, dá para perguntar "com N threads, M
+recursos, esta fração de leitura e estes tempos de acesso, quanto aborta e
+quanto se espera?". Aqui cada rodada é um pedido de acesso (o que
+tentar_acessar_recursos faz) num instante sorteado da vida de uma thread,
+contra um retrato das outras, e milhares de rodadas saem de uma vez em
+operações de arrays do NumPy.
+
+O retrato das outras threads é simplificado: todas chegam juntas (como em
+gerar_threads_aleatorias), cada uma continua ativa enquanto não terminou nem
+foi abortada, e uma thread ativa está com um recurso, na fila de um ou
+executando, na proporção dos tempos médios de cada coisa. O pedido espera o
+resto do acesso dos donos em conflito mais um acesso inteiro por thread mais
+antiga na fila, e a política decide quem aborta. A espera média e a taxa de
+aborto entram de novo no retrato até estabilizar. Ficam de fora deadlocks
+(o detector) e a ordem exata dos eventos: para isso, a simulação.
+
+    python estimativa.py --threads 20 --recursos 2 --politica wound-wait --comparar 10
+
+Precisa do NumPy, que é opcional para o resto do projeto.
+"""
+import argparse
+import math
+import time
+
+try:
+    import numpy as np
+except ImportError:  # Só a estimativa precisa dele
+    np = None
+
+from politicas import POLITICAS, criar_politica
+
+INTERVALO_MIN_ACESSO = 1  # Intervalo entre tentativas de acesso, como na MinhaThread
+INTERVALO_MAX_ACESSO = 3
+ITERACOES = 8  # Voltas do ponto fixo (espera e abortos realimentam o retrato)
+ELEMENTOS_POR_LOTE = 2_000_000  # Rodadas × threads processadas de cada vez
+
+
+def estimar(threads=3, recursos=2, tempo_min=15, tempo_max=30, tempo_min_rec=15, tempo_max_rec=30,
+            politica="esperar", tempo_limite=5, fracao_leitura=0.5, recursos_por_acesso=1,
+            rodadas=5000, semente=None):
+    """Estima taxa de aborto, chance de conflito e espera média
+
+    Os parâmetros são os campos da Aplicacao: tempo das threads, tempo de
+    acesso aos recursos, política e tempo limite, quantidade de threads e
+    semente. Retorna um dict com as mesmas chaves do resumo do Simulador
+    onde a métrica é a mesma (taxa_aborto, espera_media).
+    """
+    if np is None:
+        raise ImportError("A estimativa vetorizada precisa do NumPy (pip install numpy)")
+    nome_politica = criar_politica(politica, tempo_limite).nome
+    inicio = time.perf_counter()
+    rng = np.random.default_rng(semente)
+    tempo_min, tempo_max = sorted((tempo_min, tempo_max))
+    tempo_min_rec, tempo_max_rec = sorted((tempo_min_rec, tempo_max_rec))
+    recursos_por_acesso = max(1, min(recursos_por_acesso, recursos))
+    retencao_media = (tempo_min_rec + tempo_max_rec) / 2
+    intervalo_medio = (INTERVALO_MIN_ACESSO + INTERVALO_MAX_ACESSO) / 2
+
+    # Sorteios fixos entre as voltas do ponto fixo (números aleatórios comuns)
+    lote = max(1, min(rodadas, ELEMENTOS_POR_LOTE // max(threads, 1)))
+    lotes = []
+    for primeira in range(0, rodadas, lote):
+        lotes.append(_sortear(rng, min(lote, rodadas - primeira), threads, recursos, tempo_min, tempo_max,
+                              tempo_min_rec, tempo_max_rec, fracao_leitura, recursos_por_acesso))
+
+    espera_media = 0.0
+    abortos_por_thread = 0.0
+    for _ in range(ITERACOES):
+        # Fração do tempo de vida de uma thread ativa com recurso e na fila
+        ciclo = intervalo_medio + retencao_media + espera_media
+        fracao_retencao = retencao_media / ciclo
+        fracao_fila = espera_media / ciclo
+        soma = {'abortos': 0.0, 'conflitos': 0.0, 'espera': 0.0, 'concedidos': 0.0, 'abortos_thread': 0.0}
+        for sorteio in lotes:
+            parcial = _rodadas(sorteio, nome_politica, tempo_limite, retencao_media, intervalo_medio,
+                               fracao_retencao, fracao_fila, abortos_por_thread)
+            for chave in soma:
+                soma[chave] += parcial[chave]
+        nova_espera = soma['espera'] / soma['concedidos'] if soma['concedidos'] else 0.0
+        abortos_por_thread = soma['abortos_thread'] / rodadas
+        # Amortece: com muita contenção a espera oscila de uma volta para outra
+        espera_media = nova_espera if espera_media == 0 else (espera_media + nova_espera) / 2
+
+    return {
+        'politica': nome_politica,
+        'threads': threads,
+        'recursos': recursos,
+        'rodadas': rodadas,
+        'prob_conflito': soma['conflitos'] / rodadas,
+        'abortos_por_pedido': soma['abortos'] / rodadas,
+        'taxa_aborto': 1 - math.exp(-abortos_por_thread),
+        'espera_media': espera_media,
+        'tempo_real': time.perf_counter() - inicio,
+    }
+
+
+def _sortear(rng, rodadas, threads, recursos, tempo_min, tempo_max, tempo_min_rec, tempo_max_rec,
+             fracao_leitura, recursos_por_acesso):
+    """Sorteios de um lote: a thread que pede é a coluna 0, as outras formam o retrato"""
+    outras = threads - 1
+    # Tempo de execução de cada thread, que também é o timestamp (a prioridade)
+    tempos = rng.uniform(tempo_min, tempo_max, (rodadas, threads))
+    # Em que ponto da vida da thread 0 o pedido acontece
+    momento = rng.random(rodadas)
+    # Retenção em curso num instante qualquer: as longas aparecem mais (viés de tamanho),
+    # e do acesso em curso falta uma fração uniforme
+    if tempo_max_rec > tempo_min_rec:
+        longa = np.sqrt(tempo_min_rec ** 2 + rng.random((rodadas, outras)) * (tempo_max_rec ** 2 - tempo_min_rec ** 2))
+    else:
+        longa = np.full((rodadas, outras), float(tempo_min_rec))
+    return {
+        'tempos': tempos,
+        'momento': momento,
+        'estado': rng.random((rodadas, outras)),  # Comparado às frações de retenção e de fila
+        'sobrevive': rng.random((rodadas, outras)),  # Comparado à chance de não ter sido abortada
+        'recurso_outras': rng.integers(0, recursos, (rodadas, outras)),
+        'escreve_outras': rng.random((rodadas, outras)) >= fracao_leitura,
+        'restante': longa * rng.random((rodadas, outras)),
+        'recurso_pedido': _sem_repeticao(rng, rodadas, recursos, recursos_por_acesso),
+        'escreve_pedido': rng.random((rodadas, recursos_por_acesso)) >= fracao_leitura,
+    }
+
+
+def _sem_repeticao(rng, rodadas, recursos, quantidade):
+    """`quantidade` recursos distintos por rodada, como Simulador.escolher_recursos"""
+    if quantidade == 1:
+        return rng.integers(0, recursos, (rodadas, 1))
+    return np.argsort(rng.random((rodadas, recursos)), axis=1)[:, :quantidade]
+
+
+def _rodadas(sorteio, politica, tempo_limite, retencao_media, intervalo_medio, fracao_retencao, fracao_fila,
+             abortos_por_thread):
+    tempos = sorteio['tempos']
+    minha_prioridade = tempos[:, :1]
+    outras_prioridades = tempos[:, 1:]
+    # Todas chegaram juntas: no instante do pedido seguem ativas as que executam por mais tempo
+    # (o tempo em fila e com recursos estica todas na mesma proporção) e que não foram abortadas
+    decorrido = sorteio['momento'][:, None] * minha_prioridade
+    ativa = outras_prioridades > decorrido
+    ativa &= sorteio['sobrevive'] < np.exp(-abortos_por_thread * decorrido / outras_prioridades)
+    retem = ativa & (sorteio['estado'] < fracao_retencao)
+    na_fila = ativa & ~retem & (sorteio['estado'] < fracao_retencao + fracao_fila)
+
+    recurso_outras = sorteio['recurso_outras']
+    escreve_outras = sorteio['escreve_outras']
+    mais_antiga = outras_prioridades < minha_prioridade
+    rodadas = tempos.shape[0]
+    conflito = np.zeros(rodadas, dtype=bool)
+    aborta = np.zeros(rodadas, dtype=bool)  # A thread que pede morre
+    feridas = np.zeros(rodadas)  # Donos abortados pelo pedido (wound-wait)
+    espera = np.zeros(rodadas)
+    for coluna in range(sorteio['recurso_pedido'].shape[1]):
+        recurso = sorteio['recurso_pedido'][:, coluna:coluna + 1]
+        escreve = sorteio['escreve_pedido'][:, coluna:coluna + 1]
+        mesmo = recurso_outras == recurso
+        # Leitores dividem o recurso; escrita conflita com tudo
+        donos = retem & mesmo & (escreve | escreve_outras)
+        tem_dono = donos.any(axis=1)
+        conflito |= tem_dono
+        donos_antigos = donos & mais_antiga
+        if politica == "no-wait":
+            aborta |= tem_dono
+            bloqueiam = donos
+        elif politica == "wait-die":
+            aborta |= donos_antigos.any(axis=1)
+            bloqueiam = donos
+        elif politica == "wound-wait":
+            feridas += (donos & ~mais_antiga).sum(axis=1)
+            bloqueiam = donos_antigos
+        else:
+            bloqueiam = donos
+        # Espera o resto do acesso dos donos e um acesso inteiro por thread mais antiga na fila
+        resto = np.where(bloqueiam, sorteio['restante'], 0.0).max(axis=1, initial=0.0)
+        a_frente = (na_fila & mesmo & mais_antiga).sum(axis=1)
+        espera_recurso = np.where(tem_dono | (a_frente > 0), resto + a_frente * retencao_media, 0.0)
+        espera = np.maximum(espera, espera_recurso)
+    if politica == "timeout":
+        aborta |= espera > tempo_limite
+    concedido = ~aborta
+    # Pedidos que a thread faz na vida: um a cada intervalo de execução
+    pedidos = minha_prioridade[:, 0] / intervalo_medio
+    abortos = aborta + feridas
+    return {
+        'abortos': abortos.sum(),
+        'conflitos': conflito.sum(),
+        'espera': espera[concedido].sum(),
+        'concedidos': concedido.sum(),
+        'abortos_thread': (pedidos * abortos).sum(),
+    }
+
+
+def comparar(parametros, sementes):
+    """Roda o Simulador com os mesmos parâmetros; média e IC de 95% de cada métrica"""
+    from simulacao import Simulador
+    from varredura import intervalo_confianca
+    valores = {'taxa_aborto': [], 'espera_media': []}
+    for semente in sementes:
+        simulador = Simulador([f"R{i}" for i in range(parametros['recursos'])], semente=semente,
+                              politica=criar_politica(parametros['politica'], parametros['tempo_limite']),
+                              metricas=False)
+        simulador.gerar_transacoes(parametros['threads'], tempo_min=parametros['tempo_min'],
+                                   tempo_max=parametros['tempo_max'], tempo_min_acesso=parametros['tempo_min_rec'],
+                                   tempo_max_acesso=parametros['tempo_max_rec'],
+                                   recursos_por_acesso=parametros['recursos_por_acesso'],
+                                   fracao_leitura=parametros['fracao_leitura'])
+        resumo = simulador.executar()
+        for metrica in valores:
+            valores[metrica].append(resumo[metrica])
+    return {metrica: intervalo_confianca(lista) for metrica, lista in valores.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estimativa vetorizada de abortos e espera (NumPy)")
+    parser.add_argument("--threads", type=int, default=3)
+    parser.add_argument("--recursos", type=int, default=2)
+    parser.add_argument("--tempo", type=float, nargs=2, default=(15.0, 30.0), metavar=("MIN", "MAX"),
+                        help="Tempo de execução de cada thread (s)")
+    parser.add_argument("--acesso", type=float, nargs=2, default=(15.0, 30.0), metavar=("MIN", "MAX"),
+                        help="Tempo de acesso a cada recurso (s)")
+    parser.add_argument("--politica", choices=list(POLITICAS), default="esperar")
+    parser.add_argument("--tempo-limite", type=float, default=5.0, help="Tempo limite da política timeout")
+    parser.add_argument("--fracao-leitura", type=float, default=0.5)
+    parser.add_argument("--recursos-por-acesso", type=int, default=1)
+    parser.add_argument("--rodadas", type=int, default=5000)
+    parser.add_argument("--semente", type=int, default=None)
+    parser.add_argument("--comparar", type=int, default=0, metavar="SEMENTES",
+                        help="Confere com essa quantidade de simulações completas")
+    args = parser.parse_args()
+
+    parametros = {
+        'threads': args.threads,
+        'recursos': args.recursos,
+        'tempo_min': args.tempo[0],
+        'tempo_max': args.tempo[1],
+        'tempo_min_rec': args.acesso[0],
+        'tempo_max_rec': args.acesso[1],
+        'politica': args.politica,
+        'tempo_limite': args.tempo_limite,
+        'fracao_leitura': args.fracao_leitura,
+        'recursos_por_acesso': args.recursos_por_acesso,
+    }
+    try:
+        estimativa = estimar(rodadas=args.rodadas, semente=args.semente, **parametros)
+    except ImportError as erro:
+        parser.exit(1, f"{erro}\n")
+    for chave, valor in estimativa.items():
+        print(f"{chave}: {valor:.4f}" if isinstance(valor, float) else f"{chave}: {valor}")
+    if args.comparar:
+        inicio = args.semente or 0
+        simulado = comparar(parametros, range(inicio, inicio + args.comparar))
+        print(f"\n{'':<14}{'estimativa':>12}{'simulacao':>12}{'ic95':>10}")
+        for metrica, (media, margem) in simulado.items():
+            print(f"{metrica:<14}{estimativa[metrica]:>12.4f}{media:>12.4f}{margem:>10.4f}")
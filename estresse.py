@@ -0,0 +1,241 @@
+"""Estresse da tabela de latches: muitas threads pedindo os mesmos recursos.
+
+Cada thread de trabalho repete: sorteia um recurso e uma operação, pede
+(pelo acessar, que pode ir para a fila, ou pelo tentar_acessar), segura um
+pouco e libera. Uma fração dos pedidos (--fracao-conjunto) é de dois
+recursos de uma vez, por um PedidoConjunto atômico: ele reserva lugar nas
+filas e volta a pedir a cada conjunto_liberado.
+
+Um fiscal, com lock próprio, anota quem está dentro de cada recurso: a
+entrada logo depois da concessão (direta, pela fila no recurso_concedido ou
+do conjunto inteiro) e a saída logo antes da liberação. O intervalo anotado
+fica dentro do intervalo real, então o fiscal só vê dois donos quando eles
+existiram de fato. Ao fim, acusa:
+
+- donos em dobro: dois escritores, ou escritor com leitor, no mesmo recurso;
+- concessões perdidas: pedido que foi para a fila (ou conjunto que
+  reservou lugar nelas) e não foi concedido dentro do tempo limite (os
+  donos seguram por milissegundos);
+- recursos sujos: recurso que não voltou a unlock, sem donos, sem fila e
+  sem interessadas depois que todo mundo liberou.
+
+A troca de thread do interpretador fica bem mais frequente que o normal
+(--troca) para as corridas aparecerem mesmo com GIL e um núcleo só:
+
+    python estresse.py --threads 16 --recursos 8 --operacoes 5000
+    python estresse.py --fragmentos 1      # um latch só para todos os recursos
+
+Sai com código 1 se achar qualquer problema. O test_estresse.py roda as
+mesmas conferências numa configuração pequena (8 threads, 4 recursos, 1000
+operações); este script fica para as rodadas pesadas, fora do pytest.
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+
+from recursos import ConjuntoRecursos, PedidoConjunto, RecursoCompartilhavel, RecursosDesejados, TabelaLatches
+
+
+class Fiscal:
+    """Confere, por fora dos recursos, que ninguém divide o que não pode"""
+    def __init__(self):
+        self.donos = {}  # recurso -> {transação: operação}
+        self._lock = threading.Lock()
+        self.concessoes = 0
+        self.em_dobro = 0
+        self.perdidas = 0
+        self.exemplos = []
+
+    def _anotar(self, problema):
+        if len(self.exemplos) < 10:
+            self.exemplos.append(problema)
+
+    def entrou(self, recurso, transacao, operacao):
+        with self._lock:
+            self.concessoes += 1
+            donos = self.donos.setdefault(recurso, {})
+            if donos and (operacao == "escrever" or "escrever" in donos.values()):
+                self.em_dobro += 1
+                self._anotar(f"{recurso.item_id}: {transacao.nome} ({operacao}) entrou com {donos}")
+            donos[transacao] = operacao
+
+    def saiu(self, recurso, transacao):
+        with self._lock:
+            self.donos.get(recurso, {}).pop(transacao, None)
+
+    def perdida(self, recurso, transacao):
+        with self._lock:
+            self.perdidas += 1
+            self._anotar(f"{recurso.item_id}: {transacao.nome} esperou sem receber o recurso")
+
+
+class TransacaoEstresse:
+    """Transação mínima: só o que os recursos consultam, mais o aviso de concessão"""
+    def __init__(self, nome, fiscal):
+        self.nome = nome
+        self.prioridade = 0.0
+        self.estado = "executando"
+        self.recursos_acesso = ConjuntoRecursos()
+        self.recursos_desejados = RecursosDesejados(self)
+        self.fiscal = fiscal
+        self.pedido = None  # Operação do pedido em andamento
+        self.conjunto = None  # PedidoConjunto em andamento
+        self.concedido = threading.Event()
+        # Separado do concedido: um aviso atrasado do conjunto anterior não pode passar
+        # por concessão de um pedido pela fila
+        self.liberado = threading.Event()
+
+    def __repr__(self):
+        return self.nome
+
+    def recurso_concedido(self, recurso):
+        self.recursos_desejados.discard(recurso)
+        self.fiscal.entrou(recurso, self, self.pedido)
+        self.concedido.set()
+
+    def recurso_liberado(self, recurso):
+        # Quem está na fila recebe o recurso pelo recurso_concedido; este aviso só importa
+        # ao pedido atômico, que pode ter ficado sem aviso da fila
+        self.conjunto_liberado(recurso)
+
+    def conjunto_liberado(self, recurso):
+        # Como na simulação: só acorda o pedido atômico quando o conjunto inteiro está livre
+        conjunto = self.conjunto
+        if conjunto is not None and conjunto.pronto():
+            self.liberado.set()
+
+    def morrer(self):
+        raise RuntimeError("a política do estresse não aborta ninguém")
+
+
+def pedir_conjunto(transacao, pedidos, limite):
+    """Pede os recursos de uma vez (PedidoConjunto atômico); retorna False se a concessão se perdeu"""
+    conjunto = PedidoConjunto(transacao, pedidos)
+    transacao.conjunto = conjunto
+    try:
+        while True:
+            # Limpa antes de pedir: um aviso durante o avancar vale para a próxima volta
+            transacao.liberado.clear()
+            if conjunto.avancar():
+                return True
+            if not transacao.liberado.wait(limite):
+                for recurso, _ in conjunto.pendentes:
+                    transacao.fiscal.perdida(recurso, transacao)
+                    recurso.cancelar(transacao)
+                    transacao.recursos_desejados.discard(recurso)
+                return False
+    finally:
+        transacao.conjunto = None
+
+
+def trabalhar(transacao, recursos, operacoes, fracao_leitura, fracao_tentativa, fracao_conjunto, retencao, limite,
+              rng):
+    fiscal = transacao.fiscal
+    for _ in range(operacoes):
+        transacao.prioridade = time.monotonic()
+        if rng.random() < fracao_conjunto:
+            pedidos = [(recurso, "ler" if rng.random() < fracao_leitura else "escrever")
+                       for recurso in rng.sample(recursos, 2)]
+            if not pedir_conjunto(transacao, pedidos, limite):
+                return
+            for recurso, operacao in pedidos:
+                fiscal.entrou(recurso, transacao, operacao)
+            if retencao:
+                time.sleep(rng.uniform(0, retencao))
+            for recurso, _ in pedidos:
+                fiscal.saiu(recurso, transacao)
+                transacao.recursos_acesso.discard(recurso)
+                recurso.liberar(transacao)
+            continue
+        recurso = rng.choice(recursos)
+        operacao = "ler" if rng.random() < fracao_leitura else "escrever"
+        transacao.pedido = operacao
+        transacao.concedido.clear()
+        if rng.random() < fracao_tentativa:
+            if not recurso.tentar_acessar(transacao, operacao):
+                continue
+            fiscal.entrou(recurso, transacao, operacao)
+        else:
+            transacao.recursos_desejados.append(recurso)
+            if recurso.acessar(transacao, operacao):
+                transacao.recursos_desejados.discard(recurso)
+                fiscal.entrou(recurso, transacao, operacao)
+            elif not transacao.concedido.wait(limite):
+                # Perdida: desiste e para esta thread (o cancelar libera se a concessão vier agora)
+                fiscal.perdida(recurso, transacao)
+                recurso.cancelar(transacao)
+                transacao.recursos_desejados.discard(recurso)
+                return
+        if retencao:
+            time.sleep(rng.uniform(0, retencao))
+        fiscal.saiu(recurso, transacao)
+        recurso.liberar(transacao)
+
+
+def estressar(threads=16, recursos=8, operacoes=5000, fracao_leitura=0.5, fracao_tentativa=0.2,
+              fracao_conjunto=0.0, retencao=0.0, preferencia="justa", fragmentos=64, troca=1e-5, limite=10.0,
+              semente=None):
+    """Roda o estresse e retorna as contagens (tudo zero menos concessões = sem problemas)"""
+    rng = random.Random(semente)
+    latches = TabelaLatches(fragmentos)
+    lista = [RecursoCompartilhavel(f"R{i}", preferencia=preferencia, latches=latches) for i in range(recursos)]
+    fiscal = Fiscal()
+    trabalhadores = []
+    for i in range(threads):
+        transacao = TransacaoEstresse(f"T{i + 1}", fiscal)
+        argumentos = (transacao, lista, operacoes, fracao_leitura, fracao_tentativa, fracao_conjunto, retencao, limite,
+                      random.Random(rng.randrange(2 ** 32)))
+        trabalhadores.append(threading.Thread(target=trabalhar, args=argumentos, daemon=True))
+
+    troca_anterior = sys.getswitchinterval()
+    sys.setswitchinterval(troca)
+    inicio = time.perf_counter()
+    try:
+        for thread in trabalhadores:
+            thread.start()
+        for thread in trabalhadores:
+            thread.join()
+    finally:
+        sys.setswitchinterval(troca_anterior)
+    tempo_real = time.perf_counter() - inicio
+
+    sujos = [recurso.item_id for recurso in lista
+             if recurso.lock != "unlock" or recurso.threads_acessando or len(recurso.fila) or recurso.interessadas]
+    return {
+        'concessoes': fiscal.concessoes,
+        'donos_em_dobro': fiscal.em_dobro,
+        'concessoes_perdidas': fiscal.perdidas,
+        'recursos_sujos': len(sujos),
+        'exemplos': fiscal.exemplos + [f"{item_id}: não voltou ao estado livre" for item_id in sujos[:10]],
+        'tempo_real': tempo_real,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Estresse dos latches dos recursos: donos em dobro e concessões perdidas")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--recursos", type=int, default=8)
+    parser.add_argument("--operacoes", type=int, default=5000, help="Pedidos de cada thread")
+    parser.add_argument("--fracao-leitura", type=float, default=0.5)
+    parser.add_argument("--fracao-tentativa", type=float, default=0.2,
+                        help="Fração dos pedidos feitos com tentar_acessar (sem fila)")
+    parser.add_argument("--fracao-conjunto", type=float, default=0.0,
+                        help="Fração dos pedidos de dois recursos de uma vez (PedidoConjunto atômico)")
+    parser.add_argument("--retencao", type=float, default=0.0, help="Tempo máximo segurando o recurso (s)")
+    parser.add_argument("--preferencia", choices=["justa", "leitores", "escritores"], default="justa")
+    parser.add_argument("--fragmentos", type=int, default=64, help="Fragmentos da tabela de latches")
+    parser.add_argument("--troca", type=float, default=1e-5, help="Intervalo de troca de thread (sys.setswitchinterval)")
+    parser.add_argument("--limite", type=float, default=10.0, help="Espera na fila que conta como concessão perdida (s)")
+    parser.add_argument("--semente", type=int, default=None)
+    args = parser.parse_args()
+
+    resultado = estressar(args.threads, args.recursos, args.operacoes, args.fracao_leitura, args.fracao_tentativa,
+                          args.fracao_conjunto, args.retencao, args.preferencia, args.fragmentos, args.troca, args.limite, args.semente)
+    for exemplo in resultado.pop('exemplos'):
+        print(f"  {exemplo}")
+    for chave, valor in resultado.items():
+        print(f"{chave}: {valor:.1f}s" if chave == 'tempo_real' else f"{chave}: {valor}")
+    if resultado['donos_em_dobro'] or resultado['concessoes_perdidas'] or resultado['recursos_sujos']:
+        sys.exit(1)
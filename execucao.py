@@ -0,0 +1,235 @@
+"""Execução de muitas transações em poucas threads.
+
+Com MinhaThread, N transações custam N threads do sistema, N pilhas e N
+laços dormindo. O PoolTransacoes troca isso por um número fixo de threads de
+trabalho e uma agenda única: uma heap de (prazo, versão, transação). Cada
+trabalhador tira da heap a transação com o prazo vencido, roda um passo dela
+e a devolve à agenda com o prazo que ela pedir. acordar() coloca a transação
+de novo na agenda para agora; a entrada antiga fica com a versão velha e é
+descartada quando chegar ao topo. Os estados ("executando",
+"aguardando_recursos", "acessando_recursos", "abortada") e a lógica são os
+mesmos de MinhaThread, ambos vêm de Transacao.
+
+    python execucao.py --transacoes 100000 --trabalhadores 4
+"""
+import argparse
+import heapq
+import itertools
+import random
+import threading
+import time
+
+from deadlock import DetectorDeadlock
+from politicas import POLITICAS, criar_politica
+from prazos import AGENDA_PADRAO
+from recursos import RecursoCompartilhavel
+from reinicio import Reinicio
+from transacao import Transacao
+
+
+class TransacaoAgendada(Transacao):
+    """Transação executada pelo PoolTransacoes; imita start/is_alive/join de MinhaThread"""
+    __slots__ = ('pool', 'no_pool', 'em_passo', 'acordada', 'versao_agenda')
+
+    def __init__(self, *argumentos, pool, **opcoes):
+        super().__init__(*argumentos, **opcoes)
+        self.pool = pool
+        self.no_pool = False  # Entre iniciar e finalizar
+        self.em_passo = False  # Algum trabalhador está rodando um passo dela
+        self.acordada = False  # Foi acordada durante o passo
+        self.versao_agenda = 0  # Invalida as entradas antigas da agenda
+
+    def acordar(self):
+        self.pool.acordar(self)
+
+    def start(self):
+        self.pool.iniciar(self)
+
+    def is_alive(self):
+        return self.no_pool
+
+    def join(self, timeout=None):
+        self.pool.esperar(self, timeout)
+
+
+class PoolTransacoes:
+    def __init__(self, trabalhadores=4):
+        self.trabalhadores = trabalhadores
+        self.agenda = []  # Heap de (prazo, sequência, versão, transação)
+        self.sequencia = itertools.count()  # Desempate: nunca compara transações
+        trava = threading.Lock()
+        self.condicao = threading.Condition(trava)  # Agenda mudou (os trabalhadores esperam nela)
+        self.fim = threading.Condition(trava)  # Alguma transação terminou (esperar() espera nela)
+        self.ativas = 0
+        self.parado = False
+        self._threads = []
+        # Métricas
+        self.passos = 0
+        self.descartadas = 0  # Entradas da agenda que perderam a validade
+
+    def iniciar(self, transacao):
+        """Coloca a transação para rodar; sobe os trabalhadores na primeira vez"""
+        if not self._threads:
+            for i in range(self.trabalhadores):
+                thread = threading.Thread(target=self._trabalhar, name=f"trabalhador-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        transacao.iniciar()
+        with self.condicao:
+            if not transacao.no_pool:
+                transacao.no_pool = True
+                self.ativas += 1
+            self._agendar(transacao, 0)
+
+    def acordar(self, transacao):
+        with self.condicao:
+            if transacao.em_passo:
+                # O trabalhador que está com ela reagenda para agora ao fim do passo
+                transacao.acordada = True
+            elif transacao.no_pool:
+                self._agendar(transacao, 0)
+
+    def _agendar(self, transacao, espera):
+        """Chamado com a condição adquirida"""
+        transacao.versao_agenda += 1
+        heapq.heappush(self.agenda, (time.time() + espera, next(self.sequencia), transacao.versao_agenda, transacao))
+        # Só o trabalhador que dorme pelo topo precisa acordar, mas qualquer um serve
+        self.condicao.notify()
+
+    def _proxima(self):
+        """Espera a próxima transação vencida e a marca como em passo (None = pool parado)"""
+        with self.condicao:
+            while not self.parado:
+                if not self.agenda:
+                    self.condicao.wait()
+                    continue
+                prazo, _, versao, transacao = self.agenda[0]
+                if versao != transacao.versao_agenda:
+                    heapq.heappop(self.agenda)
+                    self.descartadas += 1
+                    continue
+                espera = prazo - time.time()
+                if espera > 0:
+                    self.condicao.wait(espera)
+                    continue
+                heapq.heappop(self.agenda)
+                transacao.versao_agenda += 1
+                transacao.em_passo = True
+                transacao.acordada = False
+                if self.agenda:
+                    # Quem vigiava o topo pode ter sido este trabalhador: passa a vez a outro
+                    self.condicao.notify()
+                return transacao
+            return None
+
+    def _trabalhar(self):
+        while True:
+            transacao = self._proxima()
+            if transacao is None:
+                return
+            # O passo roda fora da condição: ele mexe nos recursos, que podem acordar outras transações
+            terminou = not transacao.em_andamento or transacao.passo()
+            if terminou:
+                transacao.finalizar()
+                espera = None
+            else:
+                espera = transacao.proxima_acao()
+            with self.condicao:
+                self.passos += 1
+                transacao.em_passo = False
+                if terminou:
+                    transacao.no_pool = False
+                    self.ativas -= 1
+                    self.fim.notify_all()
+                elif transacao.acordada:
+                    self._agendar(transacao, 0)
+                elif espera is not None:
+                    self._agendar(transacao, espera)
+
+    def esperar(self, transacao=None, timeout=None):
+        """Espera a transação (ou todas, sem transação) terminar; retorna False se o tempo acabou"""
+        with self.fim:
+            if transacao is None:
+                return self.fim.wait_for(lambda: self.ativas == 0, timeout)
+            return self.fim.wait_for(lambda: not transacao.no_pool, timeout)
+
+    def parar(self):
+        with self.condicao:
+            self.parado = True
+            self.condicao.notify_all()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Transações em tempo real num pool de threads de trabalho")
+    parser.add_argument("--transacoes", type=int, default=100000)
+    parser.add_argument("--recursos", type=int, default=10000)
+    parser.add_argument("--recursos-por-transacao", type=int, default=4,
+                        help="Recursos que cada transação disputa (sorteados entre todos)")
+    parser.add_argument("--trabalhadores", type=int, default=4)
+    parser.add_argument("--tempo", type=float, nargs=2, default=(5.0, 10.0), metavar=("MIN", "MAX"),
+                        help="Tempo de execução de cada transação (s)")
+    parser.add_argument("--acesso", type=float, nargs=2, default=(0.5, 1.0), metavar=("MIN", "MAX"),
+                        help="Tempo de acesso a cada recurso (s)")
+    parser.add_argument("--politica", choices=list(POLITICAS), default="esperar")
+    parser.add_argument("--tempo-limite", type=float, default=5.0, help="Tempo limite da política timeout")
+    parser.add_argument("--reiniciar", action="store_true",
+                        help="Recomeça as transações abortadas com o mesmo timestamp, após um backoff")
+    parser.add_argument("--semente", type=int, default=None)
+    args = parser.parse_args()
+
+    rng = random.Random(args.semente)
+    politica = criar_politica(args.politica, args.tempo_limite)
+    detector = DetectorDeadlock()
+    recursos = []
+    for i in range(args.recursos):
+        recurso = RecursoCompartilhavel(f"R{i}", politica=politica)
+        recurso.detector = detector
+        recursos.append(recurso)
+    detector.iniciar()
+
+    pool = PoolTransacoes(args.trabalhadores)
+    reinicio = Reinicio(rng=random.Random(rng.randrange(2 ** 32))) if args.reiniciar else None
+    transacoes = []
+    for i in range(args.transacoes):
+        transacao = TransacaoAgendada(str(i + 1), prioridade=rng.uniform(*args.tempo),
+                                      recursos=rng.sample(recursos, min(args.recursos_por_transacao, len(recursos))),
+                                      semente=rng.randrange(2 ** 32), reinicio=reinicio, pool=pool)
+        transacao.tempo_min_acesso, transacao.tempo_max_acesso = args.acesso
+        # Sem barra de progresso para atualizar: só acorda quando tem algo a fazer
+        transacao.intervalo_atualizacao = float('inf')
+        transacoes.append(transacao)
+
+    inicio = time.time()
+    for transacao in transacoes:
+        transacao.start()
+    while not pool.esperar(timeout=1):
+        estados = {}
+        for transacao in transacoes:
+            estados[transacao.estado] = estados.get(transacao.estado, 0) + 1
+        print(f"{time.time() - inicio:6.1f}s ativas={pool.ativas} passos={pool.passos} {estados}", flush=True)
+    tempo_real = time.time() - inicio
+    pool.parar()
+
+    abortadas = sum(transacao.estado == "abortada" for transacao in transacoes)
+    print(f"transacoes: {args.transacoes}")
+    print(f"trabalhadores: {args.trabalhadores}")
+    print(f"concluidas: {args.transacoes - abortadas}")
+    print(f"abortadas: {abortadas}")
+    print(f"deadlocks: {detector.deadlocks}")
+    if reinicio:
+        print(f"reinicios: {reinicio.reinicios}")
+    print(f"passos: {pool.passos}")
+    print(f"entradas_descartadas: {pool.descartadas}")
+    print(f"prazos_vencidos: {AGENDA_PADRAO.vencidos}")
+    print(f"atraso_maximo_prazo: {AGENDA_PADRAO.atraso_maximo * 1000:.1f}ms")
+    print(f"tempo_real: {tempo_real:.1f}s")
+    try:
+        import resource
+    except ImportError:  # Windows
+        pass
+    else:
+        # ru_maxrss vem em KiB no Linux
+        print(f"memoria_max: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MiB")
@@ -0,0 +1,409 @@
+"""Recursos em hierarquia (tabela -> página -> linha) com locks de intenção.
+
+Com recursos planos, uma transação que mexe em milhares de linhas faz
+milhares de acessar e deixa milhares de donos e entradas de fila. Aqui os
+recursos formam uma árvore pelo nome: "T/P3/L17" é a linha 17 da página 3
+da tabela T. Ler ou escrever um nó exige antes a intenção nos ancestrais:
+
+    IS   vai ler algo abaixo          IX   vai escrever algo abaixo
+    S    lê o nó e tudo abaixo        X    escreve o nó e tudo abaixo
+    SIX  S mais IX: lê tudo e escreve parte
+
+S e X são os "ler" e "escrever" de sempre. Quem tem S (ou SIX) num nó lê
+qualquer coisa abaixo dele sem pedir mais nada; com X, lê e escreve.
+
+Escalonamento: quando uma transação passaria a segurar mais de
+`limite_escalonamento` nós debaixo do mesmo pai, ela pede o pai inteiro (S
+se só lê, X se escreve) no lugar deles. Um lock no lugar de centenas: a
+tabela de locks e o trabalho do gerenciador ficam limitados, ao custo de
+bloquear mais do que o necessário.
+
+Um nó nunca fica com menos que a intenção que os nós seguros abaixo dele
+precisam: liberar um ancestral com filhos ainda seguros só o rebaixa para
+IS ou IX, e quando o último filho sai a intenção sai junto. Por isso a
+transação pode liberar o que segura em qualquer ordem.
+"""
+import threading
+
+from rastro import registrar
+from recursos import ORDENADA, PedidoConjunto, RecursoCompartilhavel
+
+IS = "IS"
+IX = "IX"
+S = "ler"
+X = "escrever"
+SIX = "SIX"
+MODOS = (IS, IX, S, SIX, X)
+
+SEPARADOR = "/"  # Entre os níveis do nome: tabela/página/linha
+
+# Modos que podem dividir o nó com cada modo
+COMPATIVEIS = {
+    IS: {IS, IX, S, SIX},
+    IX: {IS, IX},
+    S: {IS, S},
+    SIX: {IS},
+    X: set(),
+}
+
+# Modos que valem pelo menos tanto quanto cada modo
+_ACIMA = {IS: {IS, IX, S, SIX, X}, IX: {IX, SIX, X}, S: {S, SIX, X}, SIX: {SIX, X}, X: {X}}
+
+# Intenção que os ancestrais precisam ter para cada modo num nó
+INTENCAO = {IS: IS, S: IS, IX: IX, SIX: IX, X: IX}
+
+# Modos que contam como escrita abaixo (o pai precisa de IX)
+ESCRITA = {IX, SIX, X}
+
+NOMES_LOCK = {None: "unlock", IS: "is_lock", IX: "ix_lock", S: "read_lock", SIX: "six_lock", X: "write_lock"}
+
+
+def supremo(modo, outro):
+    """O menor modo que vale pelos dois (a conversão de quem já tem `modo` e pede `outro`)"""
+    if modo is None:
+        return outro
+    if outro is None or modo in _ACIMA[outro]:
+        return modo
+    if outro in _ACIMA[modo]:
+        return outro
+    return SIX  # S com IX
+
+
+def cobre(modo, pedido):
+    """Quem tem `modo` num ancestral já pode fazer `pedido` abaixo dele sem lock próprio"""
+    return modo == X or (modo in (S, SIX) and pedido in (S, IS))
+
+
+class RecursoHierarquico(RecursoCompartilhavel):
+    """Nó da hierarquia: os cinco modos, com a fila atendida por ordem de chegada
+
+    Quem pede entra se o modo for compatível com o de todos os outros donos
+    (e, para entrar junto com eles, se ninguém mais antigo espera). Na
+    liberação, a fila é atendida em ordem enquanto as entradas forem
+    compatíveis com os donos e entre si; a preferência entre leitores e
+    escritores não se aplica.
+
+    Um nó alto (a tabela) tem uma intenção de quase toda transação em
+    curso. Por isso o modo do grupo e a compatibilidade saem de `modos`,
+    quantos donos há em cada modo, e não de percorrer os donos: o custo de
+    cada pedido e liberação não cresce com o número de donos.
+    """
+    __slots__ = ('pai', 'hierarquia', 'modos')
+
+    def __init__(self, item_id, pai=None, hierarquia=None, **opcoes):
+        super().__init__(item_id, **opcoes)
+        self.pai = pai
+        self.hierarquia = hierarquia
+        self.modos = {}  # modo -> quantos donos estão nele
+
+    def _trocar_modo(self, thread, antes, depois):
+        """Põe a thread em `depois` (None = sai dos donos), mantendo as contagens por modo"""
+        if antes is not None:
+            restantes = self.modos[antes] - 1
+            if restantes:
+                self.modos[antes] = restantes
+            else:
+                del self.modos[antes]
+        if depois is None:
+            del self.threads_acessando[thread]
+        else:
+            self.threads_acessando[thread] = depois
+            self.modos[depois] = self.modos.get(depois, 0) + 1
+
+    def _compativel(self, thread, modo):
+        compativeis = COMPATIVEIS[modo]
+        proprio = self.threads_acessando.get(thread)
+        for modo_dono, quantidade in self.modos.items():
+            # A thread não conflita com ela mesma
+            if modo_dono == proprio:
+                quantidade -= 1
+            if quantidade and modo_dono not in compativeis:
+                return False
+        return True
+
+    def conflitantes(self, thread, operation):
+        modo = supremo(self.threads_acessando.get(thread), operation)
+        if self._compativel(thread, modo):
+            # Pelas contagens por modo, sem percorrer as intenções de todo mundo
+            return []
+        compativeis = COMPATIVEIS[modo]
+        return [dono for dono, modo_dono in list(self.threads_acessando.items())
+                if dono is not thread and modo_dono not in compativeis]
+
+    def primeira_na_frente(self, operation):
+        # A fila anda por ordem de chegada: qualquer entrada segura as que vêm depois
+        return self.fila.primeira()
+
+    def bloqueadores(self, thread):
+        """Aqui a fila anda com donos no nó: quem espera, espera só pelos donos em conflito
+        com o pedido que tem na fila e pela cabeça da fila, que é atendida antes"""
+        # Olhar a cabeça da fila descarta entradas mortas do topo: é uma escrita como as outras
+        self.comecar_escrita()
+        try:
+            propria = self.fila.entrada(thread)
+            if propria is None:
+                return super().bloqueadores(thread)
+            bloqueadores = self.conflitantes(thread, propria['operation'])
+            primeira = self.fila.primeira()
+            if primeira is not None and primeira['thread'] is not thread:
+                bloqueadores.append(primeira['thread'])
+            bloqueadores.extend(self.reservantes(thread))
+            return bloqueadores
+        finally:
+            self.terminar_escrita()
+
+    def esperam_atras(self, thread):
+        # A cabeça da fila é esperada por quem vem atrás, mesmo sem segurar nada
+        return len(self.fila) > 1 and self.fila.entrada(thread) is not None
+
+    def pode_acessar(self, thread, operation):
+        atual = self.threads_acessando.get(thread)
+        if not self._compativel(thread, supremo(atual, operation)):
+            return False
+        if atual is not None or not self.threads_acessando:
+            return True
+        # Entrar junto com outros donos: só se ninguém mais antigo estiver esperando
+        primeira = self.fila.primeira()
+        return primeira is None or primeira['timestamp'] > thread.prioridade
+
+    def _conceder(self, thread, operation):
+        atual = self.threads_acessando.get(thread)
+        if self.registro_metricas and atual is None:
+            self.registro_metricas.concedido(self, thread)
+        operation = supremo(atual, operation)
+        self._trocar_modo(thread, atual, operation)
+        registrar(self.rastro, "concessao", thread, self, operation)
+        self._atualizar_lock()
+        if self.hierarquia:
+            self.hierarquia.mudou(thread, self, atual, operation)
+        if self.fila:
+            self.notificar_espera(thread)
+
+    def _atualizar_lock(self):
+        grupo = None
+        for modo in self.modos:
+            grupo = supremo(grupo, modo)
+        self.operation = grupo
+        self.lock = NOMES_LOCK[grupo]
+        self.atualizar_label()
+
+    def _liberar(self, thread):
+        if thread is None:
+            donos = list(self.threads_acessando)
+        else:
+            atual = self.threads_acessando.get(thread)
+            if atual is None:
+                # Já saiu junto com o último nó abaixo dele
+                return
+            intencao = self.hierarquia.intencao_abaixo(thread, self) if self.hierarquia else None
+            if intencao is not None:
+                # Ainda segura nós abaixo: fica com a intenção que eles precisam
+                if intencao != atual:
+                    self._rebaixar(thread, intencao)
+                return
+            donos = [thread]
+        modos = [self.threads_acessando[dono] for dono in donos]
+        for dono, modo in zip(donos, modos):
+            self._trocar_modo(dono, modo, None)
+        if self.registro_metricas:
+            for dono in donos:
+                self.registro_metricas.liberado(self, dono)
+        self._atualizar_lock()
+        self._entregar(self._retirar_compativeis())
+        if self.hierarquia:
+            for dono, modo in zip(donos, modos):
+                if self.hierarquia.mudou(dono, self, modo, None):
+                    # Era o último nó da thread abaixo do pai: a intenção lá não serve mais
+                    self._fora(self.pai.soltar_intencao, dono)
+
+    def _rebaixar(self, thread, modo):
+        antes = self.threads_acessando[thread]
+        self._trocar_modo(thread, antes, modo)
+        self._atualizar_lock()
+        if self.hierarquia:
+            self.hierarquia.mudou(thread, self, antes, modo)
+        self._entregar(self._retirar_compativeis())
+
+    def _retirar_compativeis(self):
+        """Retira da fila, por ordem de chegada, quem é compatível com os donos e com quem já saiu dela"""
+        concedidas = []
+        modos = []
+        while True:
+            primeira = self.fila.primeira()
+            if primeira is None:
+                break
+            thread = primeira['thread']
+            modo = supremo(self.threads_acessando.get(thread), primeira['operation'])
+            if not self._compativel(thread, modo) or any(outro not in COMPATIVEIS[modo] for outro in modos):
+                break
+            concedidas.append(self.fila.retirar())
+            modos.append(modo)
+        return concedidas
+
+    def _entregar(self, concedidas):
+        if concedidas or not self.fila:
+            super()._entregar(concedidas)
+        else:
+            # A cabeça da fila ainda não cabe: quem está nela continua esperando a vez, sem pedir de
+            # novo (cada pedido repetido voltaria para a fila e acordaria o detector de deadlock).
+            # Só é avisado quem não está na fila, ou já cabe: a conversão de um dono não espera a vez
+            for thread in list(self.interessadas):
+                entrada = self.fila.entrada(thread)
+                if entrada is None or self.pode_acessar(thread, entrada['operation']):
+                    self._fora(thread.recurso_liberado, self)
+        self._avisar_cabeca()
+
+    def _cancelar(self, thread):
+        super()._cancelar(thread)
+        self._avisar_cabeca()
+
+    def _avisar_cabeca(self):
+        # Quem está atrás pode ter passado a esperar por outra cabeça da fila: o detector confere
+        primeira = self.fila.primeira()
+        if primeira is not None:
+            self.notificar_espera(primeira['thread'])
+
+    def resetar(self):
+        super().resetar()
+        self.comecar_escrita()
+        try:
+            self.modos.clear()
+        finally:
+            self.terminar_escrita()
+
+    def soltar_intencao(self, thread):
+        """O último nó que a thread segurava abaixo deste saiu: a intenção aqui não serve mais"""
+        self.comecar_escrita()
+        try:
+            modo = self.threads_acessando.get(thread)
+            if modo in (IS, IX):
+                with registrar(self.rastro, "liberacao", thread, self):
+                    self._liberar(thread)
+            elif modo == SIX:
+                self._rebaixar(thread, S)
+        finally:
+            self.terminar_escrita()
+
+
+class Hierarquia:
+    """Os nós, quanto cada transação segura abaixo de cada nó, e o escalonamento"""
+    def __init__(self, limite_escalonamento=100):
+        self.limite_escalonamento = limite_escalonamento
+        self.nos = {}
+        self._abaixo = {}  # (thread, nó) -> [nós seguros logo abaixo, dos quais em modo de escrita]
+        self._lock = threading.Lock()  # Os nós avisam com os próprios latches adquiridos
+        # Métricas
+        self.travas = 0  # Pares (transação, nó) com lock agora
+        self.travas_max = 0
+        self.escalonamentos = 0
+
+    def adicionar(self, item_id, **opcoes):
+        """Cria o nó; o pai é o prefixo do nome até o último separador, e precisa existir"""
+        caminho_pai = item_id.rpartition(SEPARADOR)[0]
+        no = RecursoHierarquico(item_id, pai=self.nos[caminho_pai] if caminho_pai else None,
+                                hierarquia=self, **opcoes)
+        self.nos[item_id] = no
+        return no
+
+    def mudou(self, thread, recurso, antes, depois):
+        """O modo da thread no recurso mudou; True se o pai ficou sem nenhum nó dela abaixo"""
+        with self._lock:
+            if antes is None:
+                self.travas += 1
+                self.travas_max = max(self.travas_max, self.travas)
+            elif depois is None:
+                self.travas -= 1
+            if recurso.pai is None:
+                return False
+            chave = (thread, recurso.pai)
+            contagem = self._abaixo.get(chave)
+            if contagem is None:
+                contagem = self._abaixo[chave] = [0, 0]
+            contagem[0] += (depois is not None) - (antes is not None)
+            contagem[1] += (depois in ESCRITA) - (antes in ESCRITA)
+            if contagem[0]:
+                return False
+            del self._abaixo[chave]
+            return True
+
+    def intencao_abaixo(self, thread, recurso):
+        """Intenção que os nós seguros pela thread abaixo do recurso precisam (None = nenhum)"""
+        contagem = self._abaixo.get((thread, recurso))
+        if contagem is None:
+            return None
+        return IX if contagem[1] else IS
+
+    def _coberto(self, thread, recurso, modo, alvos):
+        ancestral = recurso.pai
+        while ancestral is not None:
+            if cobre(supremo(ancestral.threads_acessando.get(thread), alvos.get(ancestral)), modo):
+                return True
+            ancestral = ancestral.pai
+        return False
+
+    def planejar(self, thread, pedidos):
+        """Os (nó, modo) que faltam para a thread ter os `pedidos`, com as intenções e o escalonamento
+
+        Com mais de `limite_escalonamento` nós debaixo do mesmo pai (os que
+        a thread já segura mais os novos), pede o pai em S ou X no lugar dos
+        novos; o escalonamento pode subir mais de um nível. Pedidos cobertos
+        por um ancestral em S, SIX ou X somem, e conversões que não mudam o
+        modo que a thread já tem também.
+        """
+        alvos = {}
+        for recurso, operacao in pedidos:
+            alvos[recurso] = supremo(alvos.get(recurso), operacao)
+        escalou = True
+        while escalou:
+            escalou = False
+            por_pai = {}
+            for recurso in alvos:
+                if recurso.pai is not None:
+                    por_pai.setdefault(recurso.pai, []).append(recurso)
+            for pai, filhos in por_pai.items():
+                with self._lock:
+                    seguros, escritas = self._abaixo.get((thread, pai), (0, 0))
+                novos = sum(1 for filho in filhos if thread not in filho.threads_acessando)
+                if seguros + novos <= self.limite_escalonamento:
+                    continue
+                leitura = not escritas and all(alvos[filho] in (S, IS) for filho in filhos)
+                for filho in filhos:
+                    del alvos[filho]
+                alvos[pai] = supremo(alvos.get(pai), S if leitura else X)
+                with self._lock:
+                    self.escalonamentos += 1
+                escalou = True
+
+        passos = {}
+        for recurso, modo in alvos.items():
+            if self._coberto(thread, recurso, modo, alvos):
+                continue
+            passos[recurso] = supremo(passos.get(recurso), modo)
+            ancestral = recurso.pai
+            while ancestral is not None:
+                passos[ancestral] = supremo(passos.get(ancestral), INTENCAO[modo])
+                ancestral = ancestral.pai
+        faltam = []
+        for recurso, modo in passos.items():
+            atual = recurso.threads_acessando.get(thread)
+            if supremo(atual, modo) != atual:
+                faltam.append((recurso, modo))
+        return faltam
+
+    def pedido(self, thread, pedidos):
+        """PedidoConjunto ordenado com os passos de planejar
+
+        Os nomes descem pelo caminho, então na ordem global um ancestral
+        vem antes de tudo abaixo dele: pedir na ordem é pedir de cima para
+        baixo. Pedidos novos não fecham ciclo de espera; conversões de modo
+        (IS para IX, IX para X no escalonamento) ainda podem, e aí a política
+        ou o detector resolve, como para qualquer recurso.
+        """
+        return PedidoConjunto(thread, self.planejar(thread, pedidos), ORDENADA)
+
+    def metricas(self):
+        return {
+            'escalonamentos': self.escalonamentos,
+            'travas_max': self.travas_max,
+            'limite_escalonamento': self.limite_escalonamento,
+        }
@@ -0,0 +1,290 @@
+"""Métricas de espera, retenção e aborto dos recursos e das transações.
+
+O registro é barato no caminho quente: contadores e histogramas de baldes
+fixos, atualizados sob um único lock. O recurso avisa quando alguém entra na
+fila, recebe o acesso ou libera; a thread avisa quando muda de estado, avança
+ou é abortada; o detector avisa cada deadlock resolvido. A leitura monta um
+retrato em JSON ou no formato texto do Prometheus, salvo em arquivo ou
+servido num endpoint local.
+"""
+import bisect
+import json
+import threading
+import time
+
+# Baldes (em segundos) dos histogramas de espera e retenção
+LIMITES_TEMPO = (0.001, 0.01, 0.1, 0.5, 1, 2, 5, 10, 30, 60, 120, 300, 600, 1800, 3600)
+# Baldes do tamanho da fila, observado a cada entrada
+LIMITES_FILA = (0, 1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024)
+
+
+class Histograma:
+    """Histograma de baldes fixos: contagem por balde, soma e total"""
+    def __init__(self, limites):
+        self.limites = limites
+        self.baldes = [0] * (len(limites) + 1)  # O último é o +Inf
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        self.baldes[bisect.bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+    def retrato(self):
+        return {
+            'limites': list(self.limites),
+            'baldes': list(self.baldes),
+            'soma': self.soma,
+            'total': self.total,
+        }
+
+
+class MetricasRecurso:
+    def __init__(self):
+        self.concessoes = 0
+        self.esperas = 0
+        self.desistencias = 0  # Saíram da fila sem receber o recurso
+        self.abortos = 0
+        self.deadlocks = 0
+        self.espera = Histograma(LIMITES_TEMPO)
+        self.retencao = Histograma(LIMITES_TEMPO)
+        self.tamanho_fila = Histograma(LIMITES_FILA)
+        self.inicio_espera = {}  # thread -> quando entrou na fila
+        self.inicio_retencao = {}  # thread -> quando recebeu o recurso
+
+    def retrato(self):
+        return {
+            'concessoes': self.concessoes,
+            'esperas': self.esperas,
+            'desistencias': self.desistencias,
+            'abortos': self.abortos,
+            'deadlocks': self.deadlocks,
+            'aguardando': len(self.inicio_espera),
+            'acessando': len(self.inicio_retencao),
+            'espera': self.espera.retrato(),
+            'retencao': self.retencao.retrato(),
+            'tamanho_fila': self.tamanho_fila.retrato(),
+        }
+
+
+class MetricasTransacao:
+    def __init__(self, estado, instante):
+        self.estado = estado
+        self.desde = instante
+        self.tempo_por_estado = {}
+        self.progresso = 0.0
+
+    def retrato(self, agora):
+        tempos = dict(self.tempo_por_estado)
+        # O estado atual conta até agora
+        tempos[self.estado] = tempos.get(self.estado, 0.0) + agora - self.desde
+        return {
+            'estado': self.estado,
+            'progresso': self.progresso,
+            'tempo_por_estado': tempos,
+        }
+
+
+class Metricas:
+    """Registro de métricas de um conjunto de recursos e transações
+
+    `relogio` é qualquer objeto com time(): o módulo time na aplicação, o
+    RelogioVirtual na simulação.
+    """
+    def __init__(self, relogio=time):
+        self.relogio = relogio
+        self.recursos = {}  # item_id -> MetricasRecurso
+        self.transacoes = {}  # nome -> MetricasTransacao
+        self.abortadas = 0
+        self.deadlocks = 0
+        self._lock = threading.Lock()
+        self._servidor = None
+
+    def _recurso(self, recurso):
+        metricas = self.recursos.get(recurso.item_id)
+        if metricas is None:
+            metricas = self.recursos[recurso.item_id] = MetricasRecurso()
+        return metricas
+
+    # Avisos dos recursos
+
+    def enfileirado(self, recurso, thread):
+        with self._lock:
+            metricas = self._recurso(recurso)
+            metricas.esperas += 1
+            metricas.tamanho_fila.observar(len(recurso.fila))
+            metricas.inicio_espera.setdefault(thread, self.relogio.time())
+
+    def concedido(self, recurso, thread):
+        with self._lock:
+            agora = self.relogio.time()
+            metricas = self._recurso(recurso)
+            metricas.concessoes += 1
+            # Quem não passou pela fila esperou zero
+            metricas.espera.observar(agora - metricas.inicio_espera.pop(thread, agora))
+            metricas.inicio_retencao[thread] = agora
+
+    def liberado(self, recurso, thread):
+        with self._lock:
+            metricas = self._recurso(recurso)
+            inicio = metricas.inicio_retencao.pop(thread, None)
+            if inicio is not None:
+                metricas.retencao.observar(self.relogio.time() - inicio)
+
+    def desistiu(self, recurso, thread):
+        with self._lock:
+            metricas = self._recurso(recurso)
+            if metricas.inicio_espera.pop(thread, None) is not None:
+                metricas.desistencias += 1
+
+    # Avisos das threads e do detector
+
+    def abortada(self, thread):
+        """Conta o aborto em cada recurso que a thread segurava ou aguardava"""
+        with self._lock:
+            self.abortadas += 1
+            for recurso in list(thread.recursos_acesso) + list(thread.recursos_desejados):
+                self._recurso(recurso).abortos += 1
+
+    def deadlock(self, vitima, ciclo):
+        """Conta o deadlock nos recursos pelos quais a vítima esperava"""
+        with self._lock:
+            self.deadlocks += 1
+            for recurso in list(vitima.recursos_desejados):
+                self._recurso(recurso).deadlocks += 1
+
+    def mudou_estado(self, thread, estado):
+        with self._lock:
+            agora = self.relogio.time()
+            metricas = self.transacoes.get(thread.nome)
+            if metricas is None:
+                self.transacoes[thread.nome] = MetricasTransacao(estado, agora)
+                return
+            metricas.tempo_por_estado[metricas.estado] = (
+                metricas.tempo_por_estado.get(metricas.estado, 0.0) + agora - metricas.desde)
+            metricas.estado = estado
+            metricas.desde = agora
+
+    def progresso(self, thread, progresso):
+        """Progresso da thread, de 0 a 100"""
+        metricas = self.transacoes.get(thread.nome)
+        if metricas is not None:
+            metricas.progresso = progresso
+
+    # Exportação
+
+    def retrato(self):
+        """Estado atual de todas as métricas, pronto para virar JSON"""
+        with self._lock:
+            agora = self.relogio.time()
+            return {
+                'instante': agora,
+                'abortadas': self.abortadas,
+                'deadlocks': self.deadlocks,
+                'recursos': {item_id: metricas.retrato() for item_id, metricas in self.recursos.items()},
+                'transacoes': {nome: metricas.retrato(agora) for nome, metricas in self.transacoes.items()},
+            }
+
+    def json(self):
+        return json.dumps(self.retrato(), indent=2)
+
+    def prometheus(self):
+        """Métricas no formato texto de exposição do Prometheus"""
+        retrato = self.retrato()
+        linhas = [
+            "# HELP transacoes_abortadas_total Transações abortadas (morrer)",
+            "# TYPE transacoes_abortadas_total counter",
+            f"transacoes_abortadas_total {retrato['abortadas']}",
+            "# HELP deadlocks_resolvidos_total Deadlocks resolvidos pelo detector",
+            "# TYPE deadlocks_resolvidos_total counter",
+            f"deadlocks_resolvidos_total {retrato['deadlocks']}",
+        ]
+        recursos = retrato['recursos']
+        for nome, chave, ajuda in (
+                ("recurso_concessoes_total", 'concessoes', "Acessos concedidos"),
+                ("recurso_esperas_total", 'esperas', "Entradas na fila de espera"),
+                ("recurso_desistencias_total", 'desistencias', "Saídas da fila sem receber o recurso"),
+                ("recurso_abortos_total", 'abortos', "Abortos de threads que seguravam ou aguardavam o recurso"),
+                ("recurso_deadlocks_total", 'deadlocks', "Deadlocks resolvidos com a vítima aguardando o recurso")):
+            linhas.append(f"# HELP {nome} {ajuda}")
+            linhas.append(f"# TYPE {nome} counter")
+            linhas.extend(f'{nome}{{recurso="{item_id}"}} {metricas[chave]}' for item_id, metricas in recursos.items())
+        for nome, chave, ajuda in (
+                ("recurso_aguardando", 'aguardando', "Threads na fila agora"),
+                ("recurso_acessando", 'acessando', "Threads com acesso agora")):
+            linhas.append(f"# HELP {nome} {ajuda}")
+            linhas.append(f"# TYPE {nome} gauge")
+            linhas.extend(f'{nome}{{recurso="{item_id}"}} {metricas[chave]}' for item_id, metricas in recursos.items())
+        for nome, chave, ajuda in (
+                ("recurso_espera_segundos", 'espera', "Tempo na fila até receber o recurso"),
+                ("recurso_retencao_segundos", 'retencao', "Tempo com o recurso até liberar"),
+                ("recurso_tamanho_fila", 'tamanho_fila', "Tamanho da fila a cada entrada")):
+            linhas.append(f"# HELP {nome} {ajuda}")
+            linhas.append(f"# TYPE {nome} histogram")
+            for item_id, metricas in recursos.items():
+                linhas.extend(_linhas_histograma(nome, f'recurso="{item_id}"', metricas[chave]))
+        linhas.append("# HELP transacao_progresso Progresso da transação (0 a 100)")
+        linhas.append("# TYPE transacao_progresso gauge")
+        for nome, metricas in retrato['transacoes'].items():
+            linhas.append(f'transacao_progresso{{transacao="{nome}"}} {metricas["progresso"]}')
+        linhas.append("# HELP transacao_estado_segundos Tempo gasto em cada estado")
+        linhas.append("# TYPE transacao_estado_segundos gauge")
+        for nome, metricas in retrato['transacoes'].items():
+            for estado, tempo in metricas['tempo_por_estado'].items():
+                linhas.append(f'transacao_estado_segundos{{transacao="{nome}",estado="{estado}"}} {tempo}')
+        return "\n".join(linhas) + "\n"
+
+    def salvar(self, caminho):
+        """Salva um retrato no arquivo: Prometheus se terminar em .prom, JSON nos outros casos"""
+        conteudo = self.prometheus() if caminho.endswith(".prom") else self.json()
+        with open(caminho, "w", encoding="utf-8") as arquivo:
+            arquivo.write(conteudo)
+
+    def servir(self, porta=9464, endereco="127.0.0.1"):
+        """Serve /metrics (Prometheus) e /metricas.json numa thread em segundo plano"""
+        if self._servidor is None:
+            # Importado só aqui: quem não serve as métricas não paga pelo servidor HTTP
+            from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+            metricas = self
+
+            class Tratador(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path == "/metrics":
+                        corpo, tipo = metricas.prometheus(), "text/plain; version=0.0.4"
+                    elif self.path == "/metricas.json":
+                        corpo, tipo = metricas.json(), "application/json"
+                    else:
+                        self.send_error(404)
+                        return
+                    dados = corpo.encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", f"{tipo}; charset=utf-8")
+                    self.send_header("Content-Length", str(len(dados)))
+                    self.end_headers()
+                    self.wfile.write(dados)
+
+                def log_message(self, formato, *argumentos):
+                    pass
+
+            self._servidor = ThreadingHTTPServer((endereco, porta), Tratador)
+            threading.Thread(target=self._servidor.serve_forever, daemon=True).start()
+        return self._servidor.server_address
+
+    def parar(self):
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+
+
+def _linhas_histograma(nome, rotulos, histograma):
+    linhas = []
+    acumulado = 0
+    for limite, quantidade in zip(histograma['limites'], histograma['baldes']):
+        acumulado += quantidade
+        linhas.append(f'{nome}_bucket{{{rotulos},le="{limite}"}} {acumulado}')
+    linhas.append(f'{nome}_bucket{{{rotulos},le="+Inf"}} {histograma["total"]}')
+    linhas.append(f'{nome}_sum{{{rotulos}}} {histograma["soma"]}')
+    linhas.append(f'{nome}_count{{{rotulos}}} {histograma["total"]}')
+    return linhas
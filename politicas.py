@@ -0,0 +1,124 @@
+"""Políticas de controle de concorrência, consultadas pelo recurso a cada conflito.
+
+Quando um pedido de acesso conflita com quem já está acessando, o recurso
+pergunta à política o que fazer: esperar na fila, abortar quem pediu ("morrer")
+ou abortar os donos mais novos ("ferir"). A thread mais antiga é a de menor
+prioridade, o mesmo timestamp que ordena a fila de espera.
+
+Só contam os donos cujo acesso conflita com o pedido (recurso.conflitantes):
+um leitor não fere nem morre por causa de outro leitor, nem uma intenção
+por causa de outra compatível com ela (ver hierarquia.py).
+"""
+
+ESPERAR = "esperar"
+MORRER = "morrer"
+FERIR = "ferir"
+
+
+class PoliticaConcorrencia:
+    """Política padrão: quem pede sempre espera na fila (deadlocks ficam para o detector)"""
+    nome = "esperar"
+    tempo_limite = None  # Segundos na fila antes de abortar (None = sem limite)
+    precisa_detector = True  # Sem detector, esta política pode travar em deadlock
+
+    def conflito(self, recurso, thread, operation):
+        return ESPERAR
+
+    def feridos(self, recurso, thread, operation):
+        """Donos que a thread aborta ao pedir o recurso para a operação"""
+        return []
+
+    def revisar_fila(self, recurso):
+        """Chamado quando o recurso ganha donos novos com a fila ocupada
+
+        A decisão do conflito foi tomada contra os donos da hora do pedido;
+        aqui a política corrige quem ficou esperando do jeito errado.
+        """
+
+    def __repr__(self):
+        return self.nome
+
+
+class WoundWait(PoliticaConcorrencia):
+    """A mais antiga fere (aborta) os donos mais novos; a mais nova espera"""
+    nome = "wound-wait"
+    precisa_detector = False
+
+    def conflito(self, recurso, thread, operation):
+        return FERIR if self.feridos(recurso, thread, operation) else ESPERAR
+
+    def feridos(self, recurso, thread, operation):
+        feridos = [dono for dono in recurso.conflitantes(thread, operation) if dono.prioridade > thread.prioridade]
+        # Uma entrada mais nova que passaria na frente (preferência por escritores) também é ferida
+        primeira = recurso.primeira_na_frente(operation)
+        if primeira is not None and primeira['thread'] is not thread and primeira['timestamp'] > thread.prioridade:
+            feridos.append(primeira['thread'])
+        return feridos
+
+    def revisar_fila(self, recurso):
+        # Quem espera e é mais antigo que algum dono fere esse dono
+        primeira = recurso.fila.primeira()
+        if primeira:
+            for dono in self.feridos(recurso, primeira['thread'], primeira['operation']):
+                dono.morrer()
+
+
+class WaitDie(PoliticaConcorrencia):
+    """A mais antiga espera; a mais nova morre"""
+    nome = "wait-die"
+    precisa_detector = False
+
+    def conflito(self, recurso, thread, operation):
+        for dono in recurso.conflitantes(thread, operation):
+            if dono.prioridade < thread.prioridade:
+                return MORRER
+        # Sem dono mais antigo no caminho, ainda pode esperar por alguém mais antigo na fila
+        primeira = recurso.primeira_na_frente(operation)
+        if primeira is not None and primeira['thread'] is not thread and primeira['timestamp'] < thread.prioridade:
+            return MORRER
+        return ESPERAR
+
+    def revisar_fila(self, recurso):
+        # Quem espera por alguém mais antigo (dono em conflito ou entrada na frente) morre
+        if not recurso.threads_acessando:
+            return
+        for entrada in recurso.fila.entradas():
+            thread = entrada['thread']
+            if thread in recurso.threads_acessando:
+                continue
+            if self.conflito(recurso, thread, entrada['operation']) == MORRER:
+                thread.morrer()
+
+
+class NoWait(PoliticaConcorrencia):
+    """Ninguém espera: todo conflito aborta quem pediu"""
+    nome = "no-wait"
+    precisa_detector = False
+
+    def conflito(self, recurso, thread, operation):
+        return MORRER
+
+
+class Timeout(PoliticaConcorrencia):
+    """Espera na fila, mas aborta quem esperar mais que o tempo limite"""
+    nome = "timeout"
+    precisa_detector = False
+
+    def __init__(self, tempo_limite=5.0):
+        self.tempo_limite = tempo_limite
+
+    def __repr__(self):
+        return f"{self.nome}({self.tempo_limite:g}s)"
+
+
+POLITICAS = {
+    politica.nome: politica
+    for politica in (PoliticaConcorrencia, WoundWait, WaitDie, NoWait, Timeout)
+}
+
+
+def criar_politica(nome, tempo_limite=None):
+    """Cria a política pelo nome (o tempo limite só vale para timeout)"""
+    if nome == Timeout.nome and tempo_limite is not None:
+        return Timeout(tempo_limite)
+    return POLITICAS[nome]()
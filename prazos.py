@@ -0,0 +1,95 @@
+"""Agenda central dos prazos de acesso aos recursos.
+
+Cada acesso concedido tem um prazo (o tempo de retenção sorteado). Em vez de
+cada transação conferir os seus a cada passo, todos os prazos vão para uma
+heap única, vigiada por uma thread que dorme até o mais próximo vencer e
+então avisa o dono. O custo é por vencimento, não por transação × passo, e
+o aviso sai no instante do prazo. Usa o relógio monotônico: ajustar o
+relógio do sistema não antecipa nem atrasa nenhuma liberação.
+
+Cancelar é só marcar: o prazo cancelado é descartado quando chega ao topo
+da heap (a mesma remoção preguiçosa da FilaEspera).
+"""
+import heapq
+import itertools
+import threading
+import time
+
+
+class Prazo:
+    __slots__ = ('instante', 'funcao', 'chave', 'cancelado')
+
+    def __init__(self, instante, funcao, chave):
+        self.instante = instante  # Em time.monotonic()
+        self.funcao = funcao
+        self.chave = chave  # O que o dono precisa para saber qual prazo venceu (o recurso)
+        self.cancelado = False
+
+
+class AgendaPrazos:
+    def __init__(self):
+        self.heap = []  # (instante, sequência, prazo)
+        self.sequencia = itertools.count()  # Desempate: nunca compara prazos
+        self.condicao = threading.Condition()
+        self.thread = None
+        # Métricas
+        self.vencidos = 0
+        self.cancelados = 0
+        self.atraso_maximo = 0.0  # Maior diferença entre o prazo e o aviso
+
+    def agendar(self, duracao, funcao, chave=None):
+        """Chama funcao(prazo) daqui a `duracao` segundos, na thread da agenda"""
+        prazo = Prazo(time.monotonic() + duracao, funcao, chave)
+        with self.condicao:
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._executar, name="agenda-prazos", daemon=True)
+                self.thread.start()
+            heapq.heappush(self.heap, (prazo.instante, next(self.sequencia), prazo))
+            # Só precisa acordar a thread se o novo prazo passou a ser o primeiro
+            if self.heap[0][2] is prazo:
+                self.condicao.notify()
+        return prazo
+
+    def cancelar(self, prazo):
+        if prazo is not None and not prazo.cancelado:
+            prazo.cancelado = True
+            self.cancelados += 1
+
+    def _proximo(self):
+        """Espera o próximo prazo não cancelado vencer e o tira da heap"""
+        with self.condicao:
+            while True:
+                if not self.heap:
+                    self.condicao.wait()
+                    continue
+                instante, _, prazo = self.heap[0]
+                if prazo.cancelado:
+                    heapq.heappop(self.heap)
+                    continue
+                espera = instante - time.monotonic()
+                if espera > 0:
+                    self.condicao.wait(espera)
+                    continue
+                heapq.heappop(self.heap)
+                self.vencidos += 1
+                self.atraso_maximo = max(self.atraso_maximo, -espera)
+                return prazo
+
+    def _executar(self):
+        while True:
+            prazo = self._proximo()
+            # Avisa fora da condição: o dono pode agendar ou cancelar outros prazos
+            prazo.funcao(prazo)
+
+    def metricas(self):
+        with self.condicao:
+            return {
+                'pendentes': len(self.heap),
+                'vencidos': self.vencidos,
+                'cancelados': self.cancelados,
+                'atraso_maximo': self.atraso_maximo,
+            }
+
+
+# Agenda usada pelas transações que não recebem uma própria
+AGENDA_PADRAO = AgendaPrazos()
@@ -0,0 +1,99 @@
+"""Gravação e reprodução determinística de execuções.
+
+O rastro é um arquivo JSON por linha, só de acréscimo: a primeira linha é o
+cabeçalho (recursos, política, preferência, semente) e cada linha seguinte é
+um evento: pedido, tentativa (pedido que não entra na fila), reserva (lugar
+na fila de um pedido atômico, sem concessão), fila, concessao, liberacao,
+cancelamento ou aborto.
+
+Cada evento guarda o nível em que aconteceu. Nível 0 é o que veio de fora
+dos recursos: a thread pediu, liberou ou desistiu, ou alguém a abortou
+(tempo limite, detector, botão). Um pedido atômico que pega o recurso
+reservado grava só a concessão, também no nível 0. Os níveis acima são consequências, como
+quem entrou na fila, quem recebeu o recurso ou quem a política abortou. A
+reprodução reaplica só os eventos de nível 0 em recursos novos, sem dormir,
+e confere se as consequências saem iguais às gravadas (ver reproducao.py).
+"""
+import threading
+import time
+from contextlib import nullcontext
+
+VERSAO = 1
+
+
+class Rastro:
+    """Grava os eventos de uma execução, em arquivo ou só em memória (caminho=None)"""
+    def __init__(self, caminho=None, relogio=time, **cabecalho):
+        self.relogio = relogio
+        self.cabecalho = {'versao': VERSAO, **cabecalho}
+        self.eventos = [] if caminho is None else None
+        self.arquivo = None
+        if caminho:
+            # O json só é importado por quem grava em arquivo: os recursos importam este módulo
+            import json
+            self._codificar = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+            self.arquivo = open(caminho, "w", encoding="utf-8")
+        self.quantidade = 0
+        self._nivel = threading.local()  # Nível por thread: cada uma aninha as próprias chamadas
+        self._lock = threading.Lock()
+        self._escrever(self.cabecalho)
+
+    @property
+    def nivel(self):
+        return getattr(self._nivel, 'valor', 0)
+
+    def _escrever(self, registro):
+        if self.arquivo:
+            self.arquivo.write(self._codificar(registro) + "\n")
+        elif self.eventos is not None:
+            self.eventos.append(registro)
+        # Rastro já fechado: threads atrasadas não gravam mais nada
+
+    def evento(self, tipo, transacao, recurso=None, operacao=None):
+        """Registra o evento; o que rodar dentro do `with` que ele devolve é consequência dele"""
+        registro = {'t': self.relogio.time(), 'n': self.nivel, 'e': tipo, 'x': transacao.nome}
+        if recurso is not None:
+            registro['r'] = recurso.item_id
+        if operacao is not None:
+            registro['o'] = operacao
+        if tipo in ("pedido", "tentativa", "reserva"):
+            # A prioridade é o timestamp da fila: a reprodução precisa dela
+            registro['p'] = transacao.prioridade
+        with self._lock:
+            self._escrever(registro)
+            self.quantidade += 1
+        return _Aninhamento(self._nivel)
+
+    def fechar(self):
+        with self._lock:
+            if self.arquivo:
+                self.arquivo.close()
+                self.arquivo = None
+
+
+class _Aninhamento:
+    def __init__(self, nivel):
+        self.nivel = nivel
+
+    def __enter__(self):
+        self.nivel.valor = getattr(self.nivel, 'valor', 0) + 1
+
+    def __exit__(self, *excecao):
+        self.nivel.valor -= 1
+
+
+def registrar(rastro, tipo, transacao, recurso=None, operacao=None):
+    """Registra no rastro, se houver; sempre devolve um contexto para o `with`"""
+    if rastro is None:
+        return nullcontext()
+    return rastro.evento(tipo, transacao, recurso, operacao)
+
+
+def ler(caminho):
+    """Retorna o cabeçalho e a lista de eventos de um rastro gravado"""
+    import json
+    with open(caminho, encoding="utf-8") as arquivo:
+        cabecalho = json.loads(next(arquivo))
+        if cabecalho.get('versao') != VERSAO:
+            raise ValueError(f"Versão de rastro não suportada: {cabecalho.get('versao')}")
+        return cabecalho, [json.loads(linha) for linha in arquivo if linha.strip()]
@@ -0,0 +1,844 @@
+import bisect
+import heapq
+import itertools
+import threading
+
+from politicas import FERIR, MORRER, PoliticaConcorrencia
+from rastro import registrar
+
+# Desempate das filas por ordem de chegada. Um contador só para todas as filas:
+# a ordem relativa dentro de cada fila é a mesma, e cada recurso tem um objeto a menos
+_SEQUENCIA = itertools.count()
+
+
+class Escritas:
+    """Contadores de um seqlock: escritas começadas e terminadas
+
+    Quem muda o estado incrementa `entradas` antes e `saidas` depois, com o
+    latch do recurso adquirido. Quem lê (retrato.py) não adquire nada: anota
+    os dois, copia o estado e confere se `entradas` não andou. Se não andou
+    e não havia escrita em curso, a cópia é de um instante só.
+    """
+    __slots__ = ('entradas', 'saidas')
+
+    def __init__(self):
+        self.entradas = 0
+        self.saidas = 0
+
+
+class Fragmento(Escritas):
+    """Um pedaço da tabela de latches: o latch e as escritas de todos os recursos que caem nele"""
+    __slots__ = ('latch',)
+
+    def __init__(self):
+        super().__init__()
+        self.latch = threading.Lock()
+
+
+class TabelaLatches:
+    """Latches dos recursos, repartidos em fragmentos pelo hash do item_id
+
+    O latch protege os campos de um recurso (lock, donos, fila, interessadas)
+    só durante uma operação, sem relação com o tempo em que a transação fica
+    com o recurso. Um latch por fragmento, e não um global: pedidos em
+    recursos de fragmentos diferentes nunca disputam o mesmo latch (num
+    Python sem GIL eles rodam em paralelo), e um milhão de recursos não
+    custa um milhão de locks. Quem cai no mesmo fragmento divide o latch.
+
+    Nenhuma operação segura dois latches: o que mexe em outros recursos
+    (abortar uma transação, avisar quem recebeu o recurso, a revisão da
+    fila pela política) roda com o latch solto (RecursoCompartilhavel._fora).
+    Sem dois latches ao mesmo tempo não há ordem de aquisição a respeitar, e
+    os latches nunca entram em deadlock entre si.
+    """
+    def __init__(self, fragmentos=64):
+        self.fragmentos = [Fragmento() for _ in range(fragmentos)]
+
+    def fragmento(self, item_id):
+        return self.fragmentos[hash(item_id) % len(self.fragmentos)]
+
+
+LATCHES = TabelaLatches()
+
+class FilaEspera:
+    """Fila de espera de um recurso, ordenada pelo timestamp da thread
+
+    Leitores e escritores ficam em heaps separadas de (timestamp, sequência,
+    entrada): empates saem na ordem de chegada, e o recurso pode olhar o topo
+    de cada tipo para decidir quem entra. Entradas canceladas, ou de threads
+    que não desejam mais o recurso, ficam na heap e são descartadas quando
+    chegam ao topo (remoção preguiçosa).
+
+    As heaps e o índice de entradas só são criados quando alguém espera:
+    com um milhão de recursos, a maioria nunca tem fila.
+    """
+    __slots__ = ('recurso', '_heaps', '_entradas', '_reservas', '_lock')
+
+    def __init__(self, recurso):
+        self.recurso = recurso
+        self._heaps = None  # {"ler": [...], "escrever": [...]}, criado na primeira espera
+        self._entradas = None  # thread -> entrada ativa, idem
+        # Entradas ativas de pedidos atômicos, em (timestamp, sequência, entrada) ordenadas pela
+        # chave da fila; criada na primeira reserva
+        self._reservas = None
+        self._lock = threading.Lock()
+
+    def colocar(self, thread, operation, timestamp, conjunto=False):
+        entrada = {
+            'thread': thread,
+            'operation': operation,
+            'timestamp': timestamp,
+            'sequencia': next(_SEQUENCIA),
+            'ativa': True,
+            'conjunto': conjunto  # Parte de um pedido atômico: a fila não concede, só avisa (PedidoConjunto)
+        }
+        with self._lock:
+            if self._heaps is None:
+                self._heaps = {"ler": [], "escrever": []}
+                self._entradas = {}
+            # Uma thread só espera uma vez por recurso: a entrada anterior deixa de valer
+            anterior = self._entradas.get(thread)
+            if anterior:
+                self._desativar(anterior)
+            self._entradas[thread] = entrada
+            if conjunto:
+                if self._reservas is None:
+                    self._reservas = []
+                bisect.insort(self._reservas, (timestamp, entrada['sequencia'], entrada))
+            heap = self._heaps["ler" if operation == "ler" else "escrever"]
+            heapq.heappush(heap, (timestamp, entrada['sequencia'], entrada))
+
+    def cancelar(self, thread):
+        """Retira a thread da fila (a entrada sai da heap quando chegar ao topo)"""
+        with self._lock:
+            if self._entradas is None:
+                return
+            entrada = self._entradas.get(thread)
+            if entrada:
+                self._desativar(entrada)
+                self._liberar_se_vazia()
+
+    def _desativar(self, entrada):
+        # A entrada fica na heap até chegar ao topo, mas sai dos índices
+        entrada['ativa'] = False
+        del self._entradas[entrada['thread']]
+        if entrada['conjunto']:
+            reservas = self._reservas
+            del reservas[bisect.bisect_left(reservas, chave_fila(entrada))]
+
+    def entrada(self, thread):
+        """Entrada ativa da thread, ou None se ela não está na fila"""
+        entradas = self._entradas
+        return entradas.get(thread) if entradas else None
+
+    def reservou(self, thread):
+        """A thread guarda lugar nesta fila com um pedido atômico"""
+        entrada = self.entrada(thread)
+        return entrada is not None and entrada['conjunto']
+
+    def atras_da_reserva(self, thread):
+        """Alguém espera atrás da reserva da thread nesta fila (False se ela não reservou)"""
+        with self._lock:
+            entrada = self._entradas.get(thread) if self._entradas else None
+            if entrada is None or not entrada['conjunto']:
+                return False
+            # As entradas comuns não ficam em ordem: havendo alguma, supõe que sim
+            return len(self._reservas) < len(self._entradas) or self._reservas[-1][2] is not entrada
+
+    def reserva_antes(self, chave):
+        """Entrada ativa de pedido atômico mais próxima antes de `chave` na ordem da fila, ou None"""
+        with self._lock:
+            reservas = self._reservas
+            if not reservas:
+                return None
+            posicao = bisect.bisect_left(reservas, chave)
+            return reservas[posicao - 1][2] if posicao else None
+
+    def _topo(self, heap):
+        # Descarta do topo as entradas que não valem mais
+        while heap:
+            entrada = heap[0][2]
+            if entrada['ativa']:
+                thread = entrada['thread']
+                if thread in self.recurso.interessadas:
+                    return entrada
+                self._desativar(entrada)
+            heapq.heappop(heap)
+        return None
+
+    def _primeira(self, operation):
+        if self._heaps is None:
+            return None
+        if operation:
+            return self._topo(self._heaps[operation])
+        leitor = self._topo(self._heaps["ler"])
+        escritor = self._topo(self._heaps["escrever"])
+        if leitor and escritor:
+            return min(leitor, escritor, key=chave_fila)
+        return leitor or escritor
+
+    def primeira(self, operation=None):
+        """Entrada mais antiga ainda válida (de um tipo de operação, se informado), sem retirar"""
+        with self._lock:
+            return self._primeira(operation)
+
+    def retirar(self, operation=None):
+        """Remove e retorna a entrada mais antiga ainda válida"""
+        with self._lock:
+            entrada = self._primeira(operation)
+            if entrada:
+                heapq.heappop(self._heaps["ler" if entrada['operation'] == "ler" else "escrever"])
+                self._desativar(entrada)
+                self._liberar_se_vazia()
+            return entrada
+
+    def _liberar_se_vazia(self):
+        # Sem entradas ativas, o que sobrou nas heaps é lixo: devolve a memória
+        if not self._entradas:
+            self._heaps = None
+            self._entradas = None
+            self._reservas = None
+
+    def entradas(self):
+        """Entradas ativas da fila, sem ordem definida"""
+        with self._lock:
+            return list(self._entradas.values()) if self._entradas else []
+
+    def limpar(self):
+        with self._lock:
+            self._heaps = None
+            self._entradas = None
+            self._reservas = None
+
+    def empty(self):
+        return not self._entradas
+
+    def __len__(self):
+        return len(self._entradas) if self._entradas else 0
+
+def chave_fila(entrada):
+    """Ordem de atendimento: timestamp, depois ordem de chegada"""
+    return (entrada['timestamp'], entrada['sequencia'])
+
+class ConjuntoRecursos(dict):
+    """Recursos de uma thread (acessados ou desejados), sem repetição
+
+    Um dict de recurso -> None: pertinência, inclusão e remoção custam O(1)
+    e a iteração segue a ordem de inserção, como na lista que ele substitui.
+    """
+    __slots__ = ()
+
+    def __init__(self, recursos=()):
+        super().__init__()
+        for recurso in recursos:
+            self.append(recurso)
+
+    def append(self, recurso):
+        self[recurso] = None
+
+    def remove(self, recurso):
+        del self[recurso]
+
+    def discard(self, recurso):
+        if recurso in self:
+            self.remove(recurso)
+
+    def clear(self):
+        for recurso in list(self):
+            self.remove(recurso)
+
+    def substituir(self, recursos):
+        """Troca o conteúdo todo (equivale a atribuir uma lista nova)"""
+        self.clear()
+        for recurso in recursos:
+            self.append(recurso)
+
+class RecursosDesejados(ConjuntoRecursos):
+    """Recursos que a thread aguarda, mantendo o índice inverso em cada recurso
+
+    Cada recurso sabe quem o deseja (recurso.interessadas), então liberar e
+    conceder olham só as threads daquele recurso, e não todas as threads.
+    """
+    __slots__ = ('thread',)
+
+    def __init__(self, thread, recursos=()):
+        self.thread = thread
+        super().__init__(recursos)
+
+    def append(self, recurso):
+        super().append(recurso)
+        recurso.comecar_escrita()
+        try:
+            recurso.interessadas[self.thread] = None
+        finally:
+            recurso.terminar_escrita()
+
+    def remove(self, recurso):
+        super().remove(recurso)
+        recurso.comecar_escrita()
+        try:
+            recurso.interessadas.pop(self.thread, None)
+        finally:
+            recurso.terminar_escrita()
+
+class RecursoCompartilhavel:
+    # Sem __dict__ por recurso: com um milhão deles, cada atributo a menos conta
+    __slots__ = ('item_id', 'lock', 'operation', 'threads_acessando', 'fila', 'label', 'threads', 'interessadas',
+                 'detector', 'registro_metricas', 'rastro', 'preferencia', 'politica', 'escritas', 'fragmento')
+
+    def __init__(self, item_id, threads=None, preferencia="justa", politica=None, latches=None):
+        self.item_id = item_id
+        self.lock = "unlock"  # Pode ser "read_lock", "write_lock" ou "unlock"
+        self.operation = None  # Pode ser "ler" ou "escrever"
+        self.threads_acessando = {}  # thread -> operação; vários leitores ou um escritor
+        self.fila = FilaEspera(self)
+        self.label = None  # Será configurado pela aplicação
+        self.threads = threads or ()  # Lista de todas as threads (a aplicação atribui a dela)
+        self.interessadas = {}  # Threads que desejam este recurso (mantido por RecursosDesejados)
+        self.detector = None  # Detector de deadlock avisado a cada aresta nova de espera
+        self.registro_metricas = None  # Registro de métricas (espera, retenção, fila), opcional
+        self.rastro = None  # Gravação dos eventos para reprodução, opcional
+        # Quem tem a vez entre leitores e escritores:
+        # "justa" segue o timestamp, "leitores" deixa leitores furarem escritores
+        # (escritores podem esperar para sempre) e "escritores" barra novos leitores
+        # enquanto houver escritor esperando (leitores podem esperar para sempre)
+        self.preferencia = preferencia
+        # Decide o que fazer quando um pedido conflita (esperar, morrer ou ferir)
+        self.politica = politica or PoliticaConcorrencia()
+        # Toda operação pública que muda donos, fila ou interessadas fica entre comecar_escrita
+        # e terminar_escrita: com o latch do fragmento e contada no seqlock do recurso e do
+        # fragmento, que os retratos (retrato.py) conferem
+        self.escritas = Escritas()
+        self.fragmento = (latches or LATCHES).fragmento(item_id)
+
+    def comecar_escrita(self):
+        fragmento = self.fragmento
+        fragmento.latch.acquire()
+        fragmento.entradas += 1
+        self.escritas.entradas += 1
+
+    def terminar_escrita(self):
+        fragmento = self.fragmento
+        self.escritas.saidas += 1
+        fragmento.saidas += 1
+        fragmento.latch.release()
+
+    def _fora(self, funcao, *argumentos):
+        """Chama `funcao` com o latch solto: ela pode mexer em outros recursos (ou neste)
+
+        Só chamar com o estado do recurso completo: quem estiver esperando o
+        latch vê o recurso como está neste ponto.
+        """
+        self.terminar_escrita()
+        try:
+            return funcao(*argumentos)
+        finally:
+            self.comecar_escrita()
+
+    @property
+    def thread_acessando(self):
+        """Primeira thread com acesso ao recurso (no read_lock pode haver outras)"""
+        return next(iter(self.threads_acessando), None)
+
+    @property
+    def timestamp_thread(self):
+        """Menor timestamp entre as threads com acesso"""
+        if not self.threads_acessando:
+            return None
+        return min(thread.prioridade for thread in self.threads_acessando)
+
+    def conflitantes(self, thread, operation):
+        """Donos (fora a própria thread) cujo acesso impede o da thread nessa operação"""
+        return [dono for dono, operacao_dono in list(self.threads_acessando.items())
+                if dono is not thread and (operation != "ler" or operacao_dono != "ler")]
+
+    def primeira_na_frente(self, operation):
+        """Entrada mais antiga da fila que, esperando, passa na frente de um pedido dessa operação"""
+        return self.fila.primeira("escrever" if operation == "ler" else None)
+
+    def reservantes(self, thread):
+        """Thread cujo pedido atômico guarda lugar na fila logo à frente da thread
+
+        Não segura o recurso, mas a thread espera por ela como por um dono: o
+        detector de deadlock a conta como aresta do grafo de espera. Basta a
+        mais próxima: cada reserva espera pela anterior na mesma fila, então
+        as outras à frente são alcançadas por ela, e o custo não cresce com
+        o tamanho da fila.
+        """
+        propria = self.fila.entrada(thread)
+        # Sem entrada própria, estão à frente as reservas de timestamp até o da thread
+        chave = chave_fila(propria) if propria is not None else (thread.prioridade, float("inf"))
+        entrada = self.fila.reserva_antes(chave)
+        return [entrada['thread']] if entrada is not None else []
+
+    def bloqueadores(self, thread):
+        """Threads pelas quais a thread espera neste recurso: as arestas do grafo de espera
+
+        A fila só anda quando o último dono sai (_liberar), então quem espera
+        aqui espera por todos os donos, compatíveis ou não. Mais a reserva de
+        pedido atômico logo à frente dela (reservantes).
+        """
+        bloqueadores = [dono for dono in list(self.threads_acessando) if dono is not thread]
+        bloqueadores.extend(self.reservantes(thread))
+        return bloqueadores
+
+    def esperam_atras(self, thread):
+        """Alguém pode estar esperando atrás da thread na fila, e não por um dono"""
+        return self.fila.atras_da_reserva(thread)
+
+    def _na_vez(self, thread):
+        """Ninguém mais antigo espera na fila (a entrada da própria thread não conta)"""
+        if self.fila.empty():
+            return True
+        primeira = self.fila.primeira()
+        return primeira is None or primeira['thread'] is thread or primeira['timestamp'] > thread.prioridade
+
+    def livre_para(self, thread, operation):
+        """O pode_acessar para quem está fora do recurso, sob o latch
+
+        Olhar o topo da fila descarta as entradas canceladas (FilaEspera._topo),
+        então a consulta conta como escrita para o MonitorEstado.
+        """
+        self.comecar_escrita()
+        try:
+            return self.pode_acessar(thread, operation)
+        finally:
+            self.terminar_escrita()
+
+    def pode_acessar(self, thread, operation):
+        """Diz se a thread receberia o recurso agora, sem entrar na fila"""
+        if self.lock == "unlock":
+            # Livre, mas pode estar reservado para um pedido atômico mais antigo na fila
+            return self._na_vez(thread)
+        if thread in self.threads_acessando:
+            # Já tem acesso: leitura ou escrita sobre escrita não muda nada,
+            # e o único leitor pode promover o lock para escrita
+            return operation == "ler" or self.lock == "write_lock" or len(self.threads_acessando) == 1
+        if self.lock == "write_lock" or operation != "ler":
+            return False
+        # Leitor chegando num read_lock: depende da preferência
+        if self.preferencia == "leitores":
+            return True
+        if self.preferencia == "escritores":
+            return self.fila.primeira("escrever") is None
+        # Justa: só entra junto se ninguém mais antigo estiver esperando
+        return self._na_vez(thread)
+
+    def acessar(self, thread, operation):
+        self.comecar_escrita()
+        try:
+            with registrar(self.rastro, "pedido", thread, self, operation):
+                return self._acessar(thread, operation)
+        finally:
+            self.terminar_escrita()
+
+    def tentar_acessar(self, thread, operation):
+        """Concede só se não houver conflito: nunca entra na fila nem consulta a política"""
+        self.comecar_escrita()
+        try:
+            if self.fila.reservou(thread):
+                # Pedido atômico pegando o que reservou: a própria concessão é o evento
+                # de nível 0 do rastro, e sem concessão nada muda
+                if not self.pode_acessar(thread, operation):
+                    return False
+                self.fila.cancelar(thread)
+                self._conceder(thread, operation)
+                return True
+            with registrar(self.rastro, "tentativa", thread, self, operation):
+                if not self.pode_acessar(thread, operation):
+                    return False
+                self._conceder(thread, operation)
+                return True
+        finally:
+            self.terminar_escrita()
+
+    def _acessar(self, thread, operation):
+        # Enquanto conflitar com quem está acessando, a política decide o que fazer
+        while not self.pode_acessar(thread, operation):
+            decisao = self.politica.conflito(self, thread, operation)
+            if decisao == MORRER:
+                # Quem pediu é abortado e não entra na fila
+                self._fora(thread.morrer)
+                return False
+            if decisao != FERIR:
+                # Adiciona na fila
+                self._enfileirar(thread, operation)
+                return False
+            # Aborta os donos mais novos; o recurso pode ir para a fila antes de ficar livre
+            for dono in self.politica.feridos(self, thread, operation):
+                self._fora(dono.morrer)
+
+        # Se o recurso está livre (ou compartilhável), permite o acesso imediatamente
+        self._conceder(thread, operation)
+        if self.fila:
+            # Entrou com gente esperando: a política pode abortar alguém, inclusive quem pediu
+            self._fora(self.politica.revisar_fila, self)
+            return thread in self.threads_acessando
+        return True
+
+    def avaliar(self, thread, operation):
+        """O que a política faria com o pedido agora, sem mudar nada: (decisão, feridos)
+
+        Sem conflito a decisão é None. O PedidoConjunto junta as avaliações de
+        todos os recursos e decide uma vez pelo conjunto inteiro.
+        """
+        self.comecar_escrita()
+        try:
+            if self.pode_acessar(thread, operation):
+                return None, []
+            decisao = self.politica.conflito(self, thread, operation)
+            return decisao, self.politica.feridos(self, thread, operation) if decisao == FERIR else []
+        finally:
+            self.terminar_escrita()
+
+    def reservar(self, thread, operation):
+        """Põe a thread na fila como parte de um pedido atômico, sem conceder nada
+
+        A política já decidiu pelo conjunto (PedidoConjunto): aqui a entrada
+        só guarda o lugar da thread pelo timestamp, inclusive num recurso
+        livre. A fila não a atende sozinha: quando chega a vez dela, só avisa
+        a thread (conjunto_liberado), que pede o conjunto inteiro de uma vez.
+        """
+        self.comecar_escrita()
+        try:
+            with registrar(self.rastro, "reserva", thread, self, operation):
+                if self.fila.entrada(thread) is None:
+                    self._enfileirar(thread, operation, conjunto=True)
+        finally:
+            self.terminar_escrita()
+
+    def _enfileirar(self, thread, operation, conjunto=False):
+        self.fila.colocar(thread, operation, thread.prioridade, conjunto)
+        if not conjunto:
+            # A reserva já é o evento de entrada na fila do pedido atômico
+            registrar(self.rastro, "fila", thread, self, operation)
+        if self.registro_metricas:
+            self.registro_metricas.enfileirado(self, thread)
+        self.notificar_espera(thread)
+
+    def notificar_espera(self, thread):
+        """Avisa o detector de deadlock que `thread` passou a esperar ou ser esperada"""
+        if self.detector:
+            self.detector.verificar(thread)
+
+    def _conceder(self, thread, operation):
+        if self.registro_metricas and thread not in self.threads_acessando:
+            self.registro_metricas.concedido(self, thread)
+        if self.threads_acessando.get(thread) == "escrever":
+            operation = "escrever"
+        self.threads_acessando[thread] = operation
+        registrar(self.rastro, "concessao", thread, self, operation)
+        if operation == "escrever":
+            self.lock = "write_lock"
+            self.operation = "escrever"
+        elif self.lock == "unlock":
+            self.lock = "read_lock"
+            self.operation = "ler"
+        self.atualizar_label()
+        # Quem ficou na fila passa a esperar também por esta thread
+        if self.fila:
+            self.notificar_espera(thread)
+
+    def atualizar_label(self):
+        if self.label:
+            if self.threads_acessando:
+                nomes = ", ".join(thread.nome for thread in self.threads_acessando)
+                self.label.config(text=f"Recurso {self.item_id}: {self.lock} (Thread {nomes})")
+            else:
+                self.label.config(text=f"Recurso {self.item_id}: Desbloqueado")
+
+    def cancelar(self, thread):
+        """Tira a thread da fila de espera (desistiu ou foi abortada)"""
+        self.comecar_escrita()
+        try:
+            with registrar(self.rastro, "cancelamento", thread, self):
+                self._cancelar(thread)
+        finally:
+            self.terminar_escrita()
+
+    def _cancelar(self, thread):
+        self.fila.cancelar(thread)
+        if self.registro_metricas:
+            self.registro_metricas.desistiu(self, thread)
+        # Abortada no meio do próprio acessar: já era dona, mas ainda não sabia
+        if thread in self.threads_acessando:
+            with registrar(self.rastro, "liberacao", thread, self):
+                self._liberar(thread)
+        elif self.lock == "unlock" and self.fila:
+            # Um pedido atômico segurava o recurso livre para si: quem esperava atrás dele é atendido
+            self._entregar(self._retirar_proximos())
+
+    def resetar(self):
+        """Volta o recurso ao estado inicial, sem donos nem fila"""
+        self.comecar_escrita()
+        try:
+            self.fila.limpar()
+            self.threads_acessando.clear()
+            self.interessadas.clear()
+            self.lock = "unlock"
+            self.operation = None
+        finally:
+            self.terminar_escrita()
+
+    def liberar(self, thread=None):
+        """Libera o acesso da thread (sem thread, libera todos que estão acessando)"""
+        self.comecar_escrita()
+        try:
+            if thread is None:
+                self._liberar(None)
+                return
+            with registrar(self.rastro, "liberacao", thread, self):
+                self._liberar(thread)
+        finally:
+            self.terminar_escrita()
+
+    def _liberar(self, thread):
+        if self.registro_metricas:
+            for dono in ([thread] if thread is not None else list(self.threads_acessando)):
+                self.registro_metricas.liberado(self, dono)
+        if thread is None:
+            self.threads_acessando.clear()
+        else:
+            self.threads_acessando.pop(thread, None)
+
+        # Ainda há leitores: escritores continuam esperando eles saírem
+        if self.threads_acessando:
+            self.atualizar_label()
+            return
+
+        self.operation = None
+        self.lock = "unlock"
+
+        # Atualiza o label
+        self.atualizar_label()
+
+        # Dá acesso às próximas threads da fila, conforme a preferência
+        self._entregar(self._retirar_proximos())
+
+    def _entregar(self, concedidas):
+        """Concede às entradas retiradas da fila; sem ninguém para receber, avisa as interessadas"""
+        if concedidas:
+            concedeu = False
+            for proxima_thread in concedidas:
+                if not proxima_thread['conjunto']:
+                    self._conceder(proxima_thread['thread'], proxima_thread['operation'])
+                    concedeu = True
+            # Cada thread atualiza o próprio estado (intervalo, cor, recursos desejados);
+            # a de um pedido atômico fica na fila e pede o conjunto inteiro
+            for proxima_thread in concedidas:
+                if proxima_thread['conjunto']:
+                    self._fora(proxima_thread['thread'].conjunto_liberado, self)
+                else:
+                    self._fora(proxima_thread['thread'].recurso_concedido, self)
+            # Só um aviso a pedido atômico não muda os donos: nada a revisar
+            if concedeu and self.fila:
+                self._fora(self.politica.revisar_fila, self)
+        else:
+            # Se não tem threads para notificar, avisa quem ainda deseja este recurso
+            for thread in list(self.interessadas):
+                self._fora(thread.recurso_liberado, self)
+
+    def _retirar_proximos(self):
+        """Escolhe na fila quem recebe o recurso recém-desbloqueado: um escritor ou um lote de leitores
+
+        Uma entrada de pedido atômico volta sem sair da fila e encerra o lote:
+        quem vem atrás dela espera a vez do conjunto. Na frente da fila, ela
+        é atendida seja qual for a preferência: as reservas seguem só o
+        timestamp, a mesma ordem em todos os recursos, senão dois conjuntos
+        podiam ficar cada um com a vez num recurso que o outro espera. Pelo
+        mesmo motivo, fora da frente ela não passa ninguém: o conjunto só
+        pega um recurso livre na sua vez (_na_vez), então a preferência
+        escolhe só entre os pedidos comuns à frente dela.
+        """
+        primeira = self.fila.primeira()
+        if primeira is not None and primeira['conjunto']:
+            return [primeira]
+        leitor = self.fila.primeira("ler")
+        escritor = self.fila.primeira("escrever")
+        if escritor and (not leitor or self.preferencia == "escritores"
+                         or (self.preferencia == "justa" and chave_fila(escritor) < chave_fila(leitor))):
+            if not escritor['conjunto']:
+                return [self.fila.retirar("escrever")]
+            # Reserva fora da frente: a frente é de leitores comuns, que entram agora
+
+        concedidas = []
+        while leitor:
+            # Na justa, os leitores só entram juntos até o escritor mais antigo
+            if self.preferencia == "justa" and escritor and chave_fila(escritor) < chave_fila(leitor):
+                break
+            if leitor['conjunto']:
+                if not concedidas:
+                    # Reserva fora da frente: a frente é de um escritor comum, que entra agora
+                    return [self.fila.retirar("escrever")]
+                concedidas.append(leitor)
+                break
+            concedidas.append(self.fila.retirar("ler"))
+            leitor = self.fila.primeira("ler")
+        return concedidas
+
+
+# Como uma transação pede vários recursos
+INCREMENTAL = "incremental"  # Um de cada vez, segurando o que já conseguiu (sem PedidoConjunto)
+ATOMICA = "atomica"  # Tudo de uma vez ou nada; espera sem segurar nenhum recurso
+ORDENADA = "ordenada"  # Um de cada vez, na ordem global dos recursos: nunca fecha ciclo de espera
+AQUISICOES = (INCREMENTAL, ATOMICA, ORDENADA)
+
+
+def ordem_global(recurso):
+    """Ordem canônica dos recursos (qualquer ordem total serve, desde que todos usem a mesma)"""
+    return recurso.item_id
+
+
+class PedidoConjunto:
+    """Pedido de um conjunto de recursos de uma vez, como uma unidade
+
+    Pegar recurso a recurso em qualquer ordem, segurando o que já conseguiu,
+    é o hold-and-wait que fecha ciclos de espera (o deadlock do "Forçar
+    Deadlock"). Aqui há dois jeitos de evitar isso:
+
+    - "atomica": só concede quando todos os recursos estão livres para a
+      transação, e todos no mesmo passo. No primeiro conflito a política
+      decide uma vez pelo conjunto inteiro (morrer, ferir ou esperar), e
+      o conjunto entra como uma unidade na fila de todos os seus recursos,
+      pelo timestamp da transação (RecursoCompartilhavel.reservar). Ela
+      espera sem segurar nada, e ninguém mais novo passa na frente dela.
+      A fila não concede uma entrada dessas: quando chega a vez dela,
+      avisa a transação (conjunto_liberado), que só volta a pedir se o
+      conjunto inteiro puder ser concedido (pronto).
+    - "ordenada": pede um de cada vez pelo acessar normal (fila e
+      política), mas sempre na ordem global dos recursos. Quem segura um
+      recurso só espera por recursos maiores, então o grafo de espera não
+      fecha ciclo.
+
+    A transação chama avancar() ao pedir e de novo a cada recurso_concedido,
+    recurso_liberado ou conjunto_liberado (menos os que chegam com
+    `avancando`, durante o próprio avancar), até ele retornar True.
+    """
+    def __init__(self, thread, pedidos, modo=ATOMICA):
+        if modo not in (ATOMICA, ORDENADA):
+            raise ValueError(f"Aquisição desconhecida: {modo}")
+        self.thread = thread
+        self.modo = modo
+        if modo == ORDENADA:
+            pedidos = sorted(pedidos, key=lambda pedido: ordem_global(pedido[0]))
+        self.pendentes = list(pedidos)  # (recurso, operação) ainda não concedidos
+        self.reservado = False  # Já está nas filas: a política decidiu pelo conjunto (modo atomica)
+        # Dentro de avancar: avisos que chegarem agora são consequência do próprio pedido
+        self.avancando = False
+
+    @property
+    def concluido(self):
+        return not self.pendentes
+
+    def concedido(self, recurso):
+        """A fila concedeu um dos recursos pendentes (modo ordenada)"""
+        self.pendentes = [pedido for pedido in self.pendentes if pedido[0] is not recurso]
+
+    def desistir(self):
+        """A transação abortou (ela mesma sai das filas, pelos recursos_desejados)"""
+        self.pendentes = []
+
+    def pronto(self):
+        """Todos os recursos pendentes podem ser concedidos agora (modo atomica)"""
+        return all(recurso.livre_para(self.thread, operacao) for recurso, operacao in self.pendentes)
+
+    def avancar(self):
+        """Pede o que falta; retorna True quando a transação tem todos os recursos"""
+        self.avancando = True
+        try:
+            if self.modo == ATOMICA:
+                return self._avancar_atomica()
+            return self._avancar_ordenada()
+        finally:
+            self.avancando = False
+
+    def _avancar_ordenada(self):
+        thread = self.thread
+        while self.pendentes:
+            recurso, operacao = self.pendentes[0]
+            if recurso in thread.recursos_desejados:
+                # Já está na fila deste: continua quando ele for concedido
+                return False
+            thread.recursos_desejados.append(recurso)
+            if not recurso.acessar(thread, operacao):
+                # Na fila (ou abortada pela política)
+                return False
+            thread.recursos_desejados.remove(recurso)
+            thread.recursos_acesso.append(recurso)
+            self.pendentes.pop(0)
+        return True
+
+    def _avancar_atomica(self):
+        if self.pronto() and self._conceder_todos():
+            return True
+        if self.reservado:
+            # A política já decidiu quando o conjunto entrou nas filas: guarda o lugar
+            # que a concessão interrompida tenha desfeito e continua esperando
+            return self._esperar_nas_filas()
+        # Primeiro conflito: a política decide uma vez, pelo conjunto inteiro
+        feridos = self._decidir()
+        if feridos is None:
+            return False
+        for dono, recurso in feridos.items():
+            # Um aborto anterior pode ter levado este dono junto
+            if dono in recurso.threads_acessando:
+                dono.morrer()
+        # Ferir os donos pode ter deixado tudo livre: a fila não concede as reservas
+        # de outros conjuntos, então o que os feridos soltaram continua livre
+        if feridos and self.pronto() and self._conceder_todos():
+            return True
+        # Espera como uma unidade, na fila de cada um dos seus recursos
+        return self._esperar_nas_filas()
+
+    def _esperar_nas_filas(self):
+        self._reservar_todos()
+        # Um dono pode ter liberado entre o pronto e a reserva, quando a thread ainda
+        # não estava na fila para ser avisada: confere de novo já reservado
+        return self.pronto() and self._conceder_todos()
+
+    def _decidir(self):
+        """Avalia o conjunto em todos os recursos; retorna {dono a ferir: recurso}, ou None se a thread morreu
+
+        Morre se algum recurso mandar morrer. Fere só se todo conflito for de
+        ferir: se algum recurso manda esperar, o conjunto vai esperar de
+        qualquer jeito, e abortar os donos dos outros seria trabalho perdido.
+        """
+        thread = self.thread
+        feridos = {}  # Sem repetir o dono de mais de um recurso, na ordem em que apareceram
+        esperar = False
+        for recurso, operacao in self.pendentes:
+            decisao, donos = recurso.avaliar(thread, operacao)
+            if decisao == MORRER:
+                thread.morrer()
+                return None
+            if decisao == FERIR:
+                feridos.update((dono, recurso) for dono in donos if dono not in feridos)
+            elif decisao is not None:
+                esperar = True
+        return {} if esperar else feridos
+
+    def _reservar_todos(self):
+        """Põe o conjunto na fila de cada recurso em que ele ainda não está"""
+        thread = self.thread
+        for recurso, operacao in self.pendentes:
+            if recurso not in thread.recursos_desejados:
+                thread.recursos_desejados.append(recurso)
+            if recurso.fila.entrada(thread) is None:
+                recurso.reservar(thread, operacao)
+        self.reservado = True
+
+    def _conceder_todos(self):
+        thread = self.thread
+        concedidos = []
+        for recurso, operacao in self.pendentes:
+            if not recurso.tentar_acessar(thread, operacao):
+                # Outra thread chegou antes entre a conferência e a concessão: desfaz
+                for concedido in concedidos:
+                    concedido.liberar(thread)
+                return False
+            thread.recursos_desejados.discard(recurso)
+            concedidos.append(recurso)
+        for recurso in concedidos:
+            thread.recursos_acesso.append(recurso)
+        self.pendentes = []
+        return True
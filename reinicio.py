@@ -0,0 +1,122 @@
+"""Reinício automático das transações abortadas.
+
+A transação abortada recomeça do zero, mas com o mesmo timestamp (a
+prioridade): no wound-wait e no wait-die ela fica cada vez mais velha em
+relação às novas e acaba vencendo os conflitos. Para não voltar na mesma
+hora e bater de novo nos mesmos recursos, espera um sorteio entre 0 e o
+maior de dois tetos:
+
+- o backoff da própria transação: exponencial (base * 2^reinícios) vezes
+  a contenção do momento, limitado por `maximo`. A contenção é a fração
+  dos desfechos recentes (abortos e conclusões, média móvel) que foram
+  abortos: fica entre 0 e 1, então com pouco conflito as transações
+  voltam logo e com muito elas se espalham até 1 + `peso_contencao` vezes
+  mais;
+- a fila de reinícios: quantas transações já esperam para recomeçar,
+  vezes o intervalo médio entre conclusões, vezes o excesso de abortos
+  (2 * contenção - 1, zero enquanto há menos abortos que conclusões).
+  Com mais abortos que conclusões, os reinícios voltam no ritmo em que o
+  sistema conclui transações: é um controle de admissão, e o
+  espalhamento cresce junto com o número de abortadas.
+
+Só o primeiro teto tem limite. Com pouco conflito o segundo some e vale o
+backoff de cada uma; sob carga muito acima da capacidade, no no-wait e no
+timeout (em que ninguém tem a vez), é o segundo que evita o livelock, e o
+número de abortos por conclusão não cresce com o número de transações.
+"""
+import heapq
+import random
+import threading
+import time
+
+
+class Reinicio:
+    """Decide se e quando uma transação abortada recomeça
+
+    `relogio` é qualquer objeto com time(): o módulo time na aplicação, o
+    relógio virtual na simulação.
+    """
+    def __init__(self, base=1.0, maximo=300.0, max_reinicios=None, peso_contencao=4.0, suavizacao=0.05, rng=None,
+                 relogio=time):
+        self.base = base  # Segundos, sem contenção e no primeiro reinício
+        self.maximo = maximo  # Teto do backoff da transação, já com a contenção
+        self.max_reinicios = max_reinicios  # Depois disso a transação fica abortada (None = sem limite)
+        self.peso_contencao = peso_contencao  # O backoff multiplica por 1 + peso * contenção
+        self.suavizacao = suavizacao
+        self.rng = rng or random.Random()
+        self.relogio = relogio
+        self.contencao = 0.0  # Média móvel da fração de abortos entre os desfechos
+        self.intervalo_conclusoes = None  # Média móvel dos segundos entre conclusões
+        self._ultima_conclusao = None  # Instante da última conclusão (ou do primeiro aborto)
+        self._agendados = []  # Heap dos instantes de reinício ainda não alcançados
+        self._lock = threading.Lock()  # Threads da aplicação e trabalhadores do pool chamam ao mesmo tempo
+        # Métricas
+        self.reinicios = 0
+        self.desistencias = 0
+        self.atraso_total = 0.0
+
+    def _desfecho(self, abortou):
+        self.contencao += self.suavizacao * (abortou - self.contencao)
+
+    def concluida(self):
+        """Uma transação concluiu: a contenção cai e o intervalo entre conclusões é atualizado"""
+        with self._lock:
+            self._desfecho(False)
+            agora = self.relogio.time()
+            if self._ultima_conclusao is not None:
+                intervalo = agora - self._ultima_conclusao
+                if self.intervalo_conclusoes is None:
+                    self.intervalo_conclusoes = intervalo
+                else:
+                    self.intervalo_conclusoes += self.suavizacao * (intervalo - self.intervalo_conclusoes)
+            self._ultima_conclusao = agora
+
+    def aguardando(self, agora):
+        """Transações com reinício marcado para depois de `agora`"""
+        with self._lock:
+            return self._aguardando(agora)
+
+    def _aguardando(self, agora):
+        # Tira do heap os reinícios que já passaram: só com o lock, que atraso também mexe nele
+        agendados = self._agendados
+        while agendados and agendados[0] <= agora:
+            heapq.heappop(agendados)
+        return len(agendados)
+
+    def _intervalo(self, agora):
+        if self.intervalo_conclusoes is not None:
+            return self.intervalo_conclusoes
+        # Antes de duas conclusões: o tempo desde a primeira (ou desde o primeiro aborto), até `maximo`
+        if self._ultima_conclusao is None:
+            self._ultima_conclusao = agora
+        return min(agora - self._ultima_conclusao, self.maximo)
+
+    def atraso(self, transacao):
+        """Segundos até recomeçar a transação que acabou de abortar (None = não recomeça)"""
+        with self._lock:
+            self._desfecho(True)
+            if self.max_reinicios is not None and transacao.reinicios >= self.max_reinicios:
+                self.desistencias += 1
+                return None
+            agora = self.relogio.time()
+            exponencial = self.base * 2 ** min(transacao.reinicios, 30)
+            teto = min(exponencial * (1 + self.peso_contencao * self.contencao), self.maximo)
+            # A fila de reinícios só pesa quando há mais abortos que conclusões
+            excesso = max(0.0, 2 * self.contencao - 1)
+            teto = max(teto, self._aguardando(agora) * self._intervalo(agora) * excesso)
+            atraso = self.rng.uniform(0, teto)
+            heapq.heappush(self._agendados, agora + atraso)
+            self.reinicios += 1
+            self.atraso_total += atraso
+            return atraso
+
+    def metricas(self):
+        # Tudo do mesmo instante, com o lock: os trabalhadores chamam atraso enquanto isso
+        with self._lock:
+            return {
+                'reinicios': self.reinicios,
+                'desistencias': self.desistencias,
+                'atraso_medio_reinicio': self.atraso_total / self.reinicios if self.reinicios else 0.0,
+                'contencao': self.contencao,
+                'aguardando_reinicio': self._aguardando(self.relogio.time()),
+            }
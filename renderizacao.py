@@ -0,0 +1,36 @@
+"""Renderização do Tk fora das threads de trabalho.
+
+As threads não tocam nos widgets. O que elas mostram por transação (texto,
+progresso, estilo) fica numa LinhaTransacao que a visão desenha a cada
+quadro (visao.py). O resto, como avisos num label ou abortar a vítima de um
+deadlock, elas agendam neste canal: uma SimpleQueue, que nunca bloqueia, e
+que a thread do Tk drena uma vez por quadro, chamando o que foi agendado na
+ordem em que chegou.
+"""
+from queue import Empty, SimpleQueue
+
+
+class CanalRenderizacao:
+    def __init__(self):
+        self.fila = SimpleQueue()
+        # Métricas
+        self.quadros = 0
+        self.chamadas = 0
+
+    def agendar(self, funcao, *argumentos, **opcoes):
+        """Executa `funcao` na thread do Tk, no próximo quadro; chamado de qualquer thread, nunca espera"""
+        self.fila.put((funcao, argumentos, opcoes))
+
+    def aplicar(self):
+        """Drena o canal e faz as chamadas agendadas; só pode rodar na thread do Tk"""
+        chamadas = []
+        while True:
+            try:
+                chamadas.append(self.fila.get_nowait())
+            except Empty:
+                break
+        # O que for agendado durante estas chamadas fica para o próximo quadro
+        for funcao, argumentos, opcoes in chamadas:
+            funcao(*argumentos, **opcoes)
+        self.chamadas += len(chamadas)
+        self.quadros += 1
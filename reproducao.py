@@ -0,0 +1,186 @@
+"""Reprodução de um rastro gravado, sem dormir e sem relógio de parede.
+
+Reaplica em recursos novos só os eventos de nível 0 do rastro (o que veio de
+fora: pedidos, liberações, desistências e abortos) e confere se as
+consequências (fila, concessões, abortos da política) saem iguais às
+gravadas. A primeira diferença aponta onde a execução deixou de se repetir:
+
+    python reproducao.py rastro.jsonl
+"""
+import argparse
+import time
+
+from politicas import criar_politica
+from rastro import Rastro, ler, registrar
+from recursos import ConjuntoRecursos, RecursoCompartilhavel, RecursosDesejados
+
+
+class TransacaoReproduzida:
+    """Transação mínima para a reprodução: só o que os recursos e as políticas consultam"""
+    def __init__(self, nome, prioridade, rastro):
+        self.nome = nome
+        self.prioridade = prioridade
+        self.rastro = rastro
+        self.estado = "executando"
+        self.recursos_acesso = ConjuntoRecursos()
+        self.recursos_desejados = RecursosDesejados(self)
+
+    def pedir(self, recurso, operacao):
+        self.estado = "pedindo"
+        self.recursos_desejados.append(recurso)
+        if recurso.acessar(self, operacao):
+            self.recursos_desejados.discard(recurso)
+            self.recursos_acesso.append(recurso)
+        if self.estado == "pedindo":
+            self.estado = "aguardando_recursos" if self.recursos_desejados else "acessando_recursos"
+
+    def tentar(self, recurso, operacao):
+        if recurso.tentar_acessar(self, operacao):
+            self.recursos_desejados.discard(recurso)
+            self.recursos_acesso.append(recurso)
+            if self.estado == "aguardando_conjunto" and not self.recursos_desejados:
+                self.estado = "acessando_recursos"
+
+    def reservar(self, recurso, operacao):
+        # Pedido atômico: fica na fila sem receber nada, até pedir o conjunto com tentar
+        self.estado = "aguardando_conjunto"
+        if recurso not in self.recursos_desejados:
+            self.recursos_desejados.append(recurso)
+        recurso.reservar(self, operacao)
+
+    def liberar(self, recurso):
+        recurso.liberar(self)
+        self.recursos_acesso.discard(recurso)
+
+    def cancelar(self, recurso):
+        recurso.cancelar(self)
+        self.recursos_desejados.discard(recurso)
+
+    def recurso_concedido(self, recurso):
+        self.recursos_desejados.discard(recurso)
+        self.recursos_acesso.append(recurso)
+
+    def recurso_liberado(self, recurso):
+        # Dentro do próprio pedido, o resultado do acessar é que decide;
+        # o pedido atômico continua na fila até a transação pedir o conjunto
+        if self.estado not in ("pedindo", "aguardando_conjunto"):
+            self.recursos_desejados.discard(recurso)
+
+    def conjunto_liberado(self, recurso):
+        # Quem volta a pedir o conjunto é a transação, num evento de nível 0 gravado
+        pass
+
+    def morrer(self):
+        # Mesma ordem das threads: sai das filas, depois libera o que segura
+        with registrar(self.rastro, "aborto", self):
+            self.estado = "abortada"
+            for recurso in list(self.recursos_desejados):
+                recurso.cancelar(self)
+            self.recursos_desejados.clear()
+            for recurso in list(self.recursos_acesso):
+                recurso.liberar(self)
+            self.recursos_acesso.clear()
+
+
+class RelogioRastro:
+    """Relógio da reprodução: marca o instante gravado da entrada que está sendo reaplicada"""
+    def __init__(self):
+        self.agora = 0.0
+
+    def time(self):
+        return self.agora
+
+
+def _comparavel(evento):
+    return (evento['n'], evento['e'], evento['x'], evento.get('r'), evento.get('o'))
+
+
+def reproduzir(caminho):
+    """Reaplica as entradas do rastro e procura a primeira consequência diferente da gravada"""
+    inicio = time.perf_counter()
+    cabecalho, gravados = ler(caminho)
+    politica = criar_politica(cabecalho.get('politica') or "esperar", cabecalho.get('tempo_limite'))
+    relogio = RelogioRastro()
+    rastro = Rastro(relogio=relogio)
+    recursos = {}
+
+    def recurso_para(item_id):
+        # Os recursos de uma carga lida de arquivo podem aparecer só no meio do rastro
+        if item_id not in recursos:
+            recursos[item_id] = RecursoCompartilhavel(item_id, preferencia=cabecalho.get('preferencia', "justa"),
+                                                      politica=politica)
+            recursos[item_id].rastro = rastro
+        return recursos[item_id]
+
+    for item_id in cabecalho['recursos']:
+        recurso_para(item_id)
+    transacoes = {}
+    entradas = 0
+    for evento in gravados:
+        if evento['n'] != 0:
+            continue
+        entradas += 1
+        relogio.agora = evento['t']
+        nome = evento['x']
+        if nome not in transacoes:
+            transacoes[nome] = TransacaoReproduzida(nome, evento.get('p', 0), rastro)
+        transacao = transacoes[nome]
+        recurso = recurso_para(evento['r']) if 'r' in evento else None
+        tipo = evento['e']
+        if tipo == "pedido":
+            transacao.prioridade = evento['p']
+            transacao.pedir(recurso, evento['o'])
+        elif tipo == "tentativa":
+            transacao.prioridade = evento['p']
+            transacao.tentar(recurso, evento['o'])
+        elif tipo == "reserva":
+            transacao.prioridade = evento['p']
+            transacao.reservar(recurso, evento['o'])
+        elif tipo == "concessao":
+            # Pedido atômico pegando o recurso que tinha reservado
+            transacao.tentar(recurso, evento['o'])
+        elif tipo == "liberacao":
+            transacao.liberar(recurso)
+        elif tipo == "cancelamento":
+            transacao.cancelar(recurso)
+        elif tipo == "aborto":
+            transacao.morrer()
+
+    divergencia = None
+    obtidos = rastro.eventos[1:]  # Sem o cabeçalho
+    for indice, (gravado, obtido) in enumerate(zip(gravados, obtidos)):
+        if _comparavel(gravado) != _comparavel(obtido):
+            divergencia = {'indice': indice, 'gravado': gravado, 'obtido': obtido}
+            break
+    if divergencia is None and len(gravados) != len(obtidos):
+        indice = min(len(gravados), len(obtidos))
+        divergencia = {
+            'indice': indice,
+            'gravado': gravados[indice] if indice < len(gravados) else None,
+            'obtido': obtidos[indice] if indice < len(obtidos) else None,
+        }
+    return {
+        'eventos': len(gravados),
+        'entradas': entradas,
+        'reproduzidos': len(obtidos),
+        'divergencia': divergencia,
+        'tempo_real': time.perf_counter() - inicio,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reproduz um rastro gravado e confere se o resultado se repete")
+    parser.add_argument("rastro", help="Arquivo .jsonl gravado pela aplicação ou pela simulação")
+    args = parser.parse_args()
+
+    resultado = reproduzir(args.rastro)
+    print(f"{resultado['eventos']} eventos gravados, {resultado['entradas']} entradas reaplicadas "
+          f"em {resultado['tempo_real']:.3f}s")
+    divergencia = resultado['divergencia']
+    if divergencia is None:
+        print("Reprodução idêntica ao rastro")
+    else:
+        print(f"Divergência no evento {divergencia['indice']}:")
+        print(f"  gravado: {divergencia['gravado']}")
+        print(f"  obtido:  {divergencia['obtido']}")
+        raise SystemExit(1)
@@ -0,0 +1,131 @@
+"""Retratos consistentes do estado dos recursos, sem travar ninguém.
+
+Ler recurso.threads_acessando e recurso.interessadas enquanto as threads
+trabalham mostra estados que nunca existiram: um recurso em write_lock sem
+dono, uma transação que largou X e ainda não aparece esperando Y, ou um
+RuntimeError porque o dict mudou no meio da iteração. Um lock global para
+ler resolveria, mas pararia todas as transações a cada consulta.
+
+O MonitorEstado lê com seqlock (recursos.Escritas): anota as contagens de
+escrita, copia e confere se nada começou no meio. Quem escreve só
+incrementa dois contadores, sob o latch que já tem; quem lê não adquire
+latch nenhum e repete a cópia quando perde a corrida.
+Cada recurso copiado fica guardado com a contagem da cópia, então um
+retrato só copia de novo os recursos que mudaram desde o anterior: consultar
+várias vezes por segundo com milhares de transações custa pouco.
+
+O retrato é de um instante só quando nenhuma escrita, em recurso nenhum,
+começou durante a passada (as contagens dos fragmentos da tabela de
+latches não andaram). Sob carga
+pesada isso pode não acontecer em `tentativas` passadas; aí o retrato vem
+com consistente=False: cada recurso continua consistente consigo mesmo,
+mas recursos diferentes podem ser de instantes diferentes.
+"""
+import time
+
+
+def _estado(recurso):
+    """Cópia imutável do que interessa no recurso; RuntimeError se um dict mudar durante a cópia"""
+    return (recurso.lock,
+            tuple((thread.nome, operacao) for thread, operacao in list(recurso.threads_acessando.items())),
+            tuple(thread.nome for thread in list(recurso.interessadas)))
+
+
+class MonitorEstado:
+    """Tira retratos de um conjunto de recursos"""
+    def __init__(self, recursos, tentativas=5):
+        self.recursos = recursos  # dict item_id -> recurso, ou lista de recursos
+        self.tentativas = tentativas
+        self._copias = {}  # recurso -> (contagem da cópia, estado)
+        # Métricas
+        self.retratos = 0
+        self.repeticoes = 0  # Passadas ou cópias refeitas porque alguém escreveu no meio
+        self.inconsistentes = 0
+
+    def _lista(self):
+        recursos = self.recursos
+        return list(recursos.values() if isinstance(recursos, dict) else recursos)
+
+    def _copiar(self, recurso):
+        """(lock, donos, aguardando) do recurso num instante só; None se não deu em `tentativas`"""
+        escritas = recurso.escritas
+        guardada = self._copias.get(recurso)
+        for _ in range(self.tentativas):
+            # Lê saidas antes de entradas: uma escrita que comece entre as duas leituras aparece
+            saidas = escritas.saidas
+            entradas = escritas.entradas
+            if entradas == saidas:
+                if guardada is not None and guardada[0] == saidas:
+                    return guardada[1]
+                try:
+                    estado = _estado(recurso)
+                except RuntimeError:
+                    estado = None
+                if estado is not None and escritas.entradas == entradas:
+                    self._copias[recurso] = (saidas, estado)
+                    return estado
+            self.repeticoes += 1
+            time.sleep(0)  # Cede a vez para a escrita em curso terminar
+        return None
+
+    def retratar(self):
+        """Estado de todos os recursos e, derivado dele, o de cada transação
+
+        Retorna um dict com:
+        - recursos: item_id -> {'lock', 'donos': ((nome, operação), ...), 'aguardando': (nome, ...)}
+        - transacoes: nome -> {'acessando': [item_id, ...], 'aguardando': [item_id, ...]}
+        - consistente: se tudo é do mesmo instante
+        - versao: escritas terminadas até o retrato (cresce sempre; igual = nada mudou)
+        """
+        recursos = self._lista()
+        fragmentos = list(dict.fromkeys(recurso.fragmento for recurso in recursos))
+        estados = None
+        for _ in range(self.tentativas):
+            saidas = [fragmento.saidas for fragmento in fragmentos]
+            entradas = [fragmento.entradas for fragmento in fragmentos]
+            estados = [self._copiar(recurso) for recurso in recursos]
+            if (entradas == saidas and None not in estados
+                    and all(fragmento.entradas == antes for fragmento, antes in zip(fragmentos, entradas))):
+                consistente = True
+                break
+            self.repeticoes += 1
+            time.sleep(0)
+        else:
+            # Sem um instante calmo: cada recurso por si, copiando à força os que nunca acalmaram
+            consistente = False
+            self.inconsistentes += 1
+            estados = [estado if estado is not None else self._forcar(recurso)
+                       for recurso, estado in zip(recursos, estados)]
+        self.retratos += 1
+        if len(self._copias) > len(recursos):
+            # Recursos que saíram do conjunto não ficam presos na memória
+            atuais = set(recursos)
+            self._copias = {recurso: copia for recurso, copia in self._copias.items() if recurso in atuais}
+        return self._montar(recursos, estados, consistente, sum(saidas))
+
+    @staticmethod
+    def _forcar(recurso):
+        while True:
+            try:
+                return _estado(recurso)
+            except RuntimeError:
+                time.sleep(0)
+
+    @staticmethod
+    def _montar(recursos, estados, consistente, versao):
+        por_recurso = {}
+        transacoes = {}
+        for recurso, (lock, donos, aguardando) in zip(recursos, estados):
+            por_recurso[recurso.item_id] = {'lock': lock, 'donos': donos, 'aguardando': aguardando}
+            for nome, _ in donos:
+                transacoes.setdefault(nome, {'acessando': [], 'aguardando': []})['acessando'].append(recurso.item_id)
+            for nome in aguardando:
+                transacoes.setdefault(nome, {'acessando': [], 'aguardando': []})['aguardando'].append(recurso.item_id)
+        return {'recursos': por_recurso, 'transacoes': transacoes, 'consistente': consistente, 'versao': versao}
+
+    def metricas(self):
+        return {
+            'retratos': self.retratos,
+            'repeticoes_retrato': self.repeticoes,
+            'retratos_inconsistentes': self.inconsistentes,
+        }
@@ -0,0 +1,747 @@
+"""Motor de simulação de eventos discretos, sem Tkinter.
+
+Executa a mesma semântica de acesso / retenção / liberação / aborto das
+threads da aplicação, usando o próprio RecursoCompartilhavel, mas contra um
+relógio virtual: em vez de dormir em fatias de 0.1s, o tempo salta direto
+para o próximo evento da heap. Uma carga de 100k transações roda em segundos.
+
+A carga é sorteada (gerar_transacoes) ou lida de um arquivo (carregar, ver
+carga.py), com os recursos e os acessos de cada transação.
+
+Com hierarquia=(páginas, linhas), cada recurso vira uma tabela com páginas
+e linhas (ver hierarquia.py): as transações pedem linhas, com as intenções
+nos ancestrais e o escalonamento para a página ou a tabela inteira.
+"""
+import argparse
+import bisect
+import heapq
+import itertools
+import json
+import random
+import time
+
+from carga import RECURSO, ler_carga
+from deadlock import DetectorDeadlock
+from hierarquia import SEPARADOR, Hierarquia
+from metricas import Metricas
+from rastro import Rastro, registrar
+from politicas import POLITICAS, PoliticaConcorrencia, criar_politica
+from reinicio import Reinicio
+from recursos import AQUISICOES, ATOMICA, INCREMENTAL, ConjuntoRecursos, PedidoConjunto, RecursoCompartilhavel, RecursosDesejados
+from vitimas import ESCOLHAS_VITIMA, criar_escolha_vitima
+
+
+class RelogioVirtual:
+    """Relógio da simulação, só avança quando o motor processa um evento"""
+    def __init__(self, inicio=0.0):
+        self.agora = inicio
+
+    def time(self):
+        return self.agora
+
+
+class TransacaoSimulada:
+    """Equivalente headless da MinhaThread, dirigido por eventos em vez de polling"""
+    # Sem __dict__ por transação: cargas grandes criam centenas de milhares delas
+    __slots__ = ('simulador', 'nome', 'prioridade', 'tempo_total', 'chegada', 'resultado', 'esta_ativa', 'estado',
+                 'recursos_acesso', 'tempos_acesso', 'recursos_desejados', 'recursos_por_acesso', 'fracao_leitura',
+                 'intervalo_min_acesso', 'intervalo_max_acesso', 'tempo_min_acesso', 'tempo_max_acesso',
+                 'tempo_decorrido_antes_pausa', 'tempo_inicio', 'tempo_fim', 'inicio_espera', 'pedido', 'reinicios',
+                 'versao', 'roteiro', 'passo_roteiro')
+
+    def __init__(self, simulador, nome, prioridade, chegada=0.0, recursos_por_acesso=1):
+        self.simulador = simulador
+        self.nome = nome
+        self.prioridade = prioridade
+        self.tempo_total = prioridade
+        self.chegada = chegada
+        self.resultado = None
+        self.esta_ativa = False
+        self.estado = "executando"
+        self.recursos_acesso = ConjuntoRecursos()
+        self.tempos_acesso = {}  # recurso -> (início, duração) do acesso
+        self.recursos_desejados = RecursosDesejados(self)
+        self.recursos_por_acesso = recursos_por_acesso
+        self.fracao_leitura = 0.5  # Chance de cada acesso ser "ler"
+        self.intervalo_min_acesso = 1
+        self.intervalo_max_acesso = 3
+        self.tempo_min_acesso = 15
+        self.tempo_max_acesso = 30
+        # Variáveis para controle de progresso (só avança no estado "executando")
+        self.tempo_decorrido_antes_pausa = 0
+        self.tempo_inicio = 0
+        self.tempo_fim = None
+        self.inicio_espera = 0.0  # Instante do último pedido de recursos
+        self.pedido = None  # PedidoConjunto em andamento (aquisição atômica ou ordenada)
+        self.reinicios = 0  # Quantas vezes foi abortada e recomeçou (pesa na escolha da vítima)
+        # Acessos lidos da carga: ((recurso, operação), ...) e retenção; None = sorteados
+        self.roteiro = None
+        self.passo_roteiro = 0
+        # Cada mudança de estado invalida os eventos agendados antes dela
+        self.versao = 0
+
+    def atualizar_cor_barra(self):
+        """Não há barra de progresso no modo headless"""
+
+    def _mudar_estado(self, estado):
+        por_estado = self.simulador.por_estado
+        por_estado[self.estado] -= 1
+        por_estado[estado] = por_estado.get(estado, 0) + 1
+        self.estado = estado
+        self.versao += 1
+        if self.simulador.metricas:
+            self.simulador.metricas.mudou_estado(self, estado)
+
+    def iniciar(self):
+        """Chegada da transação no sistema"""
+        self.esta_ativa = True
+        self._entrar_execucao()
+
+    def _entrar_execucao(self):
+        sim = self.simulador
+        agora = sim.relogio.time()
+        self._mudar_estado("executando")
+        self.tempo_inicio = agora
+        restante = self.tempo_total - self.tempo_decorrido_antes_pausa
+        if self.roteiro is None:
+            intervalo = sim.rng.uniform(self.intervalo_min_acesso, self.intervalo_max_acesso)
+        elif self.passo_roteiro < len(self.roteiro):
+            # Os acessos da carga ficam espaçados por igual ao longo da execução
+            intervalo = self.tempo_total / (len(self.roteiro) + 1)
+        else:
+            intervalo = restante
+        # Agenda só o que vier primeiro: a conclusão ou a próxima tentativa de acesso
+        if restante <= intervalo:
+            sim.agendar(agora + restante, self, self.concluir)
+        else:
+            sim.agendar(agora + intervalo, self, self.tentar_acessar_recursos)
+
+    def _pausar_execucao(self, estado):
+        self.tempo_decorrido_antes_pausa += self.simulador.relogio.time() - self.tempo_inicio
+        if self.simulador.metricas:
+            self.simulador.metricas.progresso(self, min(100.0, self.tempo_decorrido_antes_pausa / self.tempo_total * 100))
+        self._mudar_estado(estado)
+
+    def tentar_acessar_recursos(self):
+        """Tenta acessar um conjunto aleatório de recursos, um de cada vez ou como um conjunto"""
+        sim = self.simulador
+        self._pausar_execucao("acessando_recursos")
+        self.inicio_espera = sim.relogio.time()
+        if self.roteiro is None:
+            # Escolhe direto entre todos os recursos, sem preferir os livres:
+            # com muitos recursos a varredura por livres custaria O(M) por tentativa
+            recursos_para_tentar = sim.escolher_recursos(self.recursos_por_acesso)
+            operacoes = None
+        else:
+            pedidos = self.roteiro[self.passo_roteiro][0]
+            recursos_para_tentar = [sim.recurso(item_id) for item_id, _ in pedidos]
+            operacoes = [operacao for _, operacao in pedidos]
+        if sim.aquisicao == INCREMENTAL and sim.hierarquia is None:
+            for indice, recurso in enumerate(recursos_para_tentar):
+                # Marca como desejado antes de acessar, para o liberar encontrar a transação na fila
+                self.recursos_desejados.append(recurso)
+                operacao = self._operacao(operacoes, indice)
+                if recurso.acessar(self, operacao):
+                    self.recursos_desejados.remove(recurso)
+                    self.recursos_acesso.append(recurso)
+                    sim.concessoes_imediatas += 1
+                elif self.estado == "abortada":
+                    # A política de concorrência abortou esta transação
+                    return
+                else:
+                    sim.esperas += 1
+        else:
+            # O conjunto todo num pedido só (ver PedidoConjunto)
+            pedidos = [(recurso, self._operacao(operacoes, indice))
+                       for indice, recurso in enumerate(recursos_para_tentar)]
+            if sim.hierarquia:
+                # Com as intenções nos ancestrais, de cima para baixo
+                self.pedido = sim.hierarquia.pedido(self, pedidos)
+            else:
+                self.pedido = PedidoConjunto(self, pedidos, sim.aquisicao)
+            concluido = self.pedido.avancar()
+            if self.estado == "abortada":
+                return
+            sim.concessoes_imediatas += len(self.recursos_acesso)
+            if concluido:
+                self._iniciar_retencao()
+            else:
+                sim.esperas += 1
+                self._aguardar()
+            return
+
+        if self.recursos_desejados:
+            self._aguardar()
+        else:
+            self._iniciar_retencao()
+
+    def _operacao(self, operacoes, indice):
+        if operacoes is None:
+            return "ler" if self.simulador.rng.random() < self.fracao_leitura else "escrever"
+        return operacoes[indice]
+
+    def _aguardar(self):
+        sim = self.simulador
+        self._mudar_estado("aguardando_recursos")
+        tempo_limite = sim.politica.tempo_limite
+        if tempo_limite is not None:
+            sim.agendar(sim.relogio.time() + tempo_limite, self, self.expirar_espera)
+
+    def expirar_espera(self):
+        """Passou do tempo limite na fila sem receber todos os recursos"""
+        self.simulador.expiradas += 1
+        self.morrer()
+
+    def recurso_concedido(self, recurso):
+        """Chamado pelo recurso quando a fila de espera concede o acesso a esta transação"""
+        self.simulador.concessoes_fila += 1
+        self.recursos_desejados.remove(recurso)
+        self.recursos_acesso.append(recurso)
+        if self.pedido:
+            # Ordenada: com este em mãos, pede o próximo da ordem
+            self.pedido.concedido(recurso)
+            self._agendar_continuacao()
+        elif not self.recursos_desejados:
+            self._iniciar_retencao()
+
+    def recurso_liberado(self, recurso):
+        """Chamado pelo recurso quando ele foi liberado sem ninguém na fila para recebê-lo"""
+        if self.estado != "aguardando_recursos":
+            # Ainda dentro do próprio acessar (ex.: feriu o dono): o resultado dele decide
+            return
+        if self.pedido:
+            if self.pedido.modo == ATOMICA:
+                self.conjunto_liberado(recurso)
+                return
+            if self.pedido.avancando:
+                return
+            # Ordenada: a entrada na fila se perdeu (ex.: ferida), pede de novo
+            self.recursos_desejados.discard(recurso)
+            self._agendar_continuacao()
+            return
+        self.recursos_desejados.remove(recurso)
+        if not self.recursos_desejados:
+            if self.recursos_acesso:
+                self._iniciar_retencao()
+            else:
+                self._entrar_execucao()
+
+    def conjunto_liberado(self, recurso):
+        """Chamado pelo recurso quando chega a vez do pedido atômico na fila dele"""
+        if self.estado != "aguardando_recursos" or self.pedido is None or self.pedido.avancando:
+            return
+        # Só volta a pedir quando o conjunto inteiro pode ser concedido
+        if self.pedido.pronto():
+            self._agendar_continuacao()
+
+    def _agendar_continuacao(self):
+        """Continua o pedido no mesmo instante, mas como um evento próprio
+
+        Fora da pilha do liberar que avisou a transação: o novo pedido é uma
+        entrada de nível 0 no rastro, que a reprodução reaplica.
+        """
+        self.simulador.agendar(self.simulador.relogio.time(), self, self._continuar_pedido)
+
+    def _continuar_pedido(self):
+        if self.pedido is None:
+            return
+        if self.pedido.avancar():
+            self._iniciar_retencao()
+        # Senão segue aguardando (ou a política a abortou); o tempo limite do primeiro pedido continua valendo
+
+    def _iniciar_retencao(self):
+        """Com todos os recursos em mãos, agenda a liberação de cada um"""
+        sim = self.simulador
+        agora = sim.relogio.time()
+        self.pedido = None
+        self._mudar_estado("acessando_recursos")
+        sim.tempos_espera.append(agora - self.inicio_espera)
+        retencao = None
+        if self.roteiro is not None:
+            retencao = self.roteiro[self.passo_roteiro][1]
+            self.passo_roteiro += 1
+        for recurso in self.recursos_acesso:
+            duracao = retencao if retencao is not None else sim.rng.uniform(self.tempo_min_acesso, self.tempo_max_acesso)
+            self.tempos_acesso[recurso] = (agora, duracao)
+            sim.agendar(agora + duracao, self, self.liberar_recurso, recurso)
+
+    def liberar_recurso(self, recurso):
+        """Fim do tempo de acesso a um recurso"""
+        recurso.liberar(self)
+        self.recursos_acesso.remove(recurso)
+        del self.tempos_acesso[recurso]
+        # Se liberou todos os recursos, volta ao estado de execução
+        if not self.recursos_acesso:
+            self._entrar_execucao()
+
+    def concluir(self):
+        self._pausar_execucao("executando")
+        self.esta_ativa = False
+        self.tempo_fim = self.simulador.relogio.time()
+        self.resultado = f"Thread {self.nome} finalizou com sucesso!"
+        self.simulador.concluidas += 1
+        self.simulador.latencias.append(self.tempo_fim - self.chegada)
+        if self.simulador.reinicio:
+            self.simulador.reinicio.concluida()
+
+    def trabalho_realizado(self):
+        """Tempo virtual de execução já feito, perdido se a transação for abortada"""
+        trabalho = self.tempo_decorrido_antes_pausa
+        if self.estado == "executando":
+            trabalho += self.simulador.relogio.time() - self.tempo_inicio
+        return trabalho
+
+    def idade(self):
+        return self.simulador.relogio.time() - self.chegada
+
+    def morrer(self):
+        """Aborta a transação, liberando tudo que ela segura"""
+        self.simulador.trabalho_perdido += self.trabalho_realizado()
+        if self.simulador.metricas:
+            self.simulador.metricas.abortada(self)
+        if self.estado == "executando":
+            self._pausar_execucao("abortada")
+        else:
+            self._mudar_estado("abortada")
+        if self.pedido:
+            self.pedido.desistir()
+            self.pedido = None
+        with registrar(self.simulador.rastro, "aborto", self):
+            # Sai das filas antes de liberar, para não receber o que ela mesma solta
+            for recurso in list(self.recursos_desejados):
+                recurso.cancelar(self)
+            self.recursos_desejados.clear()
+            recursos = list(self.recursos_acesso)
+            self.recursos_acesso.clear()
+            self.tempos_acesso.clear()
+            for recurso in recursos:
+                recurso.liberar(self)
+        self.esta_ativa = False
+        self.tempo_fim = self.simulador.relogio.time()
+        self.resultado = f"Thread {self.nome}: Abortada!"
+        self.simulador.abortadas += 1
+        if self.simulador.reinicio:
+            atraso = self.simulador.reinicio.atraso(self)
+            if atraso is not None:
+                self.simulador.agendar(self.tempo_fim + atraso, self, self.reiniciar)
+
+    def reiniciar(self):
+        """Recomeça do zero depois de um aborto, com o mesmo timestamp (prioridade)"""
+        self.reinicios += 1
+        self.tempo_decorrido_antes_pausa = 0
+        self.passo_roteiro = 0
+        self.tempo_fim = None
+        self.resultado = None
+        self.iniciar()
+
+
+class Simulador:
+    """Executa transações simuladas sobre recursos compartilháveis num relógio virtual"""
+    def __init__(self, recursos=("X", "Y"), semente=None, preferencia="justa", politica=None,
+                 detectar_deadlocks=None, distribuicao="uniforme", expoente_zipf=1.0, metricas=True,
+                 rastro=None, aquisicao=INCREMENTAL, vitima="custo", reiniciar=False, max_reinicios=None,
+                 atraso_maximo=None, guardar_transacoes=True, hierarquia=None, limite_escalonamento=100):
+        self.relogio = RelogioVirtual()
+        self.rng = random.Random(semente)
+        self.eventos = []  # Heap de (instante, sequência, versão, transação, ação, argumentos)
+        self._sequencia = itertools.count()
+        if not isinstance(politica, PoliticaConcorrencia):
+            politica = criar_politica(politica or "esperar")
+        self.politica = politica
+        # Como cada transação pede seus recursos: incremental, atômica ou ordenada (ver PedidoConjunto)
+        if aquisicao not in AQUISICOES:
+            raise ValueError(f"Aquisição desconhecida: {aquisicao}")
+        self.aquisicao = aquisicao
+        # Transações abortadas recomeçam depois de um backoff (ver reinicio.py)
+        teto = {} if atraso_maximo is None else {'maximo': atraso_maximo}
+        self.reinicio = Reinicio(max_reinicios=max_reinicios, rng=self.rng, relogio=self.relogio, **teto) if reiniciar else None
+        self.preferencia = preferencia
+        recursos = list(recursos)
+        # Como as transações escolhem os recursos: "uniforme" ou "zipf" (poucos recursos quentes)
+        if distribuicao not in ("uniforme", "zipf"):
+            raise ValueError(f"Distribuição desconhecida: {distribuicao}")
+        self.distribuicao = distribuicao
+        # O detector roda junto com os eventos: a vítima é abortada no mesmo instante virtual.
+        # Por padrão só liga quando a política sozinha não evita deadlock
+        if detectar_deadlocks is None:
+            detectar_deadlocks = politica.precisa_detector
+        # A vítima de cada ciclo: "custo" (menos trabalho perdido) ou "prioridade" (a de menor prioridade)
+        self.detector = DetectorDeadlock(escolher_vitima=criar_escolha_vitima(vitima)) if detectar_deadlocks else None
+        # Métricas por recurso e por transação, no tempo virtual
+        self.metricas = Metricas(self.relogio) if metricas else None
+        if self.detector:
+            self.detector.registro_metricas = self.metricas
+        # Gravação dos eventos para reprodução (rastro = caminho do arquivo .jsonl)
+        self.rastro = None
+        if rastro:
+            self.rastro = Rastro(rastro, relogio=self.relogio, recursos=recursos, semente=semente,
+                                 politica=politica.nome, tempo_limite=politica.tempo_limite,
+                                 preferencia=preferencia)
+        # Tabelas com páginas e linhas, com locks de intenção e escalonamento (ver hierarquia.py)
+        self.hierarquia = Hierarquia(limite_escalonamento) if hierarquia else None
+        self.recursos = {}
+        self.lista_recursos = []  # Os recursos que as transações sorteiam
+        sorteaveis = recursos
+        if self.hierarquia:
+            # As transações sorteiam entre as linhas; tabelas e páginas só recebem intenções e escalonamentos
+            paginas, linhas = hierarquia
+            sorteaveis = [f"{tabela}{SEPARADOR}P{pagina}{SEPARADOR}L{linha}"
+                          for tabela in recursos for pagina in range(paginas) for linha in range(linhas)]
+        for item_id in sorteaveis:
+            self.adicionar_recurso(item_id)
+        self._pesos_acumulados = None
+        if distribuicao == "zipf":
+            pesos = (1 / (posicao ** expoente_zipf) for posicao in range(1, len(self.lista_recursos) + 1))
+            self._pesos_acumulados = list(itertools.accumulate(pesos))
+        # Sem guardar, só as transações em andamento ficam na memória (cargas lidas de arquivos enormes)
+        self.guardar_transacoes = guardar_transacoes
+        self.transacoes = []
+        self.quantidade_transacoes = 0
+        self.por_estado = {}  # Estado -> quantas transações estão nele
+        self.carga = None  # Itens ainda não lidos da carga (ver carregar)
+        self.versao = 0  # Os eventos da própria carga nunca perdem a validade
+        # Contadores
+        self.eventos_processados = 0
+        self.concessoes_imediatas = 0
+        self.concessoes_fila = 0
+        self.esperas = 0
+        self.concluidas = 0
+        self.abortadas = 0
+        self.expiradas = 0
+        self.trabalho_perdido = 0.0  # Tempo de execução jogado fora pelos abortos
+        self.tempos_espera = []  # Do pedido até ter todos os recursos, por acesso bem-sucedido
+        self.latencias = []  # Da chegada à conclusão, por transação concluída
+        self.tempo_real = 0.0
+        self.tempo_cpu = 0.0
+
+    def adicionar_recurso(self, item_id):
+        recurso = self._registrar(item_id)
+        self.lista_recursos.append(recurso)
+        return recurso
+
+    def _registrar(self, item_id):
+        # Sem lista de threads: na simulação todo waiter entra na fila do recurso
+        if self.hierarquia:
+            caminho_pai = item_id.rpartition(SEPARADOR)[0]
+            if caminho_pai and caminho_pai not in self.recursos:
+                # Os ancestrais existem antes dos nós abaixo deles, mas não são sorteados
+                self._registrar(caminho_pai)
+            recurso = self.hierarquia.adicionar(item_id, preferencia=self.preferencia, politica=self.politica)
+        else:
+            recurso = RecursoCompartilhavel(item_id, preferencia=self.preferencia, politica=self.politica)
+        recurso.detector = self.detector
+        recurso.registro_metricas = self.metricas
+        recurso.rastro = self.rastro
+        self.recursos[item_id] = recurso
+        return recurso
+
+    def recurso(self, item_id):
+        """O recurso pelo nome; os que a carga cita sem declarar são criados aqui"""
+        recurso = self.recursos.get(item_id)
+        return recurso if recurso is not None else self.adicionar_recurso(item_id)
+
+    def escolher_recursos(self, quantidade):
+        """Sorteia `quantidade` recursos distintos conforme a distribuição"""
+        if self._pesos_acumulados is None:
+            return self.rng.sample(self.lista_recursos, quantidade)
+        escolhidos = {}
+        total = self._pesos_acumulados[-1]
+        while len(escolhidos) < quantidade:
+            posicao = bisect.bisect(self._pesos_acumulados, self.rng.random() * total)
+            recurso = self.lista_recursos[min(posicao, len(self.lista_recursos) - 1)]
+            escolhidos[recurso] = None
+        return list(escolhidos)
+
+    def agendar(self, instante, transacao, acao, *argumentos):
+        heapq.heappush(self.eventos, (instante, next(self._sequencia), transacao.versao, transacao, acao, argumentos))
+
+    def adicionar_transacao(self, prioridade, nome=None, chegada=0.0, recursos_por_acesso=1,
+                            tempo_min_acesso=15, tempo_max_acesso=30, fracao_leitura=0.5, tempo=None, roteiro=None):
+        self.quantidade_transacoes += 1
+        if nome is None:
+            nome = str(self.quantidade_transacoes)
+        transacao = TransacaoSimulada(self, nome, prioridade, chegada, recursos_por_acesso)
+        if tempo is not None:
+            transacao.tempo_total = tempo
+        transacao.roteiro = roteiro
+        transacao.tempo_min_acesso = tempo_min_acesso
+        transacao.tempo_max_acesso = tempo_max_acesso
+        transacao.fracao_leitura = fracao_leitura
+        self.por_estado[transacao.estado] = self.por_estado.get(transacao.estado, 0) + 1
+        if self.guardar_transacoes:
+            self.transacoes.append(transacao)
+        self.agendar(chegada, transacao, transacao.iniciar)
+        return transacao
+
+    def carregar(self, carga, tempo_min_acesso=15, tempo_max_acesso=30):
+        """Usa a carga de um arquivo (caminho) ou os itens de carga.interpretar
+
+        Lê só até a próxima transação e agenda a chegada dela; o resto é lido
+        conforme o relógio chega lá. Os tempos de acesso valem para os acessos
+        sem retenção na carga.
+        """
+        if isinstance(carga, str):
+            carga = ler_carga(carga)
+        self.carga = (iter(carga), tempo_min_acesso, tempo_max_acesso)
+        self._ler_carga()
+
+    def _ler_carga(self):
+        itens, tempo_min_acesso, tempo_max_acesso = self.carga
+        for tipo, item in itens:
+            if tipo == RECURSO:
+                self.recurso(item)
+                continue
+            self.adicionar_transacao(item['prioridade'], nome=item['nome'], chegada=item['chegada'],
+                                     tempo=item['tempo'], roteiro=item['roteiro'],
+                                     tempo_min_acesso=tempo_min_acesso, tempo_max_acesso=tempo_max_acesso)
+            # Depois da chegada dela (mesmo instante, evento seguinte), lê a próxima
+            self.agendar(item['chegada'], self, self._ler_carga)
+            return
+        self.carga = None
+
+    def gerar_transacoes(self, quantidade, tempo_min=15, tempo_max=30, tempo_min_acesso=15,
+                         tempo_max_acesso=30, taxa_chegada=None, recursos_por_acesso=1, fracao_leitura=0.5):
+        """Gera transações aleatórias como gerar_threads_aleatorias da aplicação
+
+        Sem taxa_chegada todas chegam no instante zero; com ela as chegadas
+        seguem um processo de Poisson (chegadas por segundo). Cada acesso pede
+        `recursos_por_acesso` recursos distintos, então não pode passar do
+        número de recursos sorteáveis.
+        """
+        if not 1 <= recursos_por_acesso <= len(self.lista_recursos):
+            raise ValueError(f"recursos_por_acesso deve estar entre 1 e {len(self.lista_recursos)} "
+                             f"(recursos sorteáveis), não {recursos_por_acesso}")
+        chegada = 0.0
+        for _ in range(quantidade):
+            if taxa_chegada:
+                chegada += self.rng.expovariate(taxa_chegada)
+            self.adicionar_transacao(
+                self.rng.uniform(tempo_min, tempo_max),
+                chegada=chegada,
+                recursos_por_acesso=recursos_por_acesso,
+                tempo_min_acesso=tempo_min_acesso,
+                tempo_max_acesso=tempo_max_acesso,
+                fracao_leitura=fracao_leitura
+            )
+
+    def executar(self, ate=None):
+        """Processa eventos até a heap esvaziar ou o relógio passar de `ate`"""
+        inicio = time.perf_counter()
+        inicio_cpu = time.process_time()
+        eventos = self.eventos
+        relogio = self.relogio
+        detector = self.detector
+        processados = 0
+        while eventos:
+            if ate is not None and eventos[0][0] > ate:
+                relogio.agora = ate
+                break
+            instante, _, versao, transacao, acao, argumentos = heapq.heappop(eventos)
+            # Evento agendado antes de uma mudança de estado: descarta
+            if versao != transacao.versao:
+                continue
+            relogio.agora = instante
+            acao(*argumentos)
+            if detector and detector.pendentes:
+                detector.processar()
+            processados += 1
+        self.eventos_processados += processados
+        self.tempo_real += time.perf_counter() - inicio
+        self.tempo_cpu += time.process_time() - inicio_cpu
+        return self.resumo()
+
+    def resumo(self):
+        """Resumo da execução até o momento"""
+        bloqueadas = self.por_estado.get("aguardando_recursos", 0)
+        tempo_simulado = self.relogio.time()
+        latencias = sorted(self.latencias)
+        esperas = sorted(self.tempos_espera)
+        terminadas = self.concluidas + self.abortadas
+        resumo = {
+            'politica': repr(self.politica),
+            'aquisicao': self.aquisicao,
+            'transacoes': self.quantidade_transacoes,
+            'recursos': len(self.recursos),
+            'concluidas': self.concluidas,
+            'abortadas': self.abortadas,
+            'expiradas': self.expiradas,
+            'bloqueadas': bloqueadas,
+            'taxa_aborto': self.abortadas / terminadas if terminadas else 0.0,
+            'trabalho_perdido': self.trabalho_perdido,
+            'concessoes_imediatas': self.concessoes_imediatas,
+            'concessoes_fila': self.concessoes_fila,
+            'esperas': self.esperas,
+            'eventos': self.eventos_processados,
+            'tempo_simulado': tempo_simulado,
+            'tempo_real': self.tempo_real,
+            'tempo_cpu': self.tempo_cpu,
+            'cpu_por_transacao': self.tempo_cpu / terminadas if terminadas else 0.0,
+            'vazao': self.concluidas / tempo_simulado if tempo_simulado else 0.0,
+            'latencia_media': sum(latencias) / len(latencias) if latencias else 0.0,
+            'latencia_p50': percentil(latencias, 50),
+            'latencia_p99': percentil(latencias, 99),
+            'espera_media': sum(esperas) / len(esperas) if esperas else 0.0,
+            'espera_p50': percentil(esperas, 50),
+            'espera_p99': percentil(esperas, 99),
+            'espera_p999': percentil(esperas, 99.9),
+        }
+        if self.detector:
+            resumo.update(self.detector.metricas())
+        if self.reinicio:
+            resumo.update(self.reinicio.metricas())
+        if self.hierarquia:
+            resumo.update(self.hierarquia.metricas())
+        return resumo
+
+
+def percentil(valores_ordenados, p):
+    """Percentil p (0-100) de uma lista já ordenada, pelo método do vizinho mais próximo"""
+    if not valores_ordenados:
+        return 0.0
+    indice = min(len(valores_ordenados) - 1, int(len(valores_ordenados) * p / 100))
+    return valores_ordenados[indice]
+
+
+def caminho_por_politica(caminho, politica, politicas):
+    """Com várias políticas na mesma execução, cada uma grava no próprio arquivo"""
+    if not caminho or len(politicas) == 1:
+        return caminho
+    base, ponto, extensao = caminho.rpartition(".")
+    return f"{base}-{politica}.{extensao}" if ponto else f"{caminho}-{politica}"
+
+
+SAIDAS = ("resumo", "json", "prometheus")
+
+
+def criar_parser():
+    parser = argparse.ArgumentParser(description="Simulação headless de transações sobre recursos compartilháveis")
+    parser.add_argument("--config", help="Arquivo JSON com valores para as opções abaixo (as da linha de comando valem mais)")
+    parser.add_argument("--carga", help="Lê recursos e transações do arquivo .jsonl (ver carga.py) em vez de sortear")
+    parser.add_argument("--transacoes", type=int, default=1000)
+    parser.add_argument("--recursos", type=int, default=100)
+    parser.add_argument("--recursos-por-acesso", type=int, default=1)
+    parser.add_argument("--taxa-chegada", type=float, default=None)
+    parser.add_argument("--fracao-leitura", type=float, default=0.5)
+    parser.add_argument("--distribuicao", choices=["uniforme", "zipf"], default="uniforme",
+                        help="Escolha dos recursos: uniforme ou zipf (recursos quentes)")
+    parser.add_argument("--preferencia", choices=["justa", "leitores", "escritores"], default="justa")
+    parser.add_argument("--semente", type=int, default=None)
+    parser.add_argument("--politica", choices=list(POLITICAS) + ["todas"], default="esperar",
+                        help="Controle de concorrência; \"todas\" compara as políticas na mesma carga")
+    parser.add_argument("--tempo-limite", type=float, default=5.0, help="Tempo limite da política timeout")
+    parser.add_argument("--aquisicao", choices=AQUISICOES, default=INCREMENTAL,
+                        help="Como pedir vários recursos: um de cada vez, todos de uma vez ou na ordem global")
+    parser.add_argument("--vitima", choices=ESCOLHAS_VITIMA, default="custo",
+                        help="Como o detector escolhe quem abortar em cada ciclo")
+    parser.add_argument("--reiniciar", action="store_true",
+                        help="Recomeça as transações abortadas com o mesmo timestamp, após um backoff")
+    parser.add_argument("--max-reinicios", type=int, default=None)
+    parser.add_argument("--atraso-maximo", type=float, default=None,
+                        help="Teto em segundos do backoff de cada transação antes de um reinício (padrão: o de reinicio.py)")
+    parser.add_argument("--hierarquia", type=int, nargs=2, metavar=("PAGINAS", "LINHAS"),
+                        help="Cada recurso vira uma tabela com PAGINAS páginas de LINHAS linhas, com locks de intenção "
+                             "(com --carga, 0 0: a árvore vem dos nomes, como A/P0/L1)")
+    parser.add_argument("--escalonamento", type=int, default=100,
+                        help="Acima de quantas linhas (ou páginas) sob o mesmo pai a transação trava o pai inteiro")
+    parser.add_argument("--sem-deteccao", action="store_true", help="Não detecta nem resolve deadlocks")
+    parser.add_argument("--rastro", help="Grava os eventos no arquivo .jsonl (reproduza com reproducao.py)")
+    parser.add_argument("--metricas", help="Salva as métricas no arquivo (.prom para Prometheus, JSON nos outros)")
+    parser.add_argument("--servir-metricas", type=int, metavar="PORTA",
+                        help="Serve as métricas em http://127.0.0.1:PORTA/metrics até Ctrl+C")
+    parser.add_argument("--saida", choices=SAIDAS, default="resumo",
+                        help="O que imprimir: o resumo em texto, o resumo em JSON ou as métricas do Prometheus")
+    return parser
+
+
+def ler_argumentos(parser, argv=None):
+    """Lê a linha de comando; o --config, se houver, troca os valores padrão das opções"""
+    previa, _ = parser.parse_known_args(argv)
+    if previa.config:
+        with open(previa.config, encoding="utf-8") as arquivo:
+            config = json.load(arquivo)
+        opcoes = {acao.dest for acao in parser._actions}
+        padroes = {}
+        for chave, valor in config.items():
+            destino = chave.lstrip("-").replace("-", "_")
+            if destino not in opcoes or destino in ("help", "config"):
+                parser.error(f"opção desconhecida em {previa.config}: {chave}")
+            padroes[destino] = valor
+        parser.set_defaults(**padroes)
+    return parser.parse_args(argv)
+
+
+def principal(argv=None):
+    """Roda a simulação pedida na linha de comando (ou em argv) e imprime o resultado"""
+    parser = criar_parser()
+    args = ler_argumentos(parser, argv)
+    politicas = list(POLITICAS) if args.politica == "todas" else [args.politica]
+    com_metricas = bool(args.metricas or args.servir_metricas or args.saida == "prometheus")
+    resumos = []
+    simuladores = []
+    for nome in politicas:
+        anterior = simuladores[-1] if simuladores else None
+        # A carga lida de arquivo não fica na memória: nem as transações concluídas, nem as métricas por transação
+        recursos = () if args.carga else [f"R{i}" for i in range(args.recursos)]
+        # A mesma semente gera a mesma carga para todas as políticas
+        simulador = Simulador(recursos, semente=args.semente,
+                              preferencia=args.preferencia,
+                              politica=criar_politica(nome, args.tempo_limite),
+                              detectar_deadlocks=False if args.sem_deteccao else None,
+                              distribuicao=args.distribuicao, aquisicao=args.aquisicao, vitima=args.vitima,
+                              reiniciar=args.reiniciar, max_reinicios=args.max_reinicios,
+                              atraso_maximo=args.atraso_maximo,
+                              hierarquia=args.hierarquia, limite_escalonamento=args.escalonamento,
+                              rastro=caminho_por_politica(args.rastro, nome, politicas),
+                              metricas=not args.carga or com_metricas,
+                              guardar_transacoes=not args.carga)
+        simuladores.append(simulador)
+        if args.carga:
+            simulador.carregar(args.carga)
+        else:
+            try:
+                simulador.gerar_transacoes(args.transacoes, taxa_chegada=args.taxa_chegada,
+                                           recursos_por_acesso=args.recursos_por_acesso,
+                                           fracao_leitura=args.fracao_leitura)
+            except ValueError as erro:
+                parser.error(str(erro))
+        if args.servir_metricas:
+            # O endpoint acompanha a simulação em andamento
+            if anterior:
+                anterior.metricas.parar()
+            simulador.metricas.servir(args.servir_metricas)
+        resumos.append(simulador.executar())
+        if simulador.rastro:
+            simulador.rastro.fechar()
+        if args.metricas:
+            simulador.metricas.salvar(caminho_por_politica(args.metricas, nome, politicas))
+
+    if args.saida == "json":
+        print(json.dumps(resumos[0] if len(resumos) == 1 else resumos, ensure_ascii=False, indent=2))
+    elif args.saida == "prometheus":
+        for nome, simulador in zip(politicas, simuladores):
+            if len(politicas) > 1:
+                print(f"# politica {nome}")
+            print(simulador.metricas.prometheus(), end="")
+    elif len(resumos) == 1:
+        for chave, valor in resumos[0].items():
+            print(f"{chave}: {valor}")
+    else:
+        print(f"{'politica':<14}{'concluidas':>11}{'abortadas':>10}{'taxa_aborto':>12}"
+              f"{'vazao':>9}{'lat_p50':>9}{'lat_p99':>9}")
+        for resumo in resumos:
+            print(f"{resumo['politica']:<14}{resumo['concluidas']:>11}{resumo['abortadas']:>10}"
+                  f"{resumo['taxa_aborto']:>12.3f}{resumo['vazao']:>9.3f}"
+                  f"{resumo['latencia_p50']:>9.1f}{resumo['latencia_p99']:>9.1f}")
+
+    if args.servir_metricas:
+        print(f"Métricas em http://127.0.0.1:{args.servir_metricas}/metrics (Ctrl+C para sair)")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+    return resumos
+
+
+if __name__ == "__main__":
+    principal()
@@ -0,0 +1,16 @@
+import pytest
+
+from carga import ler_carga
+
+
+@pytest.mark.parametrize("linha, mensagem", [
+    ('{"transacao": "T1", "tempo": 5, "ler": ["X"], "retencao": "muito"}', "retenção é um número"),
+    ('{"transacao": "T1", "tempo": 5, "acessos": ["X"]}', "cada acesso é um objeto"),
+    ('{"transacao": "T1", "tempo": 5, "acessos": {"ler": ["X"]}}', "\"acessos\" é uma lista"),
+    ('{"transacao": "T1", "tempo": 5, "escrever": 3}', "ler e escrever são listas de recursos"),
+])
+def test_linha_malformada_diz_o_numero_da_linha(tmp_path, linha, mensagem):
+    caminho = tmp_path / "carga.jsonl"
+    caminho.write_text('{"recurso": "X"}\n\n' + linha + "\n", encoding="utf-8")
+    with pytest.raises(ValueError, match=f"^linha 3: {mensagem}$"):
+        list(ler_carga(caminho))
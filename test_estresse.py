@@ -0,0 +1,22 @@
+from estresse import estressar
+
+
+def sem_problemas(resultado):
+    assert resultado['donos_em_dobro'] == 0, resultado['exemplos']
+    assert resultado['concessoes_perdidas'] == 0, resultado['exemplos']
+    assert resultado['recursos_sujos'] == 0, resultado['exemplos']
+    assert resultado['concessoes'] > 0
+
+
+def test_latches_fragmentados_sem_donos_em_dobro_nem_concessoes_perdidas():
+    sem_problemas(estressar(threads=8, recursos=4, operacoes=1000, semente=1))
+
+
+def test_um_latch_so_para_todos_os_recursos():
+    sem_problemas(estressar(threads=8, recursos=4, operacoes=1000, fragmentos=1, preferencia="escritores", semente=2))
+
+
+def test_pedidos_atomicos_no_meio_dos_comuns():
+    for semente, preferencia in enumerate(("justa", "leitores", "escritores"), 3):
+        sem_problemas(estressar(threads=8, recursos=4, operacoes=1000, fracao_conjunto=0.4, fragmentos=1,
+                                preferencia=preferencia, semente=semente))
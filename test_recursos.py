@@ -0,0 +1,124 @@
+from deadlock import DetectorDeadlock
+from hierarquia import IS, IX, S, X, RecursoHierarquico
+from recursos import PedidoConjunto, RecursoCompartilhavel
+from reproducao import TransacaoReproduzida
+from simulacao import Simulador
+
+
+def test_detector_ve_o_ciclo_que_passa_por_uma_reserva():
+    detector = DetectorDeadlock(escolher_vitima=lambda ciclo: max(ciclo, key=lambda thread: thread.prioridade))
+    a, b = RecursoCompartilhavel("A"), RecursoCompartilhavel("B")
+    a.detector = b.detector = detector
+    antiga, nova = TransacaoReproduzida("antiga", 1, None), TransacaoReproduzida("nova", 2, None)
+    nova.pedir(b, "escrever")
+    # A antiga espera por B sem segurar nada, mas guarda o lugar em A (livre)
+    pedido = PedidoConjunto(antiga, [(a, "escrever"), (b, "escrever")])
+    assert not pedido.avancar()
+    # A nova, dona de B, fica atrás da reserva em A: ciclo nova -> antiga -> nova
+    nova.pedir(a, "escrever")
+    detector.processar()
+    assert detector.deadlocks == 1
+    assert nova.estado == "abortada"
+    assert pedido.avancar()
+
+
+def test_detector_ignora_reservas_de_quem_chegou_depois():
+    a = RecursoCompartilhavel("A")
+    antiga, nova = TransacaoReproduzida("antiga", 1, None), TransacaoReproduzida("nova", 2, None)
+    antiga.pedir(a, "escrever")
+    PedidoConjunto(nova, [(a, "escrever")]).avancar()
+    assert list(DetectorDeadlock.sucessores(nova)) == [antiga]
+    assert a.reservantes(antiga) == []
+
+
+def test_so_a_reserva_mais_proxima_vira_aresta():
+    a = RecursoCompartilhavel("A")
+    dono, antiga, media, nova = (TransacaoReproduzida(nome, prioridade, None)
+                                 for prioridade, nome in enumerate(("dono", "antiga", "media", "nova")))
+    dono.pedir(a, "escrever")
+    for thread in (nova, antiga, media):
+        PedidoConjunto(thread, [(a, "escrever")]).avancar()
+    # As mais antigas são alcançadas pela mais próxima, que também espera por elas
+    assert list(DetectorDeadlock.sucessores(nova)) == [dono, media]
+    assert list(DetectorDeadlock.sucessores(media)) == [dono, antiga]
+    assert list(DetectorDeadlock.sucessores(antiga)) == [dono]
+
+
+def test_reserva_fora_da_frente_nao_segura_o_recurso_livre():
+    a = RecursoCompartilhavel("A", preferencia="escritores")
+    dono, leitora, conjunto = (TransacaoReproduzida(nome, prioridade, None)
+                               for prioridade, nome in enumerate(("dono", "leitora", "conjunto"), 1))
+    dono.pedir(a, "escrever")
+    leitora.pedir(a, "ler")
+    conjunto.reservar(a, "escrever")
+    # A preferência por escritores não vale para a reserva: ela só pega o recurso
+    # na sua vez, então a leitora mais antiga entra em vez de o recurso ficar livre
+    dono.liberar(a)
+    assert list(a.threads_acessando) == [leitora]
+    leitora.liberar(a)
+    conjunto.tentar(a, "escrever")
+    assert list(a.threads_acessando) == [conjunto]
+
+
+def test_intencoes_compativeis_no_mesmo_pai_nao_fecham_ciclo():
+    detector = DetectorDeadlock()
+    tabela, linha = RecursoHierarquico("T"), RecursoHierarquico("T/P0/L0")
+    tabela.detector = linha.detector = detector
+    leitora, escritora, dona = (TransacaoReproduzida(nome, prioridade, None)
+                                for prioridade, nome in enumerate(("leitora", "escritora", "dona"), 1))
+    leitora.pedir(tabela, IS)
+    dona.pedir(tabela, S)
+    escritora.pedir(linha, X)
+    leitora.pedir(linha, X)
+    # O IX da escritora espera pelo S da dona, não pelo IS da leitora, que é compatível
+    escritora.pedir(tabela, IX)
+    assert list(DetectorDeadlock.sucessores(escritora)) == [dona]
+    detector.processar()
+    assert detector.deadlocks == 0
+    assert "abortada" not in (leitora.estado, escritora.estado, dona.estado)
+
+
+def test_hierarquia_sorteia_so_as_linhas():
+    simulador = Simulador(["A", "B"], hierarquia=(2, 3))
+    linhas = [recurso.item_id for recurso in simulador.lista_recursos]
+    assert linhas == [f"{tabela}/P{pagina}/L{linha}" for tabela in "AB" for pagina in range(2) for linha in range(3)]
+    # Tabelas e páginas existem, mas só recebem intenções
+    assert len(simulador.recursos) == 2 + 2 * 2 + len(linhas)
+
+
+def executar(tmp_path, politica, aquisicao):
+    simulador = Simulador([f"R{i}" for i in range(10)], semente=7, politica=politica, aquisicao=aquisicao,
+                          reiniciar=True, rastro=str(tmp_path / f"{politica}-{aquisicao}.jsonl"))
+    simulador.gerar_transacoes(60, recursos_por_acesso=3)
+    resumo = simulador.executar()
+    simulador.rastro.fechar()
+    assert resumo['concluidas'] == 60
+    return resumo['abortadas'], simulador.rastro.quantidade
+
+
+def test_atomica_aborta_menos_e_grava_menos_eventos_que_incremental(tmp_path):
+    abortos_atomica, eventos_atomica = executar(tmp_path, "wound-wait", "atomica")
+    abortos_incremental, eventos_incremental = executar(tmp_path, "wound-wait", "incremental")
+    assert abortos_atomica < 0.9 * abortos_incremental
+    assert eventos_atomica < eventos_incremental
+
+
+def test_atomica_grava_menos_eventos_no_wait_die(tmp_path):
+    # No wait-die quem morre é a mais nova, nos dois modos: a diferença fica nas esperas
+    _, eventos_atomica = executar(tmp_path, "wait-die", "atomica")
+    _, eventos_incremental = executar(tmp_path, "wait-die", "incremental")
+    assert eventos_atomica < eventos_incremental
+
+
+def tempo_cpu(detectar_deadlocks):
+    simulador = Simulador([f"R{i}" for i in range(20)], semente=3, politica="esperar", aquisicao="atomica",
+                          reiniciar=True, detectar_deadlocks=detectar_deadlocks)
+    simulador.gerar_transacoes(300, recursos_por_acesso=3)
+    resumo = simulador.executar()
+    assert resumo['concluidas'] == 300
+    return resumo['tempo_cpu']
+
+
+def test_detector_com_filas_de_reservas_longas_custa_pouco():
+    # As reservas ficam em ordem na fila: cada passo da busca olha só a mais próxima à frente
+    assert tempo_cpu(None) < 3 * tempo_cpu(False)
@@ -0,0 +1,105 @@
+import random
+import threading
+
+from reinicio import Reinicio
+from simulacao import Simulador
+
+
+class Abortada:
+    def __init__(self, reinicios=0):
+        self.reinicios = reinicios
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 0.0
+
+    def time(self):
+        return self.agora
+
+
+def test_teto_vale_para_o_atraso_com_a_contencao():
+    reinicio = Reinicio(base=1.0, maximo=60.0, rng=random.Random(0), relogio=Relogio())
+    # Muitos abortos sem nenhuma conclusão: contenção no máximo
+    atrasos = [reinicio.atraso(Abortada(reinicios)) for reinicios in range(40) for _ in range(50)]
+    assert max(atrasos) <= 60.0
+    assert 0.0 <= reinicio.contencao <= 1.0
+
+
+def test_abortos_simultaneos_nao_aumentam_o_atraso_de_cada_transacao():
+    reinicio = Reinicio(base=1.0, maximo=300.0, peso_contencao=4.0, rng=random.Random(0), relogio=Relogio())
+    atrasos = [reinicio.atraso(Abortada()) for _ in range(10000)]
+    # No primeiro reinício o teto é base * (1 + peso), por mais transações que abortem juntas
+    assert max(atrasos) <= 5.0
+
+
+def test_fila_de_reinicios_espalha_as_abortadas_no_ritmo_das_conclusoes():
+    relogio = Relogio()
+    reinicio = Reinicio(base=1.0, maximo=60.0, rng=random.Random(0), relogio=relogio)
+    for _ in range(3):
+        relogio.agora += 10.0
+        reinicio.concluida()
+    # Uma conclusão a cada 10 s e só abortos daqui em diante: o teto passa do máximo
+    atrasos = [reinicio.atraso(Abortada()) for _ in range(400)]
+    assert max(atrasos) > 60.0
+    assert max(atrasos[200:]) > max(atrasos[:100])
+    assert reinicio.metricas()['aguardando_reinicio'] == 400
+    # Os reinícios que já passaram saem da fila
+    relogio.agora += max(atrasos)
+    assert reinicio.aguardando(relogio.agora) == 0
+
+
+def test_concluir_reduz_a_contencao():
+    reinicio = Reinicio(rng=random.Random(0))
+    for _ in range(100):
+        reinicio.atraso(Abortada())
+    contencao = reinicio.contencao
+    for _ in range(100):
+        reinicio.concluida()
+    assert reinicio.contencao < contencao / 10
+
+
+def test_metricas_esperam_o_atraso_em_curso():
+    reinicio = Reinicio(rng=random.Random(0), relogio=Relogio())
+    reinicio.atraso(Abortada())
+    metricas = []
+    # Um atraso em curso em outra thread segura o lock: a leitura espera, sem mexer na fila de reinícios
+    with reinicio._lock:
+        leitura = threading.Thread(target=lambda: metricas.append(reinicio.metricas()))
+        leitura.start()
+        leitura.join(0.05)
+        assert leitura.is_alive()
+    leitura.join()
+    assert metricas[0]['aguardando_reinicio'] == 1
+    assert metricas[0]['reinicios'] == 1
+
+
+def executar(transacoes, politica):
+    simulador = Simulador([f"R{i}" for i in range(15)], semente=1, politica=politica, reiniciar=True)
+    simulador.gerar_transacoes(transacoes, recursos_por_acesso=2)
+    resumo = simulador.executar()
+    assert resumo['concluidas'] == transacoes
+    return resumo
+
+
+def vazao(transacoes, politica):
+    return executar(transacoes, politica)['vazao']
+
+
+def abortos_por_conclusao(transacoes, politica):
+    resumo = executar(transacoes, politica)
+    return resumo['abortadas'] / resumo['concluidas']
+
+
+def test_vazao_estavel_com_mais_transacoes():
+    # Carga saturada (15 recursos, 2 por acesso): quadruplicar as transações não derruba a vazão
+    for politica in ("wound-wait", "wait-die"):
+        assert vazao(400, politica) >= 0.8 * vazao(100, politica)
+
+
+def test_abortos_por_conclusao_nao_crescem_com_mais_transacoes():
+    # No no-wait e no timeout ninguém tem a vez: sem a fila de reinícios, viraria livelock
+    for politica in ("timeout", "no-wait", "wound-wait"):
+        poucas, muitas = abortos_por_conclusao(50, politica), abortos_por_conclusao(200, politica)
+        assert muitas <= 1.25 * poucas
+        assert muitas < 10
@@ -0,0 +1,540 @@
+"""Transações da aplicação: a máquina de estados e quem a executa.
+
+Uma transação alterna entre "executando", "aguardando_recursos",
+"acessando_recursos" e "abortada". A lógica fica em Transacao; a execução,
+numa thread por transação (MinhaThread) ou num pool de poucas threads de
+trabalho (TransacaoAgendada, em execucao.py). Com um Reinicio (reinicio.py),
+a transação abortada espera o backoff e recomeça no mesmo executor.
+"""
+import threading
+import time
+
+from prazos import AGENDA_PADRAO
+from rastro import registrar
+from recursos import ConjuntoRecursos, RecursosDesejados
+
+
+class GeradorLeve:
+    """Sorteios de uma transação com 8 bytes de estado (splitmix64)
+
+    random.Random guarda o estado do Mersenne Twister, uns 2,5 KB por
+    instância; com cem mil transações são centenas de MB só de geradores.
+    Aqui a mesma semente dá sempre a mesma sequência, que é o que importa.
+    """
+    __slots__ = ('estado',)
+
+    def __init__(self, semente=None):
+        if semente is None:
+            semente = time.time_ns() ^ id(self)
+        self.estado = hash(semente) & 0xFFFFFFFFFFFFFFFF
+
+    def _proximo(self):
+        self.estado = (self.estado + 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        z = self.estado
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+        return z ^ (z >> 31)
+
+    def random(self):
+        # 53 bits, como random.random()
+        return (self._proximo() >> 11) * (1.0 / (1 << 53))
+
+    def uniform(self, a, b):
+        return a + (b - a) * self.random()
+
+    def _abaixo(self, n):
+        return self._proximo() % n
+
+    def choice(self, sequencia):
+        return sequencia[self._abaixo(len(sequencia))]
+
+    def shuffle(self, lista):
+        for i in range(len(lista) - 1, 0, -1):
+            j = self._abaixo(i + 1)
+            lista[i], lista[j] = lista[j], lista[i]
+
+
+class Transacao:
+    """Máquina de estados de uma transação, sem thread própria
+
+    Quem executa chama iniciar(), depois passo() até ele dizer que terminou (ou
+    até em_andamento ficar falso), dormindo entre um passo e outro o que
+    proxima_acao() mandar ou até acordar() ser chamado, e por fim finalizar().
+    MinhaThread faz isso numa thread só dela; o PoolTransacoes (execucao.py),
+    com poucas threads para muitas transações.
+    """
+    # Sem __dict__ (exceto em MinhaThread, que herda o de Thread): o pool roda centenas de milhares delas
+    __slots__ = ('nome', 'rng', 'rastro', 'metricas', 'prioridade', 'resultado', 'esta_ativa', 'label_status',
+                 'progress_bar', 'tempo_total', 'recursos', 'recursos_acesso', 'tempos_acesso', 'prazos', 'vencidos',
+                 'tempo_pausa', 'tempo_inicio', 'ultima_tentativa_acesso', 'recursos_desejados', '_estado',
+                 'intervalo_min_acesso', 'intervalo_max_acesso', 'proximo_intervalo_acesso', 'primeira_tentativa',
+                 'tempo_min_acesso', 'tempo_max_acesso', 'tempo_decorrido_antes_pausa', 'tempo_pausa_inicio',
+                 'inicio_espera', 'intervalo_atualizacao', 'inicio_execucao', 'ultimo_passo', 'estado_espera',
+                 'reinicios', 'reinicio', 'reinicio_em', 'chegada')
+
+    def __init__(self, nome, prioridade=None, label_status=None, progress_bar=None, recursos=None, metricas=None,
+                 semente=None, prazos=None, reinicio=None):
+        self.nome = nome
+        # Sorteios próprios da thread: com a mesma semente, as mesmas escolhas
+        self.rng = GeradorLeve(semente)
+        self.rastro = None  # Gravação dos eventos para reprodução, opcional
+        self.metricas = metricas  # Registro de métricas (tempo em cada estado, progresso, abortos)
+        self.prioridade = prioridade if prioridade is not None else time.time()
+        self.resultado = None
+        self.esta_ativa = False
+        self.label_status = label_status
+        self.progress_bar = progress_bar
+        self.tempo_total = self.prioridade
+        self.recursos = recursos or []
+        self.recursos_acesso = ConjuntoRecursos()
+        self.tempos_acesso = {}  # recurso -> prazo do acesso na agenda
+        self.prazos = prazos or AGENDA_PADRAO  # Agenda que avisa quando cada acesso vence
+        self.vencidos = []  # Prazos vencidos que ainda não foram tratados (quase sempre zero ou um)
+        self.tempo_pausa = 0
+        self.tempo_inicio = 0  # Será inicializado no run
+        self.ultima_tentativa_acesso = 0  # Será inicializado no run
+        self.recursos_desejados = RecursosDesejados(self)
+        self.estado = "executando"
+        self.intervalo_min_acesso = 1  # Reduzido para 1 segundo
+        self.intervalo_max_acesso = 3  # Reduzido para 3 segundos
+        self.proximo_intervalo_acesso = self.rng.uniform(self.intervalo_min_acesso, self.intervalo_max_acesso)
+        self.primeira_tentativa = True  # Nova flag para primeira tentativa
+        # Tempos de acesso aos recursos
+        self.tempo_min_acesso = 15  # Tempo mínimo de acesso a um recurso
+        self.tempo_max_acesso = 30  # Tempo máximo de acesso a um recurso
+        # Variáveis para controle de progresso
+        self.tempo_decorrido_antes_pausa = 0
+        self.tempo_pausa_inicio = 0
+        self.inicio_espera = 0  # Quando começou a aguardar recursos (para o tempo limite da política)
+        self.intervalo_atualizacao = 0.1  # Atualização da barra enquanto executa
+        # Estado do laço de execução (ver iniciar/passo)
+        self.inicio_execucao = 0
+        self.ultimo_passo = 0
+        self.estado_espera = None  # Estado em que a transação foi dormir no último passo
+        self.reinicios = 0  # Quantas vezes foi abortada e recomeçou (pesa na escolha da vítima)
+        self.reinicio = reinicio  # Backoff dos reinícios depois de um aborto (None = abortada fica abortada)
+        self.reinicio_em = None  # Quando recomeçar, se foi abortada e vai recomeçar
+        self.chegada = 0  # Primeiro início: a idade não volta a zero nos reinícios
+
+    @property
+    def em_andamento(self):
+        """Executando, ou abortada esperando o backoff para recomeçar"""
+        return self.esta_ativa or self.reinicio_em is not None
+
+    @property
+    def estado(self):
+        return self._estado
+
+    @estado.setter
+    def estado(self, estado):
+        # Toda mudança de estado passa por aqui, então o tempo em cada estado sai de graça
+        self._estado = estado
+        if self.metricas:
+            self.metricas.mudou_estado(self, estado)
+    
+    def atualizar_cor_barra(self):
+        """Atualiza a cor da barra de progresso baseado no estado"""
+        if self.progress_bar:
+            if self.estado == "aguardando_recursos" and self.recursos_desejados:
+                self.progress_bar.configure(style="Yellow.Horizontal.TProgressbar")
+            elif self.estado == "abortada":
+                self.progress_bar.configure(style="Red.Horizontal.TProgressbar")
+            else:
+                self.progress_bar.configure(style="Horizontal.TProgressbar")
+    
+    def reset_recursos_acesso(self):
+        """Reseta todos os recursos que esta thread está acessando"""
+        # Percorre cópias: o próprio cancelar (ou outra thread) pode alterar os conjuntos
+        for recurso in list(self.recursos_desejados):
+            recurso.cancelar(self)
+        for recurso in list(self.recursos_acesso):
+            recurso.liberar(self)
+        self.recursos_acesso.clear()
+        self.cancelar_prazos()
+        self.recursos_desejados.clear()
+        if self.estado != "abortada":  # Só muda o estado se não estiver abortada
+            self.estado = "executando"
+            self.atualizar_cor_barra()
+        self.proximo_intervalo_acesso = self.rng.uniform(self.intervalo_min_acesso, self.intervalo_max_acesso)
+
+    def recurso_concedido(self, recurso):
+        """Chamado pelo recurso quando a fila de espera concede o acesso a esta thread"""
+        # Se conseguiu acessar, reseta o intervalo de tentativas da thread
+        self.proximo_intervalo_acesso = self.rng.uniform(self.intervalo_min_acesso, self.intervalo_max_acesso)
+        self.estado = "acessando_recursos"
+        self.atualizar_cor_barra()
+        # Remove o recurso dos recursos desejados
+        self.recursos_desejados.discard(recurso)
+        # Registra o acesso para que o tempo de acesso comece a contar agora
+        if recurso not in self.recursos_acesso:
+            self.recursos_acesso.append(recurso)
+            self.iniciar_prazo(recurso, self.rng.uniform(self.tempo_min_acesso, self.tempo_max_acesso))
+        self.acordar()
+
+    def recurso_liberado(self, recurso):
+        """Chamado pelo recurso quando ele foi liberado sem ninguém na fila para recebê-lo"""
+        # Reseta o intervalo de tentativas da thread
+        self.proximo_intervalo_acesso = self.rng.uniform(self.intervalo_min_acesso, self.intervalo_max_acesso)
+        # Remove o recurso dos recursos desejados
+        self.recursos_desejados.remove(recurso)
+        # Atualiza o estado da thread
+        if not self.recursos_desejados:
+            self.estado = "executando"
+            self.atualizar_cor_barra()
+        self.acordar()
+
+    def iniciar_prazo(self, recurso, duracao):
+        """Registra o acesso ao recurso e agenda a liberação para daqui a `duracao` segundos"""
+        self.tempos_acesso[recurso] = self.prazos.agendar(duracao, self.prazo_vencido, recurso)
+
+    def prazo_vencido(self, prazo):
+        """Chamado pela agenda (em outra thread) quando o acesso a um recurso vence"""
+        # Quem libera é a própria transação, no próximo passo
+        self.vencidos.append(prazo)
+        self.acordar()
+
+    def cancelar_prazos(self):
+        """Esquece os acessos em andamento (a transação liberou ou vai liberar tudo)"""
+        for prazo in list(self.tempos_acesso.values()):
+            self.prazos.cancelar(prazo)
+        self.tempos_acesso.clear()
+        self.vencidos.clear()
+
+    def acordar(self):
+        """Avisa quem executa a transação que ela tem algo a fazer antes do previsto"""
+        # Quem executa é que sabe acordar (MinhaThread, TransacaoAgendada); sem executor, nada a fazer
+        pass
+
+    def tempo_ate_proxima_acao(self, tempo_atual, tempo_inicio):
+        """Quanto a thread pode dormir até ter algo a fazer (None = até ser acordada)"""
+        if self.reinicio_em is not None:
+            return max(self.reinicio_em - tempo_atual, 0)
+        if self.estado == "executando":
+            proxima_tentativa = self.ultima_tentativa_acesso + self.proximo_intervalo_acesso
+            fim = tempo_inicio + self.tempo_pausa + self.tempo_total
+            espera = min(self.intervalo_atualizacao, proxima_tentativa - tempo_atual, fim - tempo_atual)
+            return max(espera, 0)
+        if self.estado == "aguardando_recursos" and self.recursos_desejados:
+            # Em espera os tempos de acesso não correm: só um recurso liberado
+            # (ou o tempo limite da política) acorda a thread
+            tempo_limite = self.tempo_limite_espera()
+            if tempo_limite is None:
+                return None
+            return max(self.inicio_espera + tempo_limite - tempo_atual, 0)
+        # Acessando: a agenda de prazos acorda a thread quando um acesso vence
+        return 0 if self.vencidos else None
+
+    def tempo_limite_espera(self):
+        """Menor tempo limite de espera entre as políticas dos recursos aguardados"""
+        limites = [r.politica.tempo_limite for r in list(self.recursos_desejados) if r.politica.tempo_limite is not None]
+        return min(limites) if limites else None
+
+    def verificar_tempo_acesso(self):
+        """Libera os recursos cujo prazo de acesso a agenda avisou que venceu"""
+        recursos_para_liberar = []
+        tempo_atual = time.time()
+        
+        while self.vencidos:
+            prazo = self.vencidos.pop(0)
+            recurso = prazo.chave
+            # Ignora o prazo de um acesso que já acabou (liberado ou cancelado antes de vencer)
+            if self.tempos_acesso.get(recurso) is prazo and recurso in self.recursos_acesso:
+                recursos_para_liberar.append(recurso)
+        
+        for recurso in recursos_para_liberar:
+            recurso.liberar(self)
+            self.recursos_acesso.remove(recurso)
+            del self.tempos_acesso[recurso]
+            status = f"Thread {self.nome} liberou recurso {recurso.item_id}"
+            if self.label_status:
+                self.label_status.config(text=status)
+        
+        # Se liberou todos os recursos, volta ao estado de execução
+        if not self.recursos_acesso:
+            self.estado = "executando"
+            self.atualizar_cor_barra()
+            self.proximo_intervalo_acesso = self.rng.uniform(self.intervalo_min_acesso, self.intervalo_max_acesso)
+            if recursos_para_liberar:
+                # O intervalo até a próxima tentativa conta a partir da liberação
+                self.ultima_tentativa_acesso = tempo_atual
+
+    def tentar_acessar_recursos(self):
+        """Tenta acessar todos os recursos desejados"""
+        # Sorteia a operação antes: leitores podem dividir um recurso em read_lock
+        operacao = self.rng.choice(["ler", "escrever"])
+        # Se não tem recursos desejados ou é primeira tentativa
+        if not self.recursos_desejados or self.primeira_tentativa:
+            # Lista todos os recursos disponíveis
+            recursos_disponiveis = [r for r in self.recursos if r.livre_para(self, operacao) and r not in self.recursos_acesso]
+            
+            # Se tem pelo menos 1 recurso disponível
+            if len(recursos_disponiveis) >= 1:
+                # Embaralha a lista de recursos disponíveis
+                self.rng.shuffle(recursos_disponiveis)
+                # Pega apenas o primeiro recurso da lista embaralhada
+                self.recursos_desejados.substituir([recursos_disponiveis[0]])
+                self.primeira_tentativa = False
+            else:
+                # Se não tem recursos disponíveis, escolhe um recurso aleatório para aguardar
+                # (o pedido vai para a fila e a política de concorrência decide o conflito)
+                recursos_ocupados = [r for r in self.recursos if not r.livre_para(self, operacao)]
+                if recursos_ocupados:
+                    self.recursos_desejados.substituir([self.rng.choice(recursos_ocupados)])
+        
+        # Tenta acessar cada recurso na ordem
+        recursos_acessados = False
+        recursos_ainda_desejados = []
+        
+        # Embaralha a ordem de tentativa de acesso aos recursos
+        recursos_para_tentar = list(self.recursos_desejados)
+        self.rng.shuffle(recursos_para_tentar)
+        
+        for recurso in recursos_para_tentar:
+            if recurso.acessar(self, operacao):
+                self.recursos_acesso.append(recurso)
+                # Gera um tempo aleatório entre tempo_min_acesso e tempo_max_acesso
+                duracao = self.rng.uniform(self.tempo_min_acesso, self.tempo_max_acesso)
+                self.iniciar_prazo(recurso, duracao)
+                recursos_acessados = True
+                status = f"Thread {self.nome} acessou recurso {recurso.item_id} por {duracao:.1f}s"
+                if self.label_status:
+                    self.label_status.config(text=status)
+            elif self.estado == "abortada":
+                # A política de concorrência abortou esta thread
+                return False
+            else:
+                recursos_ainda_desejados.append(recurso)
+        
+        # Atualiza os recursos desejados
+        self.recursos_desejados.substituir(recursos_ainda_desejados)
+        
+        # Atualiza o estado baseado nos recursos
+        if self.recursos_acesso:
+            self.estado = "acessando_recursos"
+            self.atualizar_cor_barra()
+        
+        if self.recursos_desejados:
+            self.estado = "aguardando_recursos"
+            self.inicio_espera = time.time()
+            self.atualizar_cor_barra()
+            # Se está aguardando recursos, não tenta acessar novamente até que o recurso seja liberado
+            self.proximo_intervalo_acesso = float('inf')
+        elif not self.recursos_acesso:
+            self.estado = "executando"
+            self.atualizar_cor_barra()
+            # Se não está acessando nem aguardando recursos, volta ao intervalo normal
+            self.proximo_intervalo_acesso = self.rng.uniform(self.intervalo_min_acesso, self.intervalo_max_acesso)
+        
+        return recursos_acessados
+    
+    def deve_tentar_acesso(self):
+        """Verifica se deve tentar acessar recursos baseado no tempo"""
+        tempo_atual = time.time()
+        if (tempo_atual - self.ultima_tentativa_acesso) >= self.proximo_intervalo_acesso:
+            self.ultima_tentativa_acesso = tempo_atual
+            self.proximo_intervalo_acesso = self.rng.uniform(self.intervalo_min_acesso, self.intervalo_max_acesso)
+            return True
+        return False
+    
+    def continuar(self):
+        """Continua a execução da thread de onde parou"""
+        self.estado = "executando"
+        self.atualizar_cor_barra()
+        # Calcula o tempo que já passou antes da pausa
+        self.tempo_decorrido_antes_pausa = (time.time() - self.tempo_inicio) - self.tempo_pausa
+        # Atualiza o tempo de início para compensar o tempo já decorrido
+        self.tempo_inicio = time.time() - self.tempo_decorrido_antes_pausa
+        self.ultima_tentativa_acesso = time.time()
+        # Garante que a thread continue ativa
+        self.esta_ativa = True
+        # Ajusta o tempo total para o tempo restante
+        tempo_restante = self.prioridade - self.tempo_decorrido_antes_pausa
+        self.tempo_total = tempo_restante if tempo_restante > 0 else 0.1  # Evita tempo zero
+        if self.label_status:
+            self.label_status.config(text=f"Thread {self.nome}: Continuando execução (Tempo restante: {self.tempo_total:.1f}s)")
+        self.acordar()
+    
+    def trabalho_realizado(self):
+        """Segundos de execução já feitos, perdidos se a transação for abortada"""
+        if not self.inicio_execucao:
+            return 0.0
+        return max(0.0, (time.time() - self.inicio_execucao) - self.tempo_pausa)
+
+    def idade(self):
+        return time.time() - self.chegada if self.chegada else 0.0
+
+    def morrer(self):
+        """Marca a thread como abortada e completa a barra de progresso"""
+        if self.metricas:
+            self.metricas.abortada(self)
+        self.estado = "abortada"
+        self.atualizar_cor_barra()
+        with registrar(self.rastro, "aborto", self):
+            self.reset_recursos_acesso()
+        if self.progress_bar:
+            self.progress_bar["value"] = 100
+            self.progress_bar.configure(style="Red.Horizontal.TProgressbar")
+        if self.label_status:
+            self.label_status.config(text=f"Thread {self.nome}: Abortada!")
+        self.esta_ativa = False  # Garante que a thread pare de executar
+        self.resultado = f"Thread {self.nome}: Abortada!"  # Atualiza o resultado final
+        if self.reinicio and self.reinicio_em is None:
+            atraso = self.reinicio.atraso(self)
+            if atraso is not None:
+                self.reinicio_em = time.time() + atraso
+                if self.label_status:
+                    self.label_status.config(text=f"Thread {self.nome}: Abortada! Recomeça em {atraso:.1f}s")
+        self.acordar()
+
+    def reiniciar(self):
+        """Recomeça do zero depois de um aborto, com o mesmo timestamp (prioridade)"""
+        self.reinicio_em = None
+        self.reinicios += 1
+        self.resultado = None
+        self.tempo_pausa = 0
+        self.tempo_total = self.prioridade
+        self.primeira_tentativa = True
+        self.proximo_intervalo_acesso = self.rng.uniform(self.intervalo_min_acesso, self.intervalo_max_acesso)
+        self.estado = "executando"
+        self.atualizar_cor_barra()
+        if self.progress_bar:
+            self.progress_bar["value"] = 0
+        if self.label_status:
+            self.label_status.config(text=f"Thread {self.nome}: Reiniciada ({self.reinicios}º reinício)")
+        self.iniciar()
+
+    def parar(self):
+        """Encerra a execução sem abortar (nem recomeçar)"""
+        self.esta_ativa = False
+        self.reinicio_em = None
+        self.acordar()
+
+    def iniciar(self):
+        self.esta_ativa = True
+        self.inicio_execucao = time.time()
+        if not self.chegada:
+            self.chegada = self.inicio_execucao
+        self.ultimo_passo = self.inicio_execucao
+        self.ultima_tentativa_acesso = self.inicio_execucao
+        self.estado_espera = None
+
+    def proxima_acao(self):
+        """Quanto dormir depois do passo (None = até ser acordada)"""
+        return self.tempo_ate_proxima_acao(time.time(), self.inicio_execucao)
+
+    def passo(self):
+        """Uma rodada do laço de execução; retorna True quando a transação terminou"""
+        tempo_atual = time.time()
+        if self.reinicio_em is not None:
+            if tempo_atual < self.reinicio_em:
+                return False
+            self.reiniciar()
+            tempo_atual = self.inicio_execucao
+        # O tempo dormido acessando recursos não conta como progresso
+        if self.estado_espera == "acessando_recursos":
+            self.tempo_pausa += (tempo_atual - self.ultimo_passo)
+        
+        if self.estado == "executando":
+            tempo_decorrido = (tempo_atual - self.inicio_execucao) - self.tempo_pausa
+            progresso = (tempo_decorrido / self.tempo_total) * 100
+            
+            status = f"Thread {self.nome} (Tempo: {self.tempo_total:.1f}s): {progresso:.1f}%"
+            if self.label_status:
+                self.label_status.config(text=status)
+            if self.progress_bar and self.estado != "abortada":
+                self.progress_bar["value"] = progresso
+            if self.metricas:
+                self.metricas.progresso(self, min(progresso, 100.0))
+            
+            if tempo_decorrido >= self.tempo_total:
+                return True
+            
+            if self.deve_tentar_acesso():
+                self.tentar_acessar_recursos()
+        
+        elif self.estado == "aguardando_recursos":
+            recursos_aguardando = [r.item_id for r in list(self.recursos_desejados)]
+            recursos_acessando = [r.item_id for r in list(self.recursos_acesso)]
+            status = f"Thread {self.nome}:\nAguardando: {', '.join(recursos_aguardando)}\nAcessando: {', '.join(recursos_acessando) if recursos_acessando else 'Nenhum'}"
+            if self.label_status:
+                self.label_status.config(text=status)
+            # Passou do tempo limite da política: desiste abortando
+            tempo_limite = self.tempo_limite_espera()
+            if tempo_limite is not None and tempo_atual - self.inicio_espera >= tempo_limite:
+                self.morrer()
+                return not self.em_andamento
+        
+        elif self.estado == "acessando_recursos":
+            recursos_acessando = [r.item_id for r in list(self.recursos_acesso)]
+            recursos_aguardando = [r.item_id for r in list(self.recursos_desejados)]
+            status = f"Thread {self.nome}:\nAcessando: {', '.join(recursos_acessando)}\nAguardando: {', '.join(recursos_aguardando) if recursos_aguardando else 'Nenhum'}"
+            if self.label_status:
+                self.label_status.config(text=status)
+        
+        # Só verifica o tempo de acesso se não estiver em deadlock
+        if self.estado != "aguardando_recursos" or not self.recursos_desejados:
+            self.verificar_tempo_acesso()
+        
+        self.ultimo_passo = tempo_atual
+        self.estado_espera = self.estado
+        return False
+
+    def finalizar(self):
+        """Fim da execução: devolve os recursos e escreve o resultado"""
+        # Só reseta os recursos se não estiver em deadlock
+        if self.estado != "aguardando_recursos" or not self.recursos_desejados:
+            # Libera os recursos sem resetar o estado se estiver abortada
+            if self.estado == "abortada":
+                for recurso in list(self.recursos_acesso):
+                    recurso.liberar(self)
+                self.recursos_acesso.clear()
+                self.cancelar_prazos()
+                self.recursos_desejados.clear()
+            else:
+                self.reset_recursos_acesso()
+                
+            if self.label_status:
+                if self.estado == "abortada":
+                    self.label_status.config(text=f"Thread {self.nome}: Abortada!")
+                else:
+                    self.label_status.config(text=f"Thread {self.nome}: 100%")
+            if self.progress_bar:
+                if self.estado == "abortada":
+                    self.progress_bar["value"] = 100
+                    self.progress_bar.configure(style="Red.Horizontal.TProgressbar")
+                else:
+                    self.progress_bar["value"] = 100
+                    self.progress_bar.configure(style="Horizontal.TProgressbar")
+            self.esta_ativa = False
+            if not self.resultado:  # Só atualiza o resultado se não estiver abortada
+                self.resultado = f"Thread {self.nome} finalizou com sucesso!"
+                if self.reinicio:
+                    self.reinicio.concluida()
+            if self.label_status:
+                self.label_status.config(text=self.resultado)
+
+
+class MinhaThread(Transacao, threading.Thread):
+    """Transação executada numa thread própria do sistema operacional"""
+    def __init__(self, *argumentos, **opcoes):
+        threading.Thread.__init__(self)
+        Transacao.__init__(self, *argumentos, **opcoes)
+        # Sinal que acorda a thread quando um recurso é concedido/liberado ou o estado muda de fora
+        self.sinal = threading.Event()
+
+    def acordar(self):
+        """Acorda a thread se ela estiver dormindo em run"""
+        self.sinal.set()
+
+    def run(self):
+        self.iniciar()
+        try:
+            while self.em_andamento:
+                # Limpa antes de olhar o estado: um sinal que chegue durante o passo não se perde
+                self.sinal.clear()
+                if self.passo():
+                    break
+                # Dorme até o próximo vencimento/tentativa ou até um recurso sinalizar
+                self.sinal.wait(self.proxima_acao())
+        finally:
+            self.finalizar()
@@ -0,0 +1,159 @@
+"""Varredura de parâmetros em vários núcleos.
+
+Cada ponto da grade (transações, recursos, fração de leitura, tempo de
+retenção e política) roda com várias sementes. Cada execução é uma
+simulação independente do Simulador (o mesmo RecursoCompartilhavel da
+aplicação), distribuída num ProcessPoolExecutor. Os resultados chegam
+conforme terminam e, no fim, cada ponto vira uma linha com média e
+intervalo de confiança de 95%:
+
+    python varredura.py --transacoes 100 500 --politicas esperar wound-wait --sementes 30
+"""
+import argparse
+import csv
+import itertools
+import math
+import os
+import statistics
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from politicas import POLITICAS, criar_politica
+from simulacao import Simulador
+
+# Métricas agregadas por ponto
+METRICAS = ('vazao', 'taxa_aborto', 'espera_p99', 'latencia_media', 'cpu_por_transacao')
+
+# Valor crítico t de Student bicaudal a 95% por graus de liberdade (acima de 30, a normal)
+T_95 = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306, 9: 2.262,
+    10: 2.228, 11: 2.201, 12: 2.179, 13: 2.160, 14: 2.145, 15: 2.131, 16: 2.120, 17: 2.110,
+    18: 2.101, 19: 2.093, 20: 2.086, 21: 2.080, 22: 2.074, 23: 2.069, 24: 2.064, 25: 2.060,
+    26: 2.056, 27: 2.052, 28: 2.048, 29: 2.045, 30: 2.042,
+}
+
+
+def simular(ponto, semente):
+    """Roda uma simulação do ponto (executa no processo do pool)"""
+    simulador = Simulador([f"R{i}" for i in range(ponto['recursos'])], semente=semente,
+                          politica=criar_politica(ponto['politica']), metricas=False)
+    simulador.gerar_transacoes(ponto['transacoes'], tempo_min_acesso=ponto['tempo_min_acesso'],
+                               tempo_max_acesso=ponto['tempo_max_acesso'],
+                               recursos_por_acesso=ponto['recursos_por_acesso'],
+                               fracao_leitura=ponto['fracao_leitura'])
+    resumo = simulador.executar()
+    return {metrica: resumo[metrica] for metrica in METRICAS}
+
+
+def intervalo_confianca(valores):
+    """Média e meia largura do intervalo de confiança de 95%"""
+    media = statistics.fmean(valores)
+    if len(valores) < 2:
+        return media, 0.0
+    graus = len(valores) - 1
+    t = T_95.get(graus, 1.96)
+    return media, t * statistics.stdev(valores) / math.sqrt(len(valores))
+
+
+def pontos_da_grade(args):
+    for transacoes, recursos, fracao_leitura, retencao, politica in itertools.product(
+            args.transacoes, args.recursos, args.fracao_leitura, args.retencao, args.politicas):
+        tempo_min_acesso, tempo_max_acesso = retencao
+        yield {
+            'transacoes': transacoes,
+            'recursos': recursos,
+            'fracao_leitura': fracao_leitura,
+            'tempo_min_acesso': tempo_min_acesso,
+            'tempo_max_acesso': tempo_max_acesso,
+            'politica': politica,
+            'recursos_por_acesso': args.recursos_por_acesso,
+        }
+
+
+def faixa(texto):
+    """Lê uma faixa de retenção no formato MIN-MAX (ex.: 15-30)"""
+    try:
+        minimo, maximo = (float(parte) for parte in texto.split("-"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Faixa inválida: {texto} (use MIN-MAX)")
+    return (min(minimo, maximo), max(minimo, maximo))
+
+
+def varrer(pontos, sementes, processos=None, ao_terminar=None):
+    """Distribui (ponto, semente) no pool e retorna, por ponto, a lista de resultados
+
+    `ao_terminar(ponto, semente, resultado)` é chamado a cada simulação concluída,
+    na ordem em que terminam.
+    """
+    resultados = [[] for _ in pontos]
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        futuros = {
+            pool.submit(simular, ponto, semente): (indice, semente)
+            for indice, ponto in enumerate(pontos)
+            for semente in sementes
+        }
+        for futuro in as_completed(futuros):
+            indice, semente = futuros[futuro]
+            resultado = futuro.result()
+            resultados[indice].append(resultado)
+            if ao_terminar:
+                ao_terminar(pontos[indice], semente, resultado)
+    return resultados
+
+
+def agregar(pontos, resultados):
+    """Uma linha por ponto: os parâmetros, e média e IC de 95% de cada métrica"""
+    linhas = []
+    for ponto, execucoes in zip(pontos, resultados):
+        linha = dict(ponto)
+        linha['execucoes'] = len(execucoes)
+        for metrica in METRICAS:
+            media, margem = intervalo_confianca([execucao[metrica] for execucao in execucoes])
+            linha[metrica] = media
+            linha[f"{metrica}_ic95"] = margem
+        linhas.append(linha)
+    return linhas
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Varredura de parâmetros com várias sementes em paralelo")
+    parser.add_argument("--transacoes", nargs="+", type=int, default=[100])
+    parser.add_argument("--recursos", nargs="+", type=int, default=[10])
+    parser.add_argument("--fracao-leitura", nargs="+", type=float, default=[0.5])
+    parser.add_argument("--retencao", nargs="+", type=faixa, default=[(15.0, 30.0)],
+                        help="Faixas de tempo de acesso aos recursos, MIN-MAX")
+    parser.add_argument("--politicas", nargs="+", choices=list(POLITICAS), default=["esperar"])
+    parser.add_argument("--recursos-por-acesso", type=int, default=1)
+    parser.add_argument("--sementes", type=int, default=20, help="Execuções por ponto")
+    parser.add_argument("--semente-inicial", type=int, default=0)
+    parser.add_argument("--processos", type=int, default=os.cpu_count(), help="Tamanho do pool")
+    parser.add_argument("--csv", help="Salva a tabela agregada em CSV")
+    args = parser.parse_args()
+
+    pontos = list(pontos_da_grade(args))
+    sementes = range(args.semente_inicial, args.semente_inicial + args.sementes)
+    total = len(pontos) * len(sementes)
+    concluidas = itertools.count(1)
+
+    def progresso(ponto, semente, resultado):
+        print(f"\r{next(concluidas)}/{total} simulações", end="", file=sys.stderr, flush=True)
+
+    resultados = varrer(pontos, sementes, args.processos, ao_terminar=progresso)
+    print(file=sys.stderr)
+    linhas = agregar(pontos, resultados)
+
+    print(f"{'transacoes':>10}{'recursos':>9}{'leitura':>8}{'retencao':>10} {'politica':<11}"
+          f"{'vazao':>18}{'taxa_aborto':>18}{'espera_p99':>20}")
+    for linha in linhas:
+        retencao = f"{linha['tempo_min_acesso']:g}-{linha['tempo_max_acesso']:g}"
+        print(f"{linha['transacoes']:>10}{linha['recursos']:>9}{linha['fracao_leitura']:>8.2f}{retencao:>10} "
+              f"{linha['politica']:<11}"
+              f"{linha['vazao']:>10.4f} ±{linha['vazao_ic95']:<6.4f}"
+              f"{linha['taxa_aborto']:>10.3f} ±{linha['taxa_aborto_ic95']:<6.3f}"
+              f"{linha['espera_p99']:>11.1f} ±{linha['espera_p99_ic95']:<7.1f}")
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as arquivo:
+            escritor = csv.DictWriter(arquivo, fieldnames=list(linhas[0]))
+            escritor.writeheader()
+            escritor.writerows(linhas)
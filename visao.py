@@ -0,0 +1,211 @@
+"""Visão virtualizada das transações num único tk.Canvas.
+
+Em vez de um LabelFrame, um Label e uma Progressbar por thread, cada
+transação é só uma LinhaTransacao (texto, progresso e estilo), que as
+threads atualizam como se fosse o label e a barra. O canvas tem um número
+fixo de itens, o que cabe na área visível, e a cada quadro eles são
+reaproveitados para mostrar as linhas da posição de rolagem. Só muda no Tk
+o item cujo conteúdo mudou, então o custo não depende de quantas transações
+existem.
+
+Dois modos: "lista" (texto e barra de progresso por linha) e "mapa"
+(uma célula colorida por transação, para ver milhares de uma vez).
+"""
+import math
+import tkinter as tk
+from tkinter import ttk
+
+# Cor de cada estilo de barra usado pelas threads
+CORES = {
+    "Horizontal.TProgressbar": "green",
+    "Yellow.Horizontal.TProgressbar": "yellow",
+    "Red.Horizontal.TProgressbar": "red",
+}
+COR_CONCLUIDA = "#1b5e20"
+COR_FUNDO_BARRA = "white"
+
+ALTURA_LINHA = 24  # px por linha no modo lista
+LARGURA_BARRA = 160  # px da barra de progresso no modo lista
+LADO_CELULA = 10  # px de cada célula no modo mapa
+
+_DESCONHECIDO = object()  # Conteúdo de um item ainda não desenhado
+
+
+class LinhaTransacao:
+    """Estado exibido de uma transação; faz as vezes do label e da barra da thread"""
+    def __init__(self, visao, texto):
+        self.visao = visao
+        self.texto = texto
+        self.progresso = 0.0
+        self.estilo = "Horizontal.TProgressbar"
+
+    def config(self, text=None, value=None, style=None, **outras):
+        # Só guarda o estado: quem desenha é o loop de renderização
+        if text is not None:
+            self.texto = text
+        if value is not None:
+            self.progresso = value
+        if style is not None:
+            self.estilo = style
+        self.visao.sujo = True
+
+    configure = config
+
+    def __setitem__(self, opcao, valor):
+        self.config(**{opcao: valor})
+
+    @property
+    def cor(self):
+        if self.progresso >= 100 and self.estilo == "Horizontal.TProgressbar":
+            return COR_CONCLUIDA
+        return CORES.get(self.estilo, "green")
+
+
+class VisaoTransacoes:
+    def __init__(self, pai, modo="lista"):
+        self.frame = ttk.Frame(pai)
+        self.frame.pack(fill=tk.BOTH, expand=True)
+        self.canvas = tk.Canvas(self.frame, background="white", highlightthickness=0)
+        self.barra_rolagem = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.rolar)
+        self.barra_rolagem.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.canvas.bind("<Configure>", lambda evento: self.redesenhar())
+        self.canvas.bind("<MouseWheel>", lambda evento: self.rolar("scroll", -evento.delta // 120, "units"))
+        self.canvas.bind("<Button-4>", lambda evento: self.rolar("scroll", -1, "units"))
+        self.canvas.bind("<Button-5>", lambda evento: self.rolar("scroll", 1, "units"))
+
+        self.modo = modo
+        self.linhas = []
+        self.topo = 0  # Primeira linha (lista) ou fileira de células (mapa) visível
+        self.sujo = True
+        self._itens = []  # Itens do canvas reaproveitados, um por posição visível
+        self._exibido = []  # O que cada item mostra agora (evita itemconfig repetido)
+        self._geometria = None
+
+    def adicionar(self, texto):
+        linha = LinhaTransacao(self, texto)
+        self.linhas.append(linha)
+        self.sujo = True
+        return linha
+
+    def limpar(self):
+        self.linhas = []
+        self.topo = 0
+        self.redesenhar()
+
+    def alternar_modo(self):
+        self.modo = "mapa" if self.modo == "lista" else "lista"
+        self.topo = 0
+        self.redesenhar()
+        return self.modo
+
+    def redesenhar(self):
+        """Refaz os itens do canvas (mudou o tamanho, o modo ou a lista de linhas)"""
+        self._geometria = None
+        self.sujo = True
+
+    # Geometria
+
+    def _colunas(self):
+        if self.modo == "lista":
+            return 1
+        return max(1, self.canvas.winfo_width() // LADO_CELULA)
+
+    def _visiveis(self):
+        altura = ALTURA_LINHA if self.modo == "lista" else LADO_CELULA
+        return max(1, self.canvas.winfo_height() // altura)
+
+    def _total_fileiras(self):
+        return math.ceil(len(self.linhas) / self._colunas())
+
+    def _criar_itens(self):
+        self.canvas.delete("all")
+        self._itens = []
+        self._exibido = []
+        colunas, visiveis = self._colunas(), self._visiveis()
+        if self.modo == "lista":
+            for posicao in range(visiveis):
+                y = posicao * ALTURA_LINHA
+                fundo = self.canvas.create_rectangle(4, y + 4, 4 + LARGURA_BARRA, y + ALTURA_LINHA - 4,
+                                                     fill=COR_FUNDO_BARRA, outline="gray")
+                barra = self.canvas.create_rectangle(4, y + 4, 4, y + ALTURA_LINHA - 4, width=0)
+                texto = self.canvas.create_text(LARGURA_BARRA + 12, y + ALTURA_LINHA // 2, anchor=tk.W)
+                self._itens.append((fundo, barra, texto))
+                self._exibido.append(_DESCONHECIDO)
+        else:
+            for posicao in range(colunas * visiveis):
+                fileira, coluna = divmod(posicao, colunas)
+                x, y = coluna * LADO_CELULA, fileira * LADO_CELULA
+                celula = self.canvas.create_rectangle(x, y, x + LADO_CELULA - 1, y + LADO_CELULA - 1, width=0)
+                self._itens.append((celula,))
+                self._exibido.append(_DESCONHECIDO)
+        self._geometria = (self.modo, colunas, visiveis)
+
+    # Desenho
+
+    def desenhar(self):
+        """Atualiza só os itens visíveis que mudaram; chamado a cada quadro na thread do Tk"""
+        if not self.sujo:
+            return
+        self.sujo = False
+        if self._geometria != (self.modo, self._colunas(), self._visiveis()):
+            self._criar_itens()
+        self.topo = max(0, min(self.topo, self._total_fileiras() - self._visiveis()))
+        primeira = self.topo * self._colunas()
+        for posicao, itens in enumerate(self._itens):
+            indice = primeira + posicao
+            linha = self.linhas[indice] if indice < len(self.linhas) else None
+            if self.modo == "lista":
+                self._desenhar_linha(posicao, itens, linha)
+            else:
+                self._desenhar_celula(posicao, itens, linha)
+        total = self._total_fileiras()
+        if total:
+            self.barra_rolagem.set(self.topo / total, min(1.0, (self.topo + self._visiveis()) / total))
+        else:
+            self.barra_rolagem.set(0.0, 1.0)
+
+    def _desenhar_linha(self, posicao, itens, linha):
+        fundo, barra, texto = itens
+        if linha is None:
+            conteudo = None
+        else:
+            conteudo = (linha.texto.replace("\n", "  "), min(max(linha.progresso, 0), 100), linha.cor)
+        if conteudo == self._exibido[posicao]:
+            return
+        self._exibido[posicao] = conteudo
+        estado = tk.HIDDEN if conteudo is None else tk.NORMAL
+        for item in itens:
+            self.canvas.itemconfigure(item, state=estado)
+        if conteudo is None:
+            return
+        descricao, progresso, cor = conteudo
+        y = posicao * ALTURA_LINHA
+        self.canvas.coords(barra, 4, y + 4, 4 + LARGURA_BARRA * progresso / 100, y + ALTURA_LINHA - 4)
+        self.canvas.itemconfigure(barra, fill=cor)
+        self.canvas.itemconfigure(texto, text=descricao)
+
+    def _desenhar_celula(self, posicao, itens, linha):
+        cor = None if linha is None else linha.cor
+        if cor == self._exibido[posicao]:
+            return
+        self._exibido[posicao] = cor
+        (celula,) = itens
+        if cor is None:
+            self.canvas.itemconfigure(celula, state=tk.HIDDEN)
+        else:
+            self.canvas.itemconfigure(celula, state=tk.NORMAL, fill=cor)
+
+    # Rolagem
+
+    def rolar(self, acao, quantidade=0, unidade=None):
+        """Comando da barra de rolagem (moveto/scroll), também usado pela roda do mouse"""
+        if acao == "moveto":
+            self.topo = int(float(quantidade) * self._total_fileiras())
+        elif acao == "scroll":
+            passo = self._visiveis() if unidade == "pages" else 1
+            self.topo += int(quantidade) * passo
+        self.topo = max(0, min(self.topo, self._total_fileiras() - self._visiveis()))
+        # Mesmo conteúdo por linha, mas em outra posição: limpa o que foi exibido
+        self._exibido = [_DESCONHECIDO] * len(self._itens)
+        self.sujo = True
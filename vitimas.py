@@ -0,0 +1,84 @@
+"""Escolha da vítima de um ciclo de espera pelo custo do aborto.
+
+Abortar a transação de menor prioridade pode jogar fora a que já tinha
+feito quase tudo. Aqui cada transação do ciclo, de qualquer tamanho, recebe
+um custo, o trabalho que se perde se ela for abortada, e a vítima é a de
+menor custo. O custo soma, com pesos:
+
+- trabalho: segundos de execução já feitos (trabalho_realizado()), que
+  serão refeitos;
+- recursos: cada recurso em mãos, que terá de ser pedido de novo;
+- reinícios: cada vez que ela já foi abortada e recomeçou, para a mesma
+  transação não ser sempre a vítima (inanição);
+- idade: segundos desde que ela entrou no sistema.
+
+Cada escolha fica registrada com o custo de todas as candidatas.
+"""
+from collections import deque
+
+
+def vitima_menor_prioridade(ciclo):
+    """Critério antigo do "Matar Deadlock": aborta a thread de menor prioridade"""
+    return min(ciclo, key=lambda thread: thread.prioridade)
+
+
+class CustoAborto:
+    """Escolhe a vítima de um ciclo (use como escolher_vitima do DetectorDeadlock)"""
+    def __init__(self, trabalho=1.0, recursos=2.0, reinicios=10.0, idade=0.1):
+        self.pesos = {'trabalho': trabalho, 'recursos': recursos, 'reinicios': reinicios, 'idade': idade}
+        # Métricas
+        self.escolhas = 0
+        self.custo_total = 0.0
+        self.trabalho_perdido = 0.0  # Segundos de execução das vítimas
+        self.historico = deque(maxlen=1000)  # Últimas escolhas
+
+    @staticmethod
+    def componentes(thread):
+        return {
+            'trabalho': thread.trabalho_realizado(),
+            'recursos': len(thread.recursos_acesso),
+            'reinicios': thread.reinicios,
+            'idade': thread.idade(),
+        }
+
+    def custo(self, thread):
+        componentes = self.componentes(thread)
+        return sum(self.pesos[nome] * valor for nome, valor in componentes.items())
+
+    def __call__(self, ciclo):
+        custos = [(self.custo(thread), thread) for thread in ciclo]
+        # Empate: a de menor prioridade, como no "Matar Deadlock"
+        custo, vitima = min(custos, key=lambda par: (par[0], par[1].prioridade))
+        self.escolhas += 1
+        self.custo_total += custo
+        self.trabalho_perdido += vitima.trabalho_realizado()
+        self.historico.append({
+            'ciclo': [thread.nome for thread in ciclo],
+            'vitima': vitima.nome,
+            'custo': custo,
+            'custos': {thread.nome: custo_thread for custo_thread, thread in custos},
+        })
+        return vitima
+
+    @property
+    def ultima(self):
+        return self.historico[-1] if self.historico else None
+
+    def metricas(self):
+        return {
+            'escolhas_vitima': self.escolhas,
+            'custo_medio_vitima': self.custo_total / self.escolhas if self.escolhas else 0.0,
+            'trabalho_perdido_deadlock': self.trabalho_perdido,
+        }
+
+
+ESCOLHAS_VITIMA = ("custo", "prioridade")
+
+
+def criar_escolha_vitima(nome):
+    """Cria o critério de escolha da vítima pelo nome"""
+    if nome == "custo":
+        return CustoAborto()
+    if nome == "prioridade":
+        return vitima_menor_prioridade
+    raise ValueError(f"Escolha de vítima desconhecida: {nome}")